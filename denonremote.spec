@@ -4,6 +4,8 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import os
+
 from PyInstaller.building.api import EXE, PYZ
 from PyInstaller.building.build_main import Analysis
 from PyInstaller.building.datastruct import Tree
@@ -20,6 +22,8 @@ added_files = [
     ('src/denonremote/settings', 'settings'),
     ('src/denonremote/denonremote.kv', 'denonremote'),
 ]
+if os.path.exists('src/denonremote/denon/tables.marshal'):  # Built with python -m denonremote.denon.frozen
+    added_files.append(('src/denonremote/denon/tables.marshal', 'denonremote/denon'))
 
 # Minimize dependencies bundling
 dependencies = get_deps_minimal(exclude_ignored=False, window=True, text=True, image=True)
@@ -4,12 +4,14 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 import os
+import sys
 from datetime import datetime
 from typing import Any
 
 from hatchling.builders.hooks.plugin.interface import BuildHookInterface
 
 BUILD_FILE = 'src/denonremote/__build__.py'
+FROZEN_TABLES_FILE = 'src/denonremote/denon/tables.marshal'
 
 
 class CustomBuildHook(BuildHookInterface):
@@ -18,11 +20,12 @@ class CustomBuildHook(BuildHookInterface):
         return os.path.join(self.root, BUILD_FILE)
 
     def clean(self, versions: list[str]) -> None:
-        # Cleanup the build file
-        try:
-            os.remove(self._get_build_file())
-        except FileNotFoundError:
-            pass
+        # Cleanup the build files
+        for path in (self._get_build_file(), os.path.join(self.root, FROZEN_TABLES_FILE)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
 
     def initialize(self, version: str, build_data: dict[str, Any]) -> None:
         print(version)
@@ -33,4 +36,9 @@ class CustomBuildHook(BuildHookInterface):
             f.write(f'__build_date__ = "{__build_date__}"\r')
         # __build__.py is in .gitignore. We must force its inclusion
         self.build_config.force_include[build_file] = BUILD_FILE
+        # Precompiled protocol tables. Also ignored.
+        sys.path.insert(0, os.path.join(self.root, 'src'))
+        from denonremote.denon import frozen
+        tables_file = frozen.build(os.path.join(self.root, FROZEN_TABLES_FILE))
+        self.build_config.force_include[tables_file] = FROZEN_TABLES_FILE
         print(self.build_config.force_include)
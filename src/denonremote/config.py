@@ -0,0 +1,83 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Remote typed configuration.
+"""
+
+import configparser
+import logging
+
+from denonremote.denon.dn500av import DN500AVFormat, MV_PARAMS
+from denonremote.presets import (
+    ensure_preset_options, PresetBank, SOURCE_PRESET_CODE_KEY, SOURCE_PRESET_LABEL_KEY, VOLUME_PRESET_KEY
+)
+
+logger = logging.getLogger(__name__)
+
+SECTION = 'denonremote'
+
+
+class RemoteConfig:
+    """
+    Typed view of the application configuration
+
+    Values are parsed once and kept until invalidate() is called.
+    Presets are indexed by raw receiver values for direct lookups on status changes.
+    """
+
+    receiver_ip: str
+    receiver_port: int
+
+    reference_volume: float
+    """Alignment volume in dB"""
+    reference_spl: float
+    """Alignment Sound Pressure Level in dB SPL"""
+    reference_level: int
+    """Alignment level in dBFS"""
+
+    volume_presets: PresetBank
+    """Volume presets by raw Master Volume value. Labels are Master Volume labels."""
+    source_presets: PresetBank
+    """Favorite sources by input source code"""
+
+    def __init__(self, config: configparser.ConfigParser) -> None:
+        self.config = config
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Parse the configuration again"""
+        get = self.config.get
+
+        self.receiver_ip = get(SECTION, 'receiver_ip')
+        self.receiver_port = self.config.getint(SECTION, 'receiver_port')
+
+        self.reference_volume = float(get(SECTION, 'reference_volume'))
+        self.reference_spl = float(get(SECTION, 'reference_spl'))
+        self.reference_level = int(get(SECTION, 'reference_level'))
+
+        volume_count = self.config.getint(SECTION, 'vol_preset_count')
+        source_count = self.config.getint(SECTION, 'fav_src_count')
+        ensure_preset_options(self.config, SECTION, volume_count, source_count)
+
+        volume_format = DN500AVFormat()
+        self.volume_presets = PresetBank()
+        for number in range(1, volume_count + 1):
+            value = get(SECTION, VOLUME_PRESET_KEY.format(number))
+            code = volume_format.get_raw_volume_value_from_db_value(value)
+            if code is None:
+                if value:
+                    logger.warning(f"Volume preset {number} value {value} is invalid.")
+                self.volume_presets.append(None, value)
+            else:
+                self.volume_presets.append(code, MV_PARAMS[code])
+
+        self.source_presets = PresetBank()
+        for number in range(1, source_count + 1):
+            self.source_presets.append(
+                get(SECTION, SOURCE_PRESET_CODE_KEY.format(number)),
+                get(SECTION, SOURCE_PRESET_LABEL_KEY.format(number)),
+            )
@@ -0,0 +1,76 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Remote debug console.
+"""
+
+import collections
+import logging
+import os
+import time
+
+import kivy.clock
+from kivy.uix.boxlayout import BoxLayout
+
+logger = logging.getLogger(__name__)
+
+DEBUG_CONSOLE_CAPACITY = 1000
+"""Messages kept in the console. Older ones are dropped."""
+
+EXPORT_FILE = '~/denonremote-debug-%Y%m%d-%H%M%S.log'
+
+
+class DebugConsole(BoxLayout):
+    """
+    Debug messages console
+
+    Backed by a fixed capacity ring buffer displayed in a virtualized list.
+    Memory and redraw cost don't depend on uptime.
+    """
+
+    def __init__(self, capacity: int = DEBUG_CONSOLE_CAPACITY, **kwargs) -> None:
+        self.messages: collections.deque[tuple[float, str, str]] = collections.deque(maxlen=capacity)
+        # Coalesce refreshes to at most once per frame
+        self._refresh_trigger = kivy.clock.Clock.create_trigger(self._refresh)
+        super().__init__(**kwargs)
+
+    def append(self, message: str, command: str = '') -> None:
+        """
+        Add a message
+
+        :param message: Message to display
+        :param command: Receiver command code the message relates to. Used for filtering.
+        """
+        self.messages.append((time.time(), command, message))
+        self._refresh_trigger()
+
+    def refresh(self) -> None:
+        self._refresh_trigger()
+
+    def _matches(self, command: str, message: str, pattern: str) -> bool:
+        return command.upper().startswith(pattern.upper()) or pattern.lower() in message.lower()
+
+    def _refresh(self, *_) -> None:
+        pattern = self.ids.filter.text.strip()
+        self.ids.view.data = [
+            {'text': f"{time.strftime('%H:%M:%S', time.localtime(timestamp))} {message}"}
+            for timestamp, command, message in self.messages
+            if not pattern or self._matches(command, message, pattern)
+        ]
+        self.ids.view.scroll_y = 0  # Follow the latest message
+
+    def export(self) -> None:
+        """Write all messages to a file in the user directory"""
+        path = os.path.expanduser(time.strftime(EXPORT_FILE))
+        try:
+            with open(path, 'w', encoding='UTF-8') as f:
+                for timestamp, command, message in self.messages:
+                    f.write(f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(timestamp))}\t{command}\t{message}\n")
+        except OSError as e:
+            logger.error(f"Unable to export debug messages to {path}: {e}")
+            return
+        self.append(f"Exported to {path}")
@@ -0,0 +1,235 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon protocol captures offline analytics.
+
+Captures are the protocol trace logs (see tracing.py), e.g.
+    2023-11-02 21:14:03,512 DEBUG direction=rx line='MV50' command=MV parameter=50
+
+The file is memory mapped and split in chunks of lines.
+Receivers repeat a small set of lines: each unique line is decoded once
+and the results are broadcast to columnar arrays.
+
+Requires NumPy: pip install denonremote[analytics]
+
+Usage: python -m denonremote.denon.analytics capture.log
+"""
+
+from __future__ import annotations
+
+import ast
+import logging
+import mmap
+import re
+import sys
+
+import numpy  # Optional dependency
+
+from .dn500av import DN500AVMessage, MV_PARAMS
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_SIZE = 23
+"""Records start with a fixed width timestamp. e.g. '2023-11-02 21:14:03,512'"""
+
+TRACE_RECORD = re.compile(rb'direction=(?P<direction>rx|tx) line=(?P<line>\'[^\r\n]*?\'|"[^\r\n]*?")')
+"""Trace record after the timestamp. The line is a Python string literal."""
+
+CHUNK_SIZE = 1 << 26
+"""Bytes decoded at once. Bounds memory use."""
+
+
+class Capture:
+    """
+    Decoded capture as columns
+
+    All columns have one row per record.
+    Decoded columns are broadcast from the unique lines table through `index`.
+    """
+
+    def __init__(self, time: numpy.ndarray, received: numpy.ndarray, index: numpy.ndarray,
+                 messages: list[DN500AVMessage]) -> None:
+        """
+        :param time: Record timestamps (datetime64[ms])
+        :param received: Whether the line was received or sent (bool)
+        :param index: Unique line index of each record (int32)
+        :param messages: Decoded unique lines
+        """
+        self.time = time
+        self.received = received
+        self.index = index
+        self.messages = messages
+        self._commands = numpy.array([message.command_code for message in messages], dtype=object)
+        self._subcommands = numpy.array([message.subcommand_code for message in messages], dtype=object)
+        self._parameters = numpy.array([message.parameter_code for message in messages], dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def command(self) -> numpy.ndarray:
+        return self._commands[self.index]
+
+    @property
+    def subcommand(self) -> numpy.ndarray:
+        return self._subcommands[self.index]
+
+    @property
+    def parameter(self) -> numpy.ndarray:
+        return self._parameters[self.index]
+
+    def _unique_mask(self, predicate) -> numpy.ndarray:
+        """Records mask from a predicate evaluated once per unique line"""
+        unique = numpy.fromiter((bool(predicate(message)) for message in self.messages), dtype=bool,
+                                count=len(self.messages))
+        return unique[self.index]
+
+    def volume_histogram(self) -> dict[str, int]:
+        """Number of received Master Volume status by volume label. Loudest first."""
+        mask = self._unique_mask(
+            lambda message: message.command_code == 'MV' and message.subcommand_code is None
+            and message.parameter_code is not None and message.parameter_code.isdigit()
+        )
+        indexes, counts = numpy.unique(self.index[mask & self.received], return_counts=True)
+        histogram = {self.messages[index].parameter_code: int(count) for index, count in zip(indexes, counts)}
+        return {MV_PARAMS[code]: histogram[code] for code in sorted(histogram, key=_volume_order, reverse=True)}
+
+    def source_dwell(self) -> dict[str, float]:
+        """
+        Time spent on each source in seconds
+
+        A source lasts until the next received source status or the end of the capture.
+        """
+        mask = self._unique_mask(lambda message: message.command_code == 'SI' and message.parameter_code is not None)
+        mask &= self.received
+        if not mask.any():
+            return {}
+        times = self.time[mask]
+        ends = numpy.append(times[1:], self.time[-1])
+        durations = (ends - times) / numpy.timedelta64(1, 's')
+        sources = self.parameter[mask]
+        dwell = {}
+        for source in numpy.unique(sources):
+            dwell[source] = float(durations[sources == source].sum())
+        return dwell
+
+    def command_rates(self) -> dict[str, float]:
+        """Lines per hour by command, over the whole capture duration"""
+        if not len(self):
+            return {}
+        hours = max((self.time[-1] - self.time[0]) / numpy.timedelta64(1, 'h'), 1 / 3600)
+        commands = numpy.array([message.command_code or 'unknown' for message in self.messages], dtype=object)
+        names, counts = numpy.unique(commands[self.index], return_counts=True)
+        return {name: float(count / hours) for name, count in zip(names, counts)}
+
+
+def _volume_order(code: str) -> float:
+    # Half dB steps have 3 digits
+    return int(code) / 10 if len(code) == 3 else int(code)
+
+
+def _decode(literal: bytes) -> DN500AVMessage:
+    message = DN500AVMessage()
+    try:
+        line = ast.literal_eval(literal.decode('ASCII', 'replace'))
+    except (SyntaxError, ValueError):
+        logger.warning(f"Invalid capture line {literal!r}")
+        return message
+    message.parse_response(line)
+    return message
+
+
+def _chunks(data: bytes | mmap.mmap):
+    """Whole lines slices of about CHUNK_SIZE bytes"""
+    start = 0
+    while start < len(data):
+        end = data.find(b'\n', min(start + CHUNK_SIZE, len(data)))
+        end = len(data) if end == -1 else end + 1
+        yield data[start:end]
+        start = end
+
+
+def parse_capture(data: bytes | mmap.mmap) -> Capture:
+    """
+    Decode trace records
+
+    Other log records are ignored.
+
+    :param data: Capture contents
+    :raise ValueError: Invalid trace record timestamp
+    """
+    # Everything but the timestamp repeats a lot: deduplicate the tails first
+    tails: dict[bytes, int] = {}
+    tail_index = []
+    stamps = []
+    for chunk in _chunks(data):
+        lines = chunk.splitlines()
+        tail_index.append(numpy.fromiter(
+            (tails.setdefault(line[TIMESTAMP_SIZE:], len(tails)) for line in lines), dtype=numpy.int32, count=len(lines)
+        ))
+        stamps.append(numpy.array(lines, dtype=f'S{TIMESTAMP_SIZE}'))
+    if not tails:
+        return Capture(numpy.array([], dtype='datetime64[ms]'), numpy.array([], dtype=bool),
+                       numpy.array([], dtype=numpy.int32), [])
+    rows = numpy.concatenate(tail_index)
+
+    # Then each unique trace line is decoded once
+    literals: dict[bytes, int] = {}
+    tail_line = numpy.full(len(tails), -1, dtype=numpy.int32)
+    tail_received = numpy.zeros(len(tails), dtype=bool)
+    for tail, index in tails.items():
+        match = TRACE_RECORD.search(tail)
+        if match is not None:
+            tail_line[index] = literals.setdefault(match['line'], len(literals))
+            tail_received[index] = match['direction'] == b'rx'
+    messages = [_decode(literal) for literal in literals]
+
+    # And broadcast
+    records = tail_line[rows] >= 0
+    rows = rows[records]
+    logger.info(f"{len(rows)} records, {len(messages)} unique lines")
+
+    # ISO 8601 timestamps parse natively
+    time = numpy.concatenate(stamps)[records].view(numpy.uint8).reshape(-1, TIMESTAMP_SIZE).copy()
+    time[:, 10] = ord('T')
+    time[:, 19] = ord('.')
+    return Capture(
+        time.view(f'S{TIMESTAMP_SIZE}').ravel().astype('datetime64[ms]'),
+        tail_received[rows],
+        tail_line[rows],
+        messages,
+    )
+
+
+def load_capture(path: str) -> Capture:
+    """Decode a capture file. Memory mapped: the file is never read as a whole in memory."""
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            return parse_capture(b'')
+        with data:
+            return parse_capture(data)
+
+
+def main(paths: list[str]) -> None:
+    for path in paths:
+        capture = load_capture(path)
+        print(f"{path}: {len(capture)} records, {len(capture.messages)} unique lines")
+        print("Volume histogram:")
+        for label, count in capture.volume_histogram().items():
+            print(f"  {label}: {count}")
+        print("Source dwell time:")
+        for source, seconds in sorted(capture.source_dwell().items(), key=lambda item: -item[1]):
+            print(f"  {source}: {seconds / 3600:.2f}h")
+        print("Command rates:")
+        for command, rate in sorted(capture.command_rates().items(), key=lambda item: -item[1]):
+            print(f"  {command}: {rate:.1f}/h")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
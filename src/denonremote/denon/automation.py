@@ -0,0 +1,171 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Master Volume automation.
+
+Ramps are planned on the Master Volume half dB grid and paced at the device speed:
+at most one absolute volume command per pacing interval, and only when the planned position changes.
+"""
+
+from __future__ import annotations
+
+import bisect
+import collections
+import logging
+from typing import TYPE_CHECKING
+
+from twisted.internet import defer, reactor, task
+
+from .dn500av import DN500AVFormat, DN500AVMessage, MV_PARAMS, parse_volume_label
+from .outbound import Priority
+
+if TYPE_CHECKING:
+    import twisted.internet.interfaces
+
+    from .communication import DenonProtocol
+
+logger = logging.getLogger(__name__)
+
+VOLUME_GRID: tuple[tuple[float, str], ...] = tuple(sorted(
+    (db, code) for db, code in DN500AVFormat.mv_db_params.items() if db != float('-inf')
+))
+"""(Volume in dB, raw value) ascending"""
+
+ECHO_MEMORY = 8
+"""Commanded values recognized in echoes. Older echoes are considered external changes."""
+
+
+def snap(db: float) -> str:
+    """Raw Master Volume value nearest to a volume in dB"""
+    index = bisect.bisect_left(VOLUME_GRID, (db, ''))
+    candidates = VOLUME_GRID[max(index - 1, 0):index + 1]
+    return min(candidates, key=lambda point: abs(point[0] - db))[1]
+
+
+def code_db(code: str) -> float:
+    """Volume in dB of a raw Master Volume value"""
+    return parse_volume_label(MV_PARAMS[code])
+
+
+class VolumeRamp:
+    """
+    Timed Master Volume fades
+
+    One ramp at a time: starting a new one retargets from the current position.
+    Echoed Master Volume status correct the course when the volume is changed by something else
+    (front panel, other remote, maximum volume clamping): the rest of the ramp is re-planned from there.
+    """
+
+    def __init__(self, protocol: DenonProtocol, clock: twisted.internet.interfaces.IReactorTime = reactor) -> None:
+        self.protocol = protocol
+        self.clock = clock
+        self.position: None | str = None
+        """Latest echoed raw Master Volume value"""
+        self._start: float = 0.
+        """Planned start volume in dB"""
+        self._target: float = 0.
+        """Target volume in dB"""
+        self._started: float = 0.
+        self._duration: float = 0.
+        self._last: None | str = None
+        """Latest commanded raw value"""
+        self._commanded: collections.deque[str] = collections.deque(maxlen=ECHO_MEMORY)
+        self._done: None | defer.Deferred = None
+        self._ticker = task.LoopingCall(self._tick)
+        self._ticker.clock = clock
+
+    @property
+    def running(self) -> bool:
+        return self._ticker.running
+
+    def fade(self, target: float, duration: float) -> defer.Deferred:
+        """
+        Fade to a volume
+
+        :param target: Volume in dB
+        :param duration: Fade duration in seconds
+        :return: Deferred firing with True once the target is reached, False when cancelled or retargeted
+        """
+        if self.position is None:
+            return self._locate().addCallback(lambda _: self.fade(target, duration))
+        if not self.running:
+            self._last = None
+        self._finish(False)  # Retargeted
+        self._start = code_db(self._last or self.position)
+        self._target = code_db(snap(target))
+        self._started = self.clock.seconds()
+        self._duration = max(duration, 0.)
+        self._done = defer.Deferred()
+        logger.debug(f"Fading from {self._start}dB to {self._target}dB in {self._duration}s")
+        done = self._done
+        self._ticker.start(self.protocol.DELAY, now=True)
+        return done
+
+    def duck(self, offset: float, duration: float) -> defer.Deferred:
+        """
+        Fade by a relative amount
+
+        :param offset: Volume change in dB. e.g. -12
+        :param duration: Fade duration in seconds
+        """
+        if self.position is None:
+            return self._locate().addCallback(lambda _: self.duck(offset, duration))
+        position = self._last if self.running and self._last else self.position
+        return self.fade(code_db(position) + offset, duration)
+
+    def cancel(self) -> None:
+        """Stop at the current position"""
+        self._finish(False)
+
+    def _locate(self) -> defer.Deferred:
+        """Retrieve the unknown starting point"""
+        def located(message: DN500AVMessage) -> None:
+            self.update(message)
+            if self.position is None:
+                raise ValueError(f"Unknown Master Volume: {message.response}")
+
+        return self.protocol.query(b'MV?', Priority.INTERACTIVE).addCallback(located)
+
+    def update(self, message: DN500AVMessage) -> None:
+        """Follow echoed Master Volume status"""
+        if message.command_code != 'MV' or message.subcommand_code is not None:
+            return
+        code = message.parameter_code
+        if code is None or not code.isdigit() or code_db(code) == float('-inf'):
+            return
+        self.position = code
+        if self.running and code not in self._commanded:
+            # Moved by something else: re-plan the rest of the ramp from there
+            now = self.clock.seconds()
+            remaining = max(self._started + self._duration - now, 0.)
+            logger.debug(f"Volume moved to {code_db(code)}dB during a fade. Correcting course.")
+            self._start = code_db(code)
+            self._started = now
+            self._duration = remaining
+
+    def _planned(self) -> str:
+        if self._duration:
+            progress = min((self.clock.seconds() - self._started) / self._duration, 1.)
+        else:
+            progress = 1.
+        return snap(self._start + (self._target - self._start) * progress)
+
+    def _tick(self) -> None:
+        code = self._planned()
+        if code != (self._last or self.position):
+            self._last = code
+            self._commanded.append(code)
+            self.protocol.set_volume(MV_PARAMS[code])  # Coalesced: never more than one queued
+        if self.clock.seconds() >= self._started + self._duration and code == snap(self._target):
+            self._finish(True)
+
+    def _finish(self, reached: bool) -> None:
+        if self.running:
+            self._ticker.stop()
+        done, self._done = self._done, None
+        if done is not None:
+            done.callback(reached)
@@ -0,0 +1,139 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon settings backup and restore.
+
+Snapshots are plain text: a versioned header followed by one raw status line per parameter.
+Status lines are also the commands setting them: a snapshot is replayed as is.
+
+e.g.
+    DENONREMOTE SNAPSHOT 1
+    PWON
+    SIGAME
+    MSSTEREO
+    PSBAS 47
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable
+
+from .dn500av import DN500AVMessage
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_HEADER = 'DENONREMOTE SNAPSHOT'
+SNAPSHOT_VERSION = 1
+
+SUBSYSTEMS = {
+    'power': ('PW', 'ZM'),
+    'source': ('SI', 'SD', 'DC', 'SV'),
+    'surround': ('MS',),
+    'parameters': ('PS',),
+    'video': ('VS',),
+    'levels': ('MV', 'CV', 'MU'),
+    'sleep': ('SLP',),
+    'zone2': ('Z2', 'Z2MU', 'Z2CV', 'Z2SLP'),
+}
+"""
+Commands by subsystem in restore order: the source must be on before being selected, and so on.
+Subjects are restored in SUBJECTS_ORDER within their command.
+"""
+
+SUBJECTS_ORDER = ('POWER', 'SOURCE')
+"""Restored first within their command, in this order. e.g. Zone 2 power, then source, then the others."""
+
+NON_RESTORABLE = ('MVMAX', 'CVEND', 'MSQUICK', 'Z2QUICK')
+"""Read-only or memory recall status lines prefixes"""
+
+StatusKey = tuple[str, None | str]
+
+
+def subsystem_of(command: str) -> None | str:
+    for name, commands in SUBSYSTEMS.items():
+        if command in commands:
+            return name
+    return None
+
+
+def restore_order(key: StatusKey) -> tuple[int, int, int]:
+    """
+    Sort key of a status in restore order
+
+    :raise ValueError: Command not in any subsystem
+    """
+    for position, commands in enumerate(SUBSYSTEMS.values()):
+        if key[0] in commands:
+            subject = SUBJECTS_ORDER.index(key[1]) if key[1] in SUBJECTS_ORDER else len(SUBJECTS_ORDER)
+            return position, commands.index(key[0]), subject
+    raise ValueError(f"No subsystem for {key[0]}")
+
+
+class Snapshot:
+    """Receiver settings"""
+
+    def __init__(self, lines: None | dict[StatusKey, str] = None) -> None:
+        self.lines: dict[StatusKey, str] = lines or {}
+        """Raw status line by status key"""
+
+    @classmethod
+    def from_status(cls, status: dict[StatusKey, tuple[float, DN500AVMessage]]) -> Snapshot:
+        """Capture the restorable known status"""
+        lines = {
+            key: message.raw for key, (_, message) in status.items()
+            if message.raw is not None and subsystem_of(key[0]) is not None
+            and not message.raw.startswith(NON_RESTORABLE)
+        }
+        return cls(lines)
+
+    def ordered(self) -> list[tuple[StatusKey, str]]:
+        """(Status key, raw status line) in restore order. Whatever order the status was received in."""
+        return sorted(
+            ((key, line) for key, line in self.lines.items() if subsystem_of(key[0]) is not None),
+            key=lambda item: restore_order(item[0]),
+        )
+
+    def dumps(self) -> str:
+        return '\n'.join([f'{SNAPSHOT_HEADER} {SNAPSHOT_VERSION}', *(line for _, line in self.ordered())]) + '\n'
+
+    @classmethod
+    def loads(cls, text: str) -> Snapshot:
+        """
+        :raise ValueError: Not a snapshot or unsupported version
+        """
+        header, _, body = text.partition('\n')
+        name, _, version = header.strip().rpartition(' ')
+        if name != SNAPSHOT_HEADER:
+            raise ValueError("Not a Denon Remote snapshot")
+        if not version.isdigit() or int(version) > SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        lines = {}
+        for line in body.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            message = DN500AVMessage()
+            message.parse_response(line)
+            if message.command_label is None or subsystem_of(message.command_code) is None:
+                logger.warning(f"Ignoring snapshot line {line}")
+                continue
+            lines[message.status_key] = line
+        return cls(lines)
+
+    def diff(self, current: dict[StatusKey, str], subsystems: None | Iterable[str] = None) -> dict[StatusKey, bytes]:
+        """
+        Commands restoring the snapshot
+
+        :param current: Raw status line by status key
+        :param subsystems: Subsystems to restore. All when None.
+        :return: Commands differing from the current status by status key in restore order
+        """
+        return {
+            key: line.encode('ASCII') for key, line in self.ordered()
+            if (subsystems is None or subsystem_of(key[0]) in subsystems) and current.get(key) != line
+        }
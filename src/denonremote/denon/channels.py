@@ -0,0 +1,100 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon per channel levels (CV).
+"""
+
+from __future__ import annotations
+
+import logging
+
+from .dn500av import (
+    CHANNEL_VOLUME_MAX, CHANNEL_VOLUME_MIN, CHANNEL_VOLUME_STEP, CHANNEL_VOLUME_ZERODB_REF, CV_SUBCOMMANDS,
+    DN500AVMessage, SW_OFF,
+)
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = tuple(CV_SUBCOMMANDS)
+"""Channel codes in display order"""
+
+CHANNEL_LEVEL_MIN: float = CHANNEL_VOLUME_MIN - CHANNEL_VOLUME_ZERODB_REF
+CHANNEL_LEVEL_MAX: float = CHANNEL_VOLUME_MAX - CHANNEL_VOLUME_ZERODB_REF
+
+
+def decode_channel_level(code: str) -> None | float:
+    """
+    Channel level in dB of a raw value
+
+    :return: None when the channel is off (Subwoofer only) or the value is invalid
+    """
+    if not code.isdigit() or len(code) not in (2, 3) or int(code[:2]) == SW_OFF:
+        return None
+    level = int(code[:2]) - CHANNEL_VOLUME_ZERODB_REF
+    if len(code) == 3:
+        level += CHANNEL_VOLUME_STEP  # Half dB
+    return float(level)
+
+
+def encode_channel_level(level: float) -> str:
+    """Raw value of a channel level in dB. Clamped to the device range and rounded to the nearest step."""
+    level = min(max(level, CHANNEL_LEVEL_MIN), CHANNEL_LEVEL_MAX)
+    steps = round(level / CHANNEL_VOLUME_STEP)
+    value = CHANNEL_VOLUME_ZERODB_REF + steps * CHANNEL_VOLUME_STEP
+    code = str(int(value // 1)).zfill(2)
+    if value % 1:
+        code += '5'
+    return code
+
+
+class ChannelLevels:
+    """
+    Known levels of all channels
+
+    Kept up to date from CV replies and echoes.
+    """
+
+    def __init__(self) -> None:
+        self.levels: dict[str, None | float] = dict.fromkeys(CHANNELS)
+        """Level in dB by channel code. None when unknown or off."""
+        self.known: set[str] = set()
+        """Channels reported by the receiver. Depends on the speakers configuration."""
+
+    def update(self, message: DN500AVMessage) -> bool:
+        """
+        Record a channel level message
+
+        :return: Whether the message was a channel level
+        """
+        if message.command_code != 'CV' or message.subcommand_code not in self.levels:
+            return False
+        if message.parameter_code in (None, 'UP', 'DOWN'):
+            return False
+        self.levels[message.subcommand_code] = decode_channel_level(message.parameter_code)
+        self.known.add(message.subcommand_code)
+        return True
+
+    def diff(self, profile: dict[str, float]) -> dict[str, bytes]:
+        """
+        Commands applying a channel levels profile
+
+        Channels already at their target level are skipped.
+
+        :param profile: Level in dB by channel code
+        :return: Command by channel to change
+        """
+        lines = {}
+        for channel, level in profile.items():
+            if channel not in self.levels:
+                logger.warning(f"Unknown channel {channel} in profile.")
+                continue
+            code = encode_channel_level(level)
+            current = self.levels[channel]
+            if current is not None and encode_channel_level(current) == code:
+                continue
+            lines[channel] = f'CV{channel} {code}'.encode('ASCII')
+        return lines
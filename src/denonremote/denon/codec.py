@@ -0,0 +1,100 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon protocol parameter codecs.
+
+Numeric parameters are encoded and decoded arithmetically instead of being enumerated in tables.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Iterator, NamedTuple
+
+
+class Segment(NamedTuple):
+    """Evenly stepped raw values, bounds included"""
+
+    start: int
+    stop: int
+    step: int
+
+    def __contains__(self, value: int) -> bool:
+        return self.start <= value <= self.stop and not (value - self.start) % self.step
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.start, self.stop + 1, self.step))
+
+    def __len__(self) -> int:
+        return (self.stop - self.start) // self.step + 1
+
+
+class SteppedRange(Mapping):
+    """
+    Fixed length integer parameter
+
+    Behaves like the parameters tables: a read-only mapping of raw codes to labels.
+    Nothing is enumerated: memory is constant whatever the range.
+    """
+
+    def __init__(
+            self,
+            length: int,
+            segments: tuple[tuple[int, int, int], ...],
+            label: str,
+            scale: int | float = 1,
+            named: None | dict[str, str] = None,
+    ) -> None:
+        """
+        :param length: Raw code length. Codes are zero padded.
+        :param segments: (start, stop, step) raw values. Bounds included.
+        :param label: Label format of the value. e.g. '{}ms'
+        :param scale: Value of one raw unit
+        :param named: Non-numeric codes. e.g. {'UP': "Up"}
+        """
+        self.length = length
+        self.segments = tuple(Segment(*segment) for segment in segments)
+        self.label = label
+        self.scale = scale
+        self.named = named or {}
+
+    def decode(self, code: str) -> None | int | float:
+        """Value of a raw code. None when invalid."""
+        if len(code) != self.length or not (code.isascii() and code.isdigit()):  # Not Unicode digits
+            return None
+        raw = int(code)
+        if not any(raw in segment for segment in self.segments):
+            return None
+        return raw * self.scale
+
+    def encode(self, value: int | float) -> None | str:
+        """Raw code of a value. None when out of range or off step."""
+        raw = round(value / self.scale)
+        if abs(raw * self.scale - value) > 1e-9 or not any(raw in segment for segment in self.segments):
+            return None
+        return str(raw).zfill(self.length)
+
+    def __getitem__(self, code: str) -> str:
+        label = self.named.get(code)
+        if label is not None:
+            return label
+        value = self.decode(code)
+        if value is None:
+            raise KeyError(code)
+        return self.label.format(value)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.named
+        for segment in self.segments:
+            for raw in segment:
+                yield str(raw).zfill(self.length)
+
+    def __len__(self) -> int:
+        return len(self.named) + sum(len(segment) for segment in self.segments)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.length}, {self.segments}, {self.label!r})"
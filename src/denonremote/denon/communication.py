@@ -5,16 +5,27 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
-from typing import TYPE_CHECKING
+from typing import Callable, Hashable, Iterable, TYPE_CHECKING
 
 import twisted.internet.interfaces
 import twisted.python.failure
-from twisted.internet import reactor, task
+from twisted.internet import defer, reactor
 from twisted.internet.protocol import ClientFactory
 from twisted.protocols.basic import LineOnlyReceiver
-from twisted.protocols.policies import TimeoutMixin
 
-from .dn500av import DN500AVFormat, DN500AVMessage
+from .automation import VolumeRamp
+from .backup import Snapshot, SUBSYSTEMS
+from .channels import ChannelLevels, encode_channel_level
+from .dn500av import DN500AVFormat, DN500AVMessage, SLP_PARAMS, status_subject
+from .liveness import HEARTBEAT_INTERVAL, LivenessMonitor
+from .metrics import ProtocolMetrics
+from .outbound import OutboundQueue, Priority
+from .profiles import DeviceProfile, load_profile
+from .quarantine import Quarantine
+from .reconnect import ReconnectScheduler
+from .rew import RoomCorrection
+from .tracing import ProtocolLogger
+from .zone2 import Zone2, ZONE2_COMMANDS
 
 if TYPE_CHECKING:
     from denonremote.gui import DenonRemoteApp
@@ -25,8 +36,36 @@ logger = logging.getLogger(__name__)
 # TODO: Implement Serial ?
 # See: https://twistedmatrix.com/documents/15.4.0/api/twisted.internet.serialport.SerialPort.html
 
+INTERACTIVE_COMMANDS = ('PW', 'MV', 'MU')
+"""Commands sent on the interactive lane by default"""
 
-class DenonProtocol(LineOnlyReceiver, TimeoutMixin):
+StatusKey = tuple[str, None | str]
+"""(Command code, subcommand code)"""
+
+MULTILINE_REPLIES = {
+    'CV': 'END',
+}
+"""Parameter terminating the reply of queries spanning several lines by command"""
+
+
+def status_key(line: bytes, profile: None | DeviceProfile = None) -> StatusKey:
+    """
+    Status key a line is about
+
+    Queries get the key of their replies (See DN500AVMessage.status_key).
+    e.g. b'PSBAS 47' and b'PSBAS ?' -> ('PS', 'BAS'), b'Z2QUICK1' and b'Z2QUICK ?' -> ('Z2', 'QUICK')
+    """
+    profile = profile or load_profile()
+    text = line.decode('ASCII', 'replace').removesuffix('?').rstrip()
+    command = profile.match_command(text) or 'unknown'
+    parameter = text[len(command):]
+    subcommand = profile.match_subcommand(command, parameter)
+    if subcommand is not None:
+        return command, subcommand
+    return command, status_subject(command, parameter)
+
+
+class DenonProtocol(LineOnlyReceiver):
     # From DN-500 manual (DN-500AVEM_ENG_CD-ROM_v00.pdf) page 91 (97 in PDF form)
     MAX_LENGTH: int = 135
     DELAY: float = .2
@@ -35,84 +74,236 @@ class DenonProtocol(LineOnlyReceiver, TimeoutMixin):
     The documentation requires 200 ms.
     20 ms seems safe.
     """
-    DEFAULT_TIMEOUT: float = .2
-    """
-    Changing sources takes way more than 200ms.
-    Let's bump this case to 5 seconds to prevent spurious disconnections.
-    """
     delimiter: bytes
     factory: 'DenonClientFactory'
-    ongoing_calls: int
-    timeOut: float
+    metrics: None | ProtocolMetrics = None
+    """Instrumentation. Disabled when None."""
+    channels: ChannelLevels
+    """Per channel levels"""
+    liveness: LivenessMonitor
+    """Reply deadlines and heartbeats"""
+    outbound: OutboundQueue
+    """Paced priority lanes"""
+    profile: DeviceProfile
+    """Device model tables"""
+    quarantine: Quarantine
+    """Unrecognized lines. Shared by the connections of a factory."""
+    ramp: VolumeRamp
+    """Master Volume fades"""
+    QUERY_CACHE_TTL: float = 1.
+    """
+    Queries are answered from the known status for this long in seconds.
+    The status is kept up to date by every received line, including unsolicited ones.
+    """
+    QUERY_TIMEOUT: float = 5.
+    """
+    Queries fail when not answered after this long in seconds.
+    Some status are not answered depending on the receiver state.
+    """
+    REFRESH_TIMEOUT: float = 5.
+    """
+    Batch refreshes give up waiting for a reply after this long in seconds.
+    Some status are not answered depending on the receiver state.
+    """
+    status: dict[StatusKey, tuple[float, DN500AVMessage]]
+    """Latest message received and its reception time by status key"""
+    trace: ProtocolLogger = ProtocolLogger(logging.getLogger(__name__))
+    """Structured per-line logging"""
     transport: twisted.internet.interfaces.ITCPTransport
+    zone2: Zone2
+    """Zone 2 control and status"""
 
     def __init__(self):
         self.delimiter = b'\r'
-        self.ongoing_calls = 0  # Delay handling.
+        self.profile = load_profile()
+        self.liveness = LivenessMonitor(self)
+        self.status = {}
+        self.channels = ChannelLevels()
+        self.outbound = OutboundQueue(self._write, self.DELAY)
+        self._pending_queries: dict[StatusKey, list[defer.Deferred]] = {}
+        self.zone2 = Zone2(self)
+        self.ramp = VolumeRamp(self)
+        self.quarantine = Quarantine()
 
     def connectionMade(self) -> None:
         logger.debug("Connection made")
+        self.metrics = self.factory.metrics
+        self.profile = self.factory.profile
+        self.quarantine = self.factory.quarantine
+        self.liveness.interval = self.factory.heartbeat_interval
+        self.liveness.start()
         if self.factory.gui:
             self.factory.app.on_connection(self)
 
+    def connectionLost(self, reason: twisted.python.failure.Failure = None) -> None:
+        self.liveness.stop()
+        self.ramp.cancel()
+        self.outbound.clear()
+        pending, self._pending_queries = self._pending_queries, {}
+        for deferreds in pending.values():
+            for deferred in deferreds:
+                deferred.errback(reason)
+        super().connectionLost(reason)
+
+    @property
+    def ongoing_calls(self) -> int:
+        """Requests waiting for a reply"""
+        return len(self.liveness.pending)
+
     def timeoutConnection(self) -> None:
+        """The link is down"""
         logger.debug("Connection timed out")
+        self.outbound.clear()
         self.transport.abortConnection()
         if self.factory.gui:
             self.factory.app.on_timeout()
 
-    def sendLine(self, line: bytes) -> task.Deferred | None:
-        deferred = None
+    def sendLine(
+            self,
+            line: bytes,
+            priority: None | Priority = None,
+            key: None | Hashable = None,
+            sent: None | Callable[[], None] = None,
+    ) -> None:
+        """
+        Queue a line
+
+        :param line: Command or query
+        :param priority: Lane. Defaults to BACKGROUND for queries,
+            INTERACTIVE for INTERACTIVE_COMMANDS and STATE for other commands.
+        :param key: Coalescing key. Only the latest line queued with the same key is sent.
+        :param sent: Called once the line is sent
+        """
         line_len = len(line)
         if line_len > self.MAX_LENGTH:
-            logger.warning(f'Line too long (>{self.MAX_LENGTH}): {line_len}')
+            logger.warning("Line too long (>%i): %i", self.MAX_LENGTH, line_len)
         if b'?' not in line:
-            logger.debug(f"Sending line: {line.decode('ASCII')}")
-            super().sendLine(line)
+            # The status will change
+            self.status.pop(status_key(line, self.profile), None)
+        if priority is None:
+            command = self.profile.match_command(line.decode('ASCII', 'replace'))
+            if b'?' in line:
+                priority = Priority.BACKGROUND
+            elif command in INTERACTIVE_COMMANDS:
+                priority = Priority.INTERACTIVE
+            else:
+                priority = Priority.STATE
+        logger.debug("Queuing line %r on the %s lane (Queued: %i)", line, priority.name, len(self.outbound))
+        self.outbound.put(line, priority, key, sent)
+
+    def _write(self, line: bytes) -> None:
+        self.trace.sent(line)
+        self.liveness.sent(line)  # Requests expect a reply
+        if self.metrics is not None:
+            self.metrics.command_sent(line)
+            if b'?' in line:
+                self.metrics.request_sent(self.ongoing_calls)
+        super().sendLine(line)
+
+    def query(self, line: bytes, priority: Priority = Priority.BACKGROUND) -> defer.Deferred:
+        """
+        Ask for a status
+
+        Identical queries in flight share the same reply.
+        Fresh known status is answered without querying the receiver.
+
+        :param line: Query. e.g. b'MV?'
+        :param priority: Lane
+        :return: Deferred firing with the reply message
+        """
+        key = status_key(line, self.profile)
+        cached = self.status.get(key)
+        if cached is not None and reactor.seconds() - cached[0] < self.QUERY_CACHE_TTL:
+            logger.debug("Query %r answered from cache", line)
+            for message in self._matching_status(key):
+                self._dispatch(message)
+            return defer.succeed(cached[1])
+
+        deferred = defer.Deferred()
+        deferred.addTimeout(self.QUERY_TIMEOUT, reactor)
+        deferred.addErrback(self._forget_query, key, deferred)
+        pending = self._pending_queries.get(key)
+        if pending:
+            logger.debug("Query %r already in flight", line)
+            pending.append(deferred)
         else:
-            # A request is made. We need to delay the next calls
-            self.ongoing_calls += 1
-            logger.debug(f'Ongoing calls for delay: {self.ongoing_calls}')
-            delay = 0  # Send now
-            if self.ongoing_calls > 0:
-                delay = self.DELAY * (self.ongoing_calls - 1)  # Send after other messages
-            logger.debug(f"Will send line: {line} in {delay} seconds")
-            deferred = task.deferLater(
-                reactor,
-                delay=delay,
-                callable=self.sendLineWithTimeout,
-                line=line,
-            )
+            self._pending_queries[key] = [deferred]
+            self.sendLine(line, priority)
         return deferred
 
-    # noinspection PyPep8Naming
-    def sendLineWithTimeout(self, line: bytes) -> None:
-        timeout = self.DEFAULT_TIMEOUT
-        if self.timeOut:
-            timeout += self.timeOut
-        self.setTimeout(timeout)
-        logger.debug(f"Sending line with timeout ({timeout} s): {line.decode('ASCII')}")
-        super().sendLine(line)
+    def _forget_query(
+            self,
+            failure: twisted.python.failure.Failure,
+            key: StatusKey,
+            deferred: defer.Deferred,
+    ) -> twisted.python.failure.Failure:
+        """Stop waiting for the reply of a failed query. The next identical query is sent again."""
+        pending = self._pending_queries.get(key, [])
+        if deferred in pending:
+            pending.remove(deferred)
+            if not pending:
+                del self._pending_queries[key]
+        return failure
+
+    def _matching_status(self, key: StatusKey) -> list[DN500AVMessage]:
+        """Fresh messages answering a query. A query without subcommand is answered by all subcommands."""
+        now = reactor.seconds()
+        return [
+            message for (command, subcommand), (received, message) in self.status.items()
+            if command == key[0] and (key[1] is None or subcommand == key[1])
+            and now - received < self.QUERY_CACHE_TTL
+        ]
+
+    def _resolve_queries(self, message: DN500AVMessage) -> None:
+        keys = [message.status_key]
+        terminator = MULTILINE_REPLIES.get(message.command_code)
+        if terminator is None or message.parameter_code == terminator:
+            keys.append((message.command_code, None))
+        for key in keys:
+            for deferred in self._pending_queries.pop(key, ()):
+                deferred.callback(message)
 
     def lineReceived(self, line: bytes) -> None:
-        if self.ongoing_calls:
-            # We received a reply
-            self.resetTimeout()
-            self.ongoing_calls -= 1
-            logger.debug(f"Ongoing calls for delay: {self.ongoing_calls}")
-        else:
-            # Disable timeout, we don't expect any other command.
-            self.setTimeout(None)
-        logger.debug(f"Receive remaining timeout: {self.timeOut}")
-        receiver = DN500AVMessage()
+        try:
+            self._process(line)
+        except Exception as e:  # An exception here would drop the connection
+            self.liveness.received(None)  # Still alive
+            self.quarantine.add(line, f"failing ({e.__class__.__name__}: {e})")
+            logger.debug("Failed processing line %r", line, exc_info=True)
+
+    def _process(self, line: bytes) -> None:
+        receiver = DN500AVMessage(self.profile)
         receiver.parse_response(line)
-        logger.info(f"Received line: {receiver.response}")
-
-        # FIXME: parse message into state
-
+        terminator = MULTILINE_REPLIES.get(receiver.command_code)
+        latency = self.liveness.received(  # None when unsolicited
+            receiver.command_code, terminator is None or receiver.parameter_code == terminator
+        )
+        self.trace.received(line, receiver, latency)
+        if self.metrics is not None:
+            self.metrics.line_received(receiver, self.ongoing_calls, latency)
+
+        if receiver.command_label is None:
+            self.quarantine.add(line, "unknown command")
+            return  # Nothing to update
+        logger.info("Received line: %s", receiver.response)
+        if receiver.parameter_code is None:
+            self.quarantine.add(line, "unknown parameter")  # Still a reply
+        self.status[receiver.status_key] = (reactor.seconds(), receiver)
+        self._resolve_queries(receiver)
+        self.channels.update(receiver)
+        self.zone2.state.update(receiver)
+        self.ramp.update(receiver)
+
+        if receiver.command_code == 'PW' and self.factory.reconnect is not None:
+            self.factory.reconnect.healthy()  # Health probe answered
+
+        self._dispatch(receiver)
+
+    def _dispatch(self, receiver: DN500AVMessage) -> None:
         # FIXME: abstract away with a callback to the factory
+
         if self.factory.gui:
-            self.factory.app.print_debug(receiver.response)
+            self.factory.app.print_debug(receiver.response, command=receiver.command_code or '')
 
             # POWER
             if receiver.command_code == 'PW':
@@ -124,9 +315,9 @@ class DenonProtocol(LineOnlyReceiver, TimeoutMixin):
             # VOLUME
             if receiver.command_code == 'MV':
                 if receiver.subcommand_code is None:
-                    self.factory.app.update_volume(receiver.parameter_label)
+                    self.factory.app.update_volume(receiver.parameter_code)
                 elif receiver.subcommand_code == 'MAX':
-                    self.factory.app.update_max_volume(receiver.parameter_label)
+                    self.factory.app.update_max_volume(receiver.parameter_code)
 
             # MUTE
             if receiver.command_code == 'MU':
@@ -140,8 +331,26 @@ class DenonProtocol(LineOnlyReceiver, TimeoutMixin):
                 source = receiver.parameter_code
                 self.factory.app.set_sources(source)
 
+            # CHANNEL VOLUME
+            if receiver.command_code == 'CV':
+                self.factory.app.update_channel_levels()
+
+            # ZONE 2
+            if receiver.command_code in ZONE2_COMMANDS:
+                self.factory.app.update_zone2()
+
+    @staticmethod
+    def _query_dropped(failure: twisted.python.failure.Failure) -> None:
+        # Fire and forget: replies are dispatched to the GUI
+        logger.debug("Query dropped: %s", failure.value)
+
+    def request_status(self) -> None:
+        """Sweep all status on the background lane"""
+        for line in self.profile.status_requests:
+            self.query(line.encode('ASCII')).addErrback(self._query_dropped)
+
     def get_power(self) -> None:
-        self.sendLine('PW?'.encode('ASCII'))
+        self.query('PW?'.encode('ASCII')).addErrback(self._query_dropped)
 
     def set_power(self, state: bool) -> None:
         logger.debug("Entering power callback")
@@ -150,8 +359,18 @@ class DenonProtocol(LineOnlyReceiver, TimeoutMixin):
         else:
             self.sendLine('PWSTANDBY'.encode('ASCII'))
 
+    def set_sleep(self, minutes: None | int) -> None:
+        """
+        :param minutes: Sleep timer. None to disable.
+        """
+        code = 'OFF' if minutes is None else SLP_PARAMS.encode(minutes)
+        if code is None:
+            logger.warning(f"Set sleep timer {minutes} is invalid.")
+            return
+        self.sendLine(('SLP' + code).encode('ASCII'), key=('SLP', None))
+
     def get_volume(self) -> None:
-        self.sendLine('MV?'.encode('ASCII'))
+        self.query('MV?'.encode('ASCII')).addErrback(self._query_dropped)
 
     def set_volume(self, value: str) -> None:
         raw_value = DN500AVFormat().mv_reverse_params.get(value)
@@ -159,10 +378,32 @@ class DenonProtocol(LineOnlyReceiver, TimeoutMixin):
             logger.warning(f"Set volume value {value} is invalid.")
         else:
             message = 'MV' + raw_value
-            self.sendLine(message.encode('ASCII'))
+            # Only the latest absolute volume matters
+            key = None if raw_value in ('UP', 'DOWN') else 'MV'
+            self.sendLine(message.encode('ASCII'), key=key)
+
+    def fade_volume(self, target: float, duration: float) -> defer.Deferred:
+        """
+        Fade the Master Volume
+
+        :param target: Volume in dB
+        :param duration: Fade duration in seconds
+        :return: Deferred firing with True once the target is reached, False when cancelled or retargeted
+        """
+        return self.ramp.fade(target, duration)
+
+    def duck_volume(self, offset: float, duration: float) -> defer.Deferred:
+        """
+        Fade the Master Volume by a relative amount
+
+        :param offset: Volume change in dB. e.g. -12
+        :param duration: Fade duration in seconds
+        :return: Deferred firing with True once the target is reached, False when cancelled or retargeted
+        """
+        return self.ramp.duck(offset, duration)
 
     def get_mute(self) -> None:
-        self.sendLine('MU?'.encode('ASCII'))
+        self.query('MU?'.encode('ASCII')).addErrback(self._query_dropped)
 
     def set_mute(self, state: bool) -> None:
         if state:
@@ -171,28 +412,183 @@ class DenonProtocol(LineOnlyReceiver, TimeoutMixin):
             self.sendLine('MUOFF'.encode('ASCII'))
 
     def get_source(self) -> None:
-        self.sendLine('SI?'.encode('ASCII'))
+        self.query('SI?'.encode('ASCII')).addErrback(self._query_dropped)
 
     def set_source(self, source: str) -> None:
         message = 'SI' + source
         self.sendLine(message.encode('ASCII'))
 
+    def get_channel_levels(self) -> None:
+        self.query('CV?'.encode('ASCII')).addErrback(self._query_dropped)
+
+    def set_channel_level(self, channel: str, level: float) -> None:
+        message = f'CV{channel} {encode_channel_level(level)}'
+        # Only the latest level of a channel matters
+        self.sendLine(message.encode('ASCII'), Priority.INTERACTIVE, key=('CV', channel))
+
+    def apply_channel_profile(self, profile: dict[str, float]) -> int:
+        """
+        Set the levels of several channels as one paced batch
+
+        Only channels that are not already at their target level are written.
+
+        :param profile: Level in dB by channel code
+        :return: Number of commands sent
+        """
+        lines = self.channels.diff(profile)
+        for channel, line in lines.items():
+            self.sendLine(line, Priority.STATE, key=('CV', channel))
+        return len(lines)
+
+    def apply_room_correction(
+            self,
+            correction: RoomCorrection,
+            progress: None | Callable[[int, int], None] = None,
+    ) -> defer.Deferred:
+        """
+        Apply an imported room correction
+
+        The current levels are retrieved first. Only the differences are written, as one paced batch.
+
+        :param correction: Imported room correction
+        :param progress: Called with (sent, total) after each command is sent
+        :return: Deferred firing with the number of commands queued
+        """
+        queries = [b'CV?', b'PSTONE CTRL ?', b'PSBAS ?', b'PSTRE ?']
+
+        def apply(_) -> int:
+            status = {key: message.parameter_code for key, (_, message) in self.status.items()}
+            lines = correction.commands(status)
+            lines.update({('CV', channel): line for channel, line in self.channels.diff(correction.channels).items()})
+            return self._send_batch(lines, progress)
+
+        return self._refresh(queries).addCallback(apply)
+
+    def backup(self, subsystems: None | Iterable[str] = None) -> defer.Deferred:
+        """
+        Capture the receiver settings
+
+        :param subsystems: Subsystems to capture. All when None.
+        :return: Deferred firing with the Snapshot
+        """
+        def capture(_) -> Snapshot:
+            snapshot = Snapshot.from_status(self.status)
+            if subsystems is not None:
+                commands = {command for name in subsystems for command in SUBSYSTEMS[name]}
+                snapshot.lines = {key: line for key, line in snapshot.lines.items() if key[0] in commands}
+            return snapshot
+
+        return self._refresh(self._status_requests(subsystems)).addCallback(capture)
+
+    def restore(
+            self,
+            snapshot: Snapshot,
+            subsystems: None | Iterable[str] = None,
+            progress: None | Callable[[int, int], None] = None,
+    ) -> defer.Deferred:
+        """
+        Restore the receiver settings
+
+        The current settings are retrieved first.
+        Only the differences are written, as one paced batch in dependency order.
+
+        :param snapshot: Settings to restore
+        :param subsystems: Subsystems to restore. All when None.
+        :param progress: Called with (sent, total) after each command is sent
+        :return: Deferred firing with the number of commands queued
+        """
+        def apply(_) -> int:
+            current = {key: message.raw for key, (_, message) in self.status.items()}
+            return self._send_batch(snapshot.diff(current, subsystems), progress)
+
+        return self._refresh(self._status_requests(subsystems)).addCallback(apply)
+
+    def _status_requests(self, subsystems: None | Iterable[str] = None) -> list[bytes]:
+        """Status queries of subsystems. All when None."""
+        names = SUBSYSTEMS if subsystems is None else subsystems
+        commands = {command for name in names for command in SUBSYSTEMS[name]}
+        return [
+            line.encode('ASCII') for line in self.profile.status_requests
+            if '?' in line and self.profile.match_command(line) in commands
+        ]
+
+    def _refresh(self, queries: list[bytes]) -> defer.Deferred:
+        """Query several status. Fires once all are answered, failed or timed out."""
+        return defer.DeferredList(
+            [self.query(line).addTimeout(self.REFRESH_TIMEOUT, reactor) for line in queries],
+            consumeErrors=True,
+        )
+
+    def _send_batch(
+            self,
+            lines: dict[Hashable, bytes],
+            progress: None | Callable[[int, int], None] = None,
+    ) -> int:
+        """
+        Queue commands as one paced batch on the STATE lane
+
+        :param lines: Commands by coalescing key. Sent in order.
+        :param progress: Called with (sent, total) after each command is sent
+        :return: Number of commands queued
+        """
+        total = len(lines)
+        sent = 0
+
+        def count() -> None:
+            nonlocal sent
+            sent += 1
+            if progress is not None:
+                progress(sent, total)
+
+        for key, line in lines.items():
+            self.sendLine(line, Priority.STATE, key=key, sent=count)
+        return total
+
 
 class DenonClientFactory(ClientFactory):
     gui: bool
+    heartbeat_interval: float = HEARTBEAT_INTERVAL
+    """Idle link probing interval in seconds. Disabled when 0."""
+    metrics: None | ProtocolMetrics = None
+    profile: DeviceProfile
+    quarantine: Quarantine
+    """Unrecognized lines of all the connections"""
+    reconnect: None | ReconnectScheduler = None
     protocol = DenonProtocol
 
-    def __init__(self) -> None:
+    def __init__(
+            self,
+            metrics: None | ProtocolMetrics = None,
+            profile: None | DeviceProfile = None,
+            quarantine: None | Quarantine = None,
+            heartbeat_interval: float = HEARTBEAT_INTERVAL,
+    ) -> None:
         self.gui = False
+        self.heartbeat_interval = heartbeat_interval
+        self.metrics = metrics
+        self.profile = profile or load_profile()
+        self.quarantine = Quarantine() if quarantine is None else quarantine
 
 
 class DenonClientGUIFactory(ClientFactory):
     app: 'DenonRemoteApp'  # TODO: Extract interface
+    heartbeat_interval: float = HEARTBEAT_INTERVAL
+    """Idle link probing interval in seconds. Disabled when 0."""
+    metrics: None | ProtocolMetrics = None
+    profile: DeviceProfile
+    quarantine: Quarantine
+    """Unrecognized lines of all the connections"""
+    reconnect: None | ReconnectScheduler = None
     protocol = DenonProtocol
 
-    def __init__(self, app) -> None:
+    def __init__(self, app, profile: None | DeviceProfile = None) -> None:
         self.gui = True
         self.app = app
+        self.metrics = app.metrics
+        self.profile = profile or load_profile()
+        self.quarantine = app.quarantine
+        self.heartbeat_interval = app.config.getfloat('denonremote', 'heartbeat_interval')
+        self.reconnect = app.reconnect
         import kivy.logger
         global logger
         logger = kivy.logger.Logger
@@ -0,0 +1,261 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon receivers discovery.
+
+Subnets are scanned with concurrent connection probes to the telnet port.
+Candidates are confirmed with a power status request (PW?).
+SSDP/UPnP announcements are also accepted as candidates.
+
+Scan results only list the receivers answering that scan and the ones recently confirmed from announcements:
+receivers switched off or moved to another address are dropped once the results expire.
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import logging
+import socket
+from typing import TYPE_CHECKING
+
+from twisted.internet import defer, endpoints, reactor
+from twisted.internet.protocol import DatagramProtocol
+from twisted.protocols.basic import LineOnlyReceiver
+
+from .dn500av import DN500AVMessage
+
+if TYPE_CHECKING:
+    import twisted.internet.interfaces
+
+logger = logging.getLogger(__name__)
+
+TELNET_PORT = 23
+
+PROBE_TIMEOUT: float = .3
+"""Connection and handshake timeout of a single host in seconds"""
+
+CONCURRENCY = 128
+"""Simultaneous probes. A /24 is scanned in 2 rounds."""
+
+CACHE_TTL: float = 300.
+"""Scan results and announced receivers lifetime in seconds"""
+
+MAX_HOSTS = 1024
+"""Largest subnet scanned in addresses. A /22."""
+
+SSDP_ADDRESS = '239.255.255.250'
+SSDP_PORT = 1900
+SSDP_SEARCH = (
+    'M-SEARCH * HTTP/1.1\r\n'
+    f'HOST: {SSDP_ADDRESS}:{SSDP_PORT}\r\n'
+    'MAN: "ssdp:discover"\r\n'
+    'MX: 1\r\n'
+    'ST: upnp:rootdevice\r\n'
+    '\r\n'
+)
+
+
+def local_network(prefix: int = 24) -> None | str:
+    """
+    Guess the local network
+
+    Connecting a UDP socket only resolves the route: no packet is sent.
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect((SSDP_ADDRESS, SSDP_PORT))
+            address = sock.getsockname()[0]
+    except OSError:
+        return None
+    return str(ipaddress.ip_interface(f'{address}/{prefix}').network)
+
+
+def scan_network(network: str) -> ipaddress.IPv4Network:
+    """
+    Validate a subnet to scan
+
+    :param network: Subnet in CIDR notation. e.g. 192.168.1.0/24
+    :raise ValueError: Invalid, not IPv4 or larger than MAX_HOSTS
+    """
+    try:
+        subnet = ipaddress.ip_network(network.strip(), strict=False)
+    except ValueError as e:
+        raise ValueError(f"Invalid network {network!r}") from e
+    if not isinstance(subnet, ipaddress.IPv4Network):
+        raise ValueError(f"Not an IPv4 network: {network!r}")
+    if subnet.num_addresses > MAX_HOSTS:
+        raise ValueError(f"Network {network!r} too large to scan (more than {MAX_HOSTS} addresses)")
+    return subnet
+
+
+class HandshakeProtocol(LineOnlyReceiver):
+    """Ask for the power status and wait for a valid reply"""
+
+    delimiter = b'\r'
+
+    def __init__(self) -> None:
+        self.reply = defer.Deferred(lambda _: self.transport.abortConnection())
+
+    def connectionMade(self) -> None:
+        self.sendLine(b'PW?')
+
+    def lineReceived(self, line: bytes) -> None:
+        message = DN500AVMessage()
+        message.parse_response(line)
+        if message.command_code == 'PW' and message.parameter_code is not None:
+            self.transport.loseConnection()
+            if not self.reply.called:
+                self.reply.callback(message.parameter_code)
+
+    def connectionLost(self, reason=None) -> None:
+        if not self.reply.called:
+            self.reply.errback(reason)
+
+
+class ReceiverDiscovery:
+    """
+    Find receivers on the network
+
+    Results are cached by subnet for CACHE_TTL seconds.
+    """
+
+    found: dict[str, tuple[float, str]]
+    """(Confirmation time, power status) of the receivers confirmed from announcements by address"""
+
+    def __init__(
+            self,
+            port: int = TELNET_PORT,
+            timeout: float = PROBE_TIMEOUT,
+            concurrency: int = CONCURRENCY,
+            ttl: float = CACHE_TTL,
+            clock: twisted.internet.interfaces.IReactorTime = reactor,
+    ) -> None:
+        """
+        :param port: Receivers telnet port
+        :param timeout: Single host probe timeout in seconds
+        :param concurrency: Simultaneous probes
+        :param ttl: Scan results and announced receivers lifetime in seconds
+        :param clock: Reactor. Must also provide TCP.
+        """
+        self.port = port
+        self.timeout = timeout
+        self.ttl = ttl
+        self.clock = clock
+        self.found = {}
+        self._semaphore = defer.DeferredSemaphore(concurrency)
+        self._cache: dict[str, tuple[float, list[str]]] = {}
+        self._announced: set[str] = set()
+        """Announced hosts being probed"""
+
+    def probe(self, host: str) -> defer.Deferred:
+        """
+        Check that a host is a receiver
+
+        :return: Deferred firing with the power status or None
+        """
+        endpoint = endpoints.TCP4ClientEndpoint(self.clock, host, self.port)
+        deferred = endpoints.connectProtocol(endpoint, HandshakeProtocol())
+        deferred.addCallback(lambda protocol: protocol.reply)
+        deferred.addTimeout(self.timeout, self.clock)
+        deferred.addErrback(lambda _: None)
+        return deferred
+
+    def announced(self, host: str) -> None:
+        """A host announced itself. Probed unless recently confirmed."""
+        confirmed = self.found.get(host)
+        if host in self._announced or confirmed is not None and self.clock.seconds() - confirmed[0] < self.ttl:
+            return
+        self._announced.add(host)
+
+        def done(status: None | str) -> None:
+            self._announced.discard(host)
+            if status is None:
+                self.found.pop(host, None)
+            else:
+                logger.debug("Found announced receiver at %s", host)
+                self.found[host] = (self.clock.seconds(), status)
+
+        self.probe(host).addCallback(done)
+
+    def scan(self, network: str) -> defer.Deferred:
+        """
+        Probe every host of a subnet
+
+        :param network: Subnet in CIDR notation. e.g. 192.168.1.0/24
+        :return: Deferred firing with the sorted addresses of the receivers found
+        :raise ValueError: Invalid network. See scan_network().
+        """
+        subnet = scan_network(network)
+        now = self.clock.seconds()
+        cached = self._cache.get(str(subnet))
+        if cached is not None and now - cached[0] < self.ttl:
+            return defer.succeed(cached[1])
+
+        hosts = [str(host) for host in subnet.hosts()]
+        logger.debug("Scanning %i hosts of %s", len(hosts), subnet)
+        probes = [self._semaphore.run(self.probe, host) for host in hosts]
+
+        def done(results: list[tuple[bool, None | str]]) -> list[str]:
+            now = self.clock.seconds()
+            receivers = set()
+            for host, (_, status) in zip(hosts, results):
+                if status is None:
+                    self.found.pop(host, None)  # Gone since announced
+                else:
+                    receivers.add(host)
+            # Also the receivers recently confirmed from announcements
+            receivers.update(
+                host for host, (confirmed, _) in self.found.items()
+                if now - confirmed < self.ttl and ipaddress.ip_address(host) in subnet
+            )
+            found = [str(address) for address in sorted(map(ipaddress.ip_address, receivers))]
+            logger.debug("Found receivers on %s: %s", subnet, found)
+            self._cache[str(subnet)] = (now, found)
+            return found
+
+        return defer.DeferredList(probes).addCallback(done)
+
+    def invalidate(self) -> None:
+        """Forget the scan results and the announced receivers"""
+        self._cache.clear()
+        self.found.clear()
+
+
+class SSDPListener(DatagramProtocol):
+    """
+    Listen to SSDP/UPnP announcements
+
+    Any announcing host is a candidate. Only confirmed receivers are kept.
+    """
+
+    def __init__(self, discovery: ReceiverDiscovery) -> None:
+        self.discovery = discovery
+
+    def startProtocol(self) -> None:
+        self.transport.joinGroup(SSDP_ADDRESS).addCallbacks(
+            lambda _: self.search(),
+            lambda failure: logger.warning(f"Unable to join the SSDP multicast group: {failure.value}"),
+        )
+
+    def search(self) -> None:
+        """Ask devices to announce themselves"""
+        self.transport.write(SSDP_SEARCH.encode('ASCII'), (SSDP_ADDRESS, SSDP_PORT))
+
+    def datagramReceived(self, datagram: bytes, address: tuple[str, int]) -> None:
+        if datagram.startswith(b'M-SEARCH'):
+            return
+        self.discovery.announced(address[0])
+
+
+def listen_ssdp(
+        discovery: ReceiverDiscovery,
+        reactor_: twisted.internet.interfaces.IReactorMulticast = reactor,
+) -> SSDPListener:
+    """Start listening to SSDP announcements"""
+    listener = SSDPListener(discovery)
+    reactor_.listenMulticast(SSDP_PORT, listener, listenMultiple=True)
+    return listener
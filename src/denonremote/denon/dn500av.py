@@ -14,8 +14,15 @@ from __future__ import annotations
 
 import logging
 
+from .codec import SteppedRange
+from .frozen import load as load_frozen
+from .profiles import DeviceProfile
+
 logger = logging.getLogger(__name__)
 
+FROZEN: None | dict = load_frozen()
+"""Precompiled tables. See frozen.py."""
+
 
 def srange(start: int | float, stop: int | float, step: int | float, length: int) -> str:
     """Generate consecutive numbers as fixed length strings"""
@@ -64,9 +71,14 @@ COMMANDS = {
     'SS': "System Settings"
 }
 
-# FIXME: compute dynamically
-COMMANDS_MAX_SIZE = 4
-COMMANDS_MIN_SIZE = 2
+COMMANDS_MAX_SIZE = max(len(command) for command in COMMANDS)
+COMMANDS_MIN_SIZE = min(len(command) for command in COMMANDS)
+
+
+def match_command(status_command: str) -> None | str:
+    """Command code a status command starts with"""
+    return PROFILE.match_command(status_command)
+
 
 # ----------
 # Page 93 (99 in PDF form)
@@ -94,10 +106,6 @@ MV_SUBCOMMANDS = {  # Undocumented
     'MAX': 'Maximum'
 }
 
-# FIXME: compute dynamically
-MV_SUBCOMMANDS_MAX_SIZE = 3
-MV_SUBCOMMANDS_MIN_SIZE = 3
-
 MV_PARAMS = {
     'UP': "Up",
     'DOWN': "Down",
@@ -106,12 +114,18 @@ MV_PARAMS = {
 
 
 def compute_master_volume_label(value: str, zerodb_ref: int = MASTER_VOLUME_ZERODB_REF) -> str:
-    """Convert Master Volume ASCII value to dB"""
+    """
+    Convert Master Volume ASCII value to dB
+
+    :raise ValueError: Not a 2 or 3 digits value
+    """
     # TODO: Handle absolute values
     label = '---.-dB'
     result = None
+    if not (value.isascii() and value.isdigit()):
+        raise ValueError(f"Master volume value {value!r} is not a number")
     if int(value[:2]) < MASTER_VOLUME_MIN or int(value[:2]) > MASTER_VOLUME_MAX:
-        logger.error(f"Master volume value {value} out of bounds ({MASTER_VOLUME_MIN}-{MASTER_VOLUME_MAX})")
+        logger.error("Master volume value %s out of bounds (%i-%i)", value, MASTER_VOLUME_MIN, MASTER_VOLUME_MAX)
     # Quirks
     elif len(value) == VOLUME_MIN_LEN:
         if value == '99':
@@ -136,11 +150,9 @@ def compute_master_volume_label(value: str, zerodb_ref: int = MASTER_VOLUME_ZERO
                 offset = 0
                 if value < zerodb_ref:
                     offset = 1
-                logger.debug("Add offset %i to dB calculation with value %i5", offset, value)
                 result = str(int(value + offset - zerodb_ref)) + ".5"
     else:
-        logger.error(f"Master volume value {value} of lenghth {len(value)} is unparsable")
-        raise ValueError
+        raise ValueError(f"Master volume value {value} of length {len(value)} is unparsable")
 
     # Format label with fixed width like the actual display:
     # [ NEG SIGN or EMPTY ] [ DIGIT er EMPTY ] [ DIGIT ] [ DOT ] [ DIGIT ] [ d ] [ B ]
@@ -151,12 +163,14 @@ def compute_master_volume_label(value: str, zerodb_ref: int = MASTER_VOLUME_ZERO
             result[-3],
             result[-1])
 
-    logger.debug(label)
     return label
 
 
-for volume_value in srange(MASTER_VOLUME_MIN, MASTER_VOLUME_MAX, MASTER_VOLUME_STEP, VOLUME_MIN_LEN):
-    MV_PARAMS[volume_value] = compute_master_volume_label(volume_value)
+if FROZEN is not None:
+    MV_PARAMS = FROZEN['tables']['MV_PARAMS']
+else:
+    for volume_value in srange(MASTER_VOLUME_MIN, MASTER_VOLUME_MAX, MASTER_VOLUME_STEP, VOLUME_MIN_LEN):
+        MV_PARAMS[volume_value] = compute_master_volume_label(volume_value)
 
 ###
 # CHANNEL VOLUME
@@ -167,10 +181,6 @@ CHANNEL_VOLUME_STEP = 0.5
 SW_OFF = 0
 CHANNEL_VOLUME_ZERODB_REF = 50
 
-# FIXME: compute dynamically
-CV_SUBCOMMANDS_MAX_SIZE = 3
-CV_SUBCOMMANDS_MIN_SIZE = 1
-
 CV_SUBCOMMANDS = {
     'FL': "Front Left",
     'FR': "Front Right",
@@ -189,31 +199,33 @@ CV_SUBCOMMANDS = {
 
 CV_PARAMS = {
     'UP': "Up",
-    'DOWN': "Down"
+    'DOWN': "Down",
+    '00': "Off",  # Subwoofer only
+    'END': "End",  # Terminates the CV? replies
     # + Computed volume values
 }
 
 
 def compute_channel_volume_label(value: str) -> str:
     """Convert Channel Volume ASCII value to dB"""
-    label = ''
     # OOB check
     if int(value[:2]) < CHANNEL_VOLUME_MIN or int(value[:2]) > CHANNEL_VOLUME_MAX:
         logger.error(f"Channel volume value {value} out of bounds ({CHANNEL_VOLUME_MIN}-{CHANNEL_VOLUME_MAX})")
-    # General case
-    if len(value) == VOLUME_MIN_LEN:
-        label = str(float(value) - CHANNEL_VOLUME_ZERODB_REF) + "dB"
+    level = int(value[:2]) - CHANNEL_VOLUME_ZERODB_REF
     if len(value) == VOLUME_MAX_LEN:
         # Handle undocumented special case for half dB
-        label = str(int(value[:2]) - CHANNEL_VOLUME_ZERODB_REF) + ".5" + "dB"
-    # Prepend positive values with +
-    if int(value) - CHANNEL_VOLUME_ZERODB_REF >= 0:
-        label = "+" + label
-    return label
+        level += CHANNEL_VOLUME_STEP
+    return f"{level:+.1f}dB"
 
 
-for volume_value in srange(CHANNEL_VOLUME_MIN, CHANNEL_VOLUME_MAX, CHANNEL_VOLUME_STEP, VOLUME_MIN_LEN):
-    CV_PARAMS[volume_value] = compute_channel_volume_label(volume_value)
+if FROZEN is not None:
+    CV_PARAMS = FROZEN['tables']['CV_PARAMS']
+else:
+    # Maximum included
+    for volume_value in srange(
+            CHANNEL_VOLUME_MIN, CHANNEL_VOLUME_MAX + CHANNEL_VOLUME_STEP, CHANNEL_VOLUME_STEP, VOLUME_MIN_LEN
+    ):
+        CV_PARAMS[volume_value] = compute_channel_volume_label(volume_value)
 
 ###
 # MUTE
@@ -291,11 +303,7 @@ SV_PARAMS = {
 ###
 # SLEEP TIMER
 ###
-SLP_PARAMS = {
-    'OFF': "Off",
-    # TODO: generate integers conversion to min from 001 to 120 ASCII
-    '010': "10 minutes"
-}
+SLP_PARAMS = SteppedRange(3, ((1, 120, 1),), "{} minutes", named={'OFF': "Off"})
 
 # ----------
 # Page 95 (101 in PDF form)
@@ -356,10 +364,6 @@ VS_PARAMS = {  # TODO: separate AUDIO subcommand?
 # PARAMETER SETTING
 # Pages 96-97 (102-103 in PDF form)
 ###
-# FIXME: compute dynamically
-PS_SUBCOMMANDS_MAX_SIZE = 10
-PS_SUBCOMMANDS_MIN_SIZE = 2
-
 PS_SUBCOMMANDS = {
     'TONE CTRL': "Tone Control",
     'SB:': "Surround Back Speaker Mode",
@@ -437,8 +441,11 @@ def compute_tone_volume_label(value: str) -> str:
     return label
 
 
-for volume_value in srange(TONE_MIN, TONE_MAX, TONE_STEP, TONE_LEN):
-    PS_BAS_PARAMS[volume_value] = compute_tone_volume_label(volume_value)
+if FROZEN is not None:
+    PS_BAS_PARAMS = FROZEN['tables']['PS_BAS_PARAMS']
+else:
+    for volume_value in srange(TONE_MIN, TONE_MAX + TONE_STEP, TONE_STEP, TONE_LEN):  # Maximum included
+        PS_BAS_PARAMS[volume_value] = compute_tone_volume_label(volume_value)
 
 PS_TRE_PARAMS = PS_BAS_PARAMS
 PS_DRC_PARAMS = {
@@ -484,8 +491,11 @@ def compute_lfe_volume_label(value: str) -> str:
     return label
 
 
-for volume_value in srange(LFE_MIN, LFE_MAX, LFE_STEP, LFE_LEN):
-    PS_LFE_PARAMS[volume_value] = compute_lfe_volume_label(volume_value)
+if FROZEN is not None:
+    PS_LFE_PARAMS = FROZEN['tables']['PS_LFE_PARAMS']
+else:
+    for volume_value in srange(LFE_MIN, LFE_MAX, LFE_STEP, LFE_LEN):
+        PS_LFE_PARAMS[volume_value] = compute_lfe_volume_label(volume_value)
 
 ###
 # EFFECT LEVEL
@@ -513,8 +523,11 @@ def compute_eff_volume_label(value: str) -> str:
     return "+" + label
 
 
-for volume_value in srange(EFF_MIN, EFF_MAX, EFF_STEP, EFF_LEN):
-    PS_EFF_PARAMS[volume_value] = compute_eff_volume_label(volume_value)
+if FROZEN is not None:
+    PS_EFF_PARAMS = FROZEN['tables']['PS_EFF_PARAMS']
+else:
+    for volume_value in srange(EFF_MIN, EFF_MAX, EFF_STEP, EFF_LEN):
+        PS_EFF_PARAMS[volume_value] = compute_eff_volume_label(volume_value)
 
 # ----------
 # Page 97 (103 in PDF form)
@@ -522,44 +535,27 @@ for volume_value in srange(EFF_MIN, EFF_MAX, EFF_STEP, EFF_LEN):
 ###
 # EFFECTS DELAY TIME
 ###
-PS_DEL_PARAMS = {
-    'UP': "Up",
-    'DOWN': "Down",
-    # TODO: generate integer conversion to ms (000 to 999 ASCII)
-    # 3ms/step
-    '000': "0ms",
-    '060': "60ms",
-    # 10ms/step
-    '070': "70ms",
-    '300': "300ms"
-    # Stops at 300ms
-}
+PS_DEL_PARAMS = SteppedRange(
+    3,
+    (
+        (0, 60, 3),  # 3ms/step
+        (70, 300, 10),  # 10ms/step
+    ),
+    "{}ms",
+    named={'UP': "Up", 'DOWN': "Down"},
+)
 
 PS_AFD_PARAMS = MU_PARAMS
 PS_PAN_PARAMS = MU_PARAMS
-PS_DIM_PARAMS = {
-    'UP': "Up",
-    'DOWN': "Down",
-    # TODO: generate integer conversion to dB (00 to 99 ASCII)
-    '00': "0dB",
-    '06': "6dB",
-    # Stops at 6
-}
-PS_CEN_PARAMS = {
-    'UP': "Up",
-    'DOWN': "Down",
-    # TODO: generate integer conversion to dB (00 to 99 ASCII)
-    '00': "0dB",
-    '07': "7dB",
-    # Stops at 7
-}
-PS_CEI_PARAMS = {
-    'UP': "Up",
-    'DOWN': "Down",
-    # TODO: generate integer conversion to dB (00 to 99 ASCII)
-    '00': "0.0dB",
-    '99': "1.0dB",
-}
+PS_DIM_PARAMS = SteppedRange(2, ((0, 6, 1),), "{}dB", named={'UP': "Up", 'DOWN': "Down"})
+PS_CEN_PARAMS = SteppedRange(2, ((0, 7, 1),), "{}dB", named={'UP': "Up", 'DOWN': "Down"})
+PS_CEI_PARAMS = SteppedRange(
+    2,
+    ((0, 10, 1),),
+    "{:.1f}dB",
+    scale=.1,
+    named={'UP': "Up", 'DOWN': "Down", '99': "1.0dB"},  # Documented as 1.0dB
+)
 PS_SW_PARAMS = MU_PARAMS
 PS_RSZ_PARAMS = {
     'S': "Small",
@@ -573,14 +569,7 @@ PS_RSZ_PARAMS = {
 # AUDIO DELAY
 ###
 # FIXME: Report firmware bug: always returns 000.
-PS_DELAY_PARAMS = {
-    'UP': "Up",
-    'DOWN': "Down",
-    # TODO: generate integer conversion to ms (000 to 999 ASCII)
-    '000': "0ms",
-    '200': "200ms",
-    # Stops at 200ms
-}
+PS_DELAY_PARAMS = SteppedRange(3, ((0, 200, 1),), "{}ms", named={'UP': "Up", 'DOWN': "Down"})
 
 ###
 # AUDIO RESTORER
@@ -626,10 +615,21 @@ PS_PARAMS = {
 # FIXME: untested!
 # z2_params = si_params
 Z2_PARAMS = {
+    'ON': "On",
+    'OFF': "Off",
+    'UP': "Up",
+    'DOWN': "Down",
+    'SOURCE': "Source",
+    'QUICK1': "Quick Select 1",
+    'QUICK2': "Quick Select 2",
+    'QUICK3': "Quick Select 3",
+    'QUICK4': "Quick Select 4",
+    'QUICK5': "Quick Select 5",
     'CD': "CD",
     'DVD': "DVD",
     'BD': "BD",
     'SAT/CBL': "SAT/CBL",
+    'GAME': "GAME",
     'DOCK': "DOCK",
     'V.AUX': "VIDEO AUX",
     'IPOD': "IPOD",
@@ -639,8 +639,66 @@ Z2_PARAMS = {
     'USB/IPOD': "USB/IPOD",
 }
 
+# Zone 2 volume uses the Master Volume scale
+Z2_PARAMS.update({code: label for code, label in MV_PARAMS.items() if code.isdigit()})
+
+Z2_POWER = ('ON', 'OFF')
+
+
+def zone2_subject(parameter: str) -> str:
+    """
+    What a Zone 2 parameter is about
+
+    Zone 2 power, volume, source and quick select share the Z2 command without subcommand.
+
+    :return: 'POWER', 'VOLUME', 'SOURCE', 'QUICK' or 'OTHER'
+    """
+    if parameter in Z2_POWER:
+        return 'POWER'
+    if parameter.isdigit() or parameter in ('UP', 'DOWN'):
+        return 'VOLUME'
+    if parameter.startswith('QUICK'):
+        return 'QUICK'
+    if parameter == 'SOURCE' or parameter in SI_PARAMS:
+        return 'SOURCE'
+    return 'OTHER'
+
+
+PARAMETER_SUBJECTS: dict[str, dict[str, str]] = {
+    'MS': {'QUICK': 'QUICK'},
+    'VS': {'AUDIO': 'AUDIO', 'VPM': 'VPM', 'VPN': 'VPM', 'MONI': 'MONI'},  # VPN: Status request spelling
+}
+"""Subject by parameter prefix of the commands setting unrelated settings without subcommand"""
+
+
+def status_subject(command: str, parameter: str) -> None | str:
+    """
+    What a status of a command without subcommand is about
+
+    Some commands set unrelated settings through their parameter alone.
+    e.g. MSQUICK1 recalls a quick select, it's not a surround mode. VSAUDIO AMP and VSVPMAUTO are distinct settings.
+
+    :param command: Command code
+    :param parameter: Raw parameter. Empty for a status request of the whole command.
+    :return: None for the main setting of the command
+    """
+    if not parameter:
+        return None
+    if command == 'Z2':
+        return zone2_subject(parameter)
+    for prefix, subject in PARAMETER_SUBJECTS.get(command, {}).items():
+        if parameter.startswith(prefix):
+            return subject
+    return None
+
+
 Z2MU_PARAMS = MU_PARAMS
 
+Z2CV_SUBCOMMANDS = {
+    'FL': "Front Left",
+    'FR': "Front Right",
+}
+
 Z2CV_PARAMS = CV_PARAMS
 
 Z2SLP_PARAMS = SLP_PARAMS
@@ -785,19 +843,8 @@ SS_PARAMS = {
 COMMANDS_SUBCOMMANDS = {
     'MV': MV_SUBCOMMANDS,
     'CV': CV_SUBCOMMANDS,
-    'PS': PS_SUBCOMMANDS
-}
-
-COMMANDS_SUBCOMMANDS_MAX_SIZE = {
-    'MV': MV_SUBCOMMANDS_MAX_SIZE,
-    'CV': CV_SUBCOMMANDS_MAX_SIZE,
-    'PS': PS_SUBCOMMANDS_MAX_SIZE
-}
-
-COMMANDS_SUBCOMMANDS_MIN_SIZE = {
-    'MV': MV_SUBCOMMANDS_MIN_SIZE,
-    'CV': CV_SUBCOMMANDS_MIN_SIZE,
-    'PS': PS_SUBCOMMANDS_MIN_SIZE
+    'PS': PS_SUBCOMMANDS,
+    'Z2CV': Z2CV_SUBCOMMANDS,
 }
 
 COMMANDS_PARAMS = {
@@ -882,8 +929,16 @@ STATUS_REQUESTS = {
     'OSD ?': "System Control - GUI Setting Status"
 }
 
-
-# TODO: abstract device
+PROFILE = DeviceProfile(
+    'DN-500AV',
+    COMMANDS,
+    COMMANDS_SUBCOMMANDS,
+    COMMANDS_PARAMS,
+    STATUS_REQUESTS,
+    nested_params=('PS',),
+    lookups=None if FROZEN is None else FROZEN['lookups'],
+)
+"""Compiled tables. See profiles.load_profile()."""
 
 
 class DN500AVMessage:
@@ -897,9 +952,21 @@ class DN500AVMessage:
     parameter_code: None | str = None
     parameter_label: None | str = None
     response: None | str = None
+    raw: None | str = None
+    """Decoded status line"""
 
-    def __init__(self) -> None:
-        pass
+    def __init__(self, profile: None | DeviceProfile = None) -> None:
+        """
+        :param profile: Device tables. Defaults to the DN-500AV.
+        """
+        self.profile = profile or PROFILE
+
+    @property
+    def status_key(self) -> tuple[None | str, None | str]:
+        """What the message is about: (command code, subcommand code or subject). See status_subject()."""
+        if self.command_code is None or self.subcommand_code is not None:
+            return self.command_code, self.subcommand_code
+        return self.command_code, status_subject(self.command_code, self.raw[len(self.command_code):])
 
     def parse_response(self, status_command: str | bytes, unicode: bool = False) -> None:
         """
@@ -909,64 +976,52 @@ class DN500AVMessage:
         :param unicode: Decode using UTF-8 rather than ASCII. Use after sending the NSE command.
         :return: Parsed string
         """
+        # Parsing again starts over
+        self.command_code = self.command_label = None
+        self.subcommand_code = self.subcommand_label = None
+        self.parameter_code = self.parameter_label = None
+        self.response = None
+
         # Handle strings and bytes
         if isinstance(status_command, bytes):
-            if unicode:
-                # Parts can be UTF-8 encoded when using the NSE command
-                status_command = status_command.decode('UTF-8')
-            else:
-                status_command = status_command.decode('ASCII')
-
-        logger.debug(f"Received status command: {status_command}")
-
-        # Commands are of known sizes. Try the largest first.
-        for i in range(COMMANDS_MAX_SIZE, COMMANDS_MIN_SIZE - 1, -1):
-            self.command_code = status_command[:i]
-            self.command_label = COMMANDS.get(self.command_code)
-            if self.command_label is not None:
-                break
-
+            # Parts can be UTF-8 encoded when using the NSE command
+            encoding = 'UTF-8' if unicode else 'ASCII'
+            try:
+                status_command = status_command.decode(encoding)
+            except UnicodeDecodeError:
+                # Kept escaped for the logs. Can't match any command.
+                logger.debug("Invalid %s data: %r", encoding, status_command)
+                status_command = status_command.decode(encoding, 'backslashreplace')
+        self.raw = status_command
+
+        profile = self.profile
+        self.command_code = profile.match_command(status_command)
+        self.command_label = profile.commands.get(self.command_code)
         if self.command_label is None:
-            logger.error(f"Command unknown: {status_command}")
+            logger.debug("Command unknown: %s", status_command)
             return
 
-        logger.info(f"Parsed command {self.command_code}: {self.command_label}")
-
         # Trim command from status command stream
         status_command = status_command[len(self.command_code):]
 
         # Handle subcommands
-        if COMMANDS_SUBCOMMANDS.get(self.command_code) is None:
-            logger.debug(f"The command {self.command_code} doesn't have any known subcommands.")
-        else:
-            logger.debug(f"Searching for subcommands in: {status_command}")
-
-            # Subcommands are of known sizes. Try the largest first.
-            for i in range(COMMANDS_SUBCOMMANDS_MAX_SIZE[self.command_code],
-                           COMMANDS_SUBCOMMANDS_MIN_SIZE[self.command_code] - 1, -1):
-                self.subcommand_code = status_command[:i]
-                self.subcommand_label = COMMANDS_SUBCOMMANDS[self.command_code].get(self.subcommand_code)
-                if self.subcommand_label is not None:
-                    break
-
+        subcommands = profile.commands_subcommands.get(self.command_code)
+        if subcommands is not None:
+            self.subcommand_code = profile.match_subcommand(self.command_code, status_command)
+            self.subcommand_label = subcommands.get(self.subcommand_code)
             if self.subcommand_label is None:
-                logger.debug(f"Subcommand unknown. Probably a parameter: {status_command}")
+                # Subcommand unknown. Probably a parameter.
                 self.subcommand_code = None
             else:
-                logger.info(f"Parsed subcommand {self.subcommand_code}: {self.subcommand_label}")
                 # Trim subcommand from status command stream
                 status_command = status_command[
                                  len(self.subcommand_code) + 1:]  # Subcommands have a space before the parameter
 
         # Handle parameters
-        logger.debug(f"Searching for parameters in: {status_command}")
         self.parameter_code = status_command
-        if self.command_code == 'PS':
-            self.parameter_label = COMMANDS_PARAMS[self.command_code][self.subcommand_code].get(self.parameter_code)
-        else:
-            self.parameter_label = COMMANDS_PARAMS[self.command_code].get(self.parameter_code)
+        self.parameter_label = profile.params(self.command_code, self.subcommand_code).get(self.parameter_code)
         if self.parameter_label is None:
-            logger.error(f"Parameter unknown: {status_command}")
+            logger.debug("Parameter unknown: %s", status_command)
             self.parameter_code = None
         else:
             # Trim parameters from status command stream
@@ -974,20 +1029,67 @@ class DN500AVMessage:
 
         # Handle unexpected leftovers
         if status_command:
-            logger.error(f"Unexpected unparsed data found: {status_command}")
+            logger.debug("Unexpected unparsed data found: %s", status_command)
 
         if self.subcommand_label:
             self.response = f"{self.command_label}, {self.subcommand_label}: {self.parameter_label}"
         else:
             self.response = f"{self.command_label}: {self.parameter_label}"
 
+    def encode(self) -> bytes:
+        """Status command of the parsed codes. See encode_command()."""
+        if self.command_code is None:
+            raise ValueError(f"Nothing parsed from {self.raw!r}")
+        return encode_command(self.command_code, self.subcommand_code, self.parameter_code or '')
+
+
+def encode_command(command: str, subcommand: None | str = None, parameter: str = '') -> bytes:
+    """
+    Build a command line. Inverse of DN500AVMessage.parse_response().
+
+    :param command: Command code. e.g. 'CV'
+    :param subcommand: Subcommand code. e.g. 'FL'
+    :param parameter: Parameter code. e.g. '50'
+    :return: Line without the delimiter. e.g. b'CVFL 50'
+    :raise ValueError: Not encodable in ASCII
+    """
+    line = command if subcommand is None else f'{command}{subcommand} '
+    try:
+        return (line + parameter).encode('ASCII')
+    except UnicodeEncodeError as e:
+        raise ValueError(f"Invalid command {line + parameter!r}: {e}") from e
+
+
+def parse_volume_label(label: str) -> float:
+    """
+    Convert a Master Volume label to dB
+
+    Accepts both the fixed width display format and user input (e.g. '- 5.0dB', '-5dB', '-5').
+
+    :param label: Volume label
+    :return: Volume in dB
+    :raises ValueError: if the label is not a number of dB
+    """
+    if label == '---.-dB':
+        return float('-inf')
+    return float(label.replace(' ', '').removesuffix('dB'))
+
 
 class DN500AVFormat:
-    def __init__(self) -> None:
-        self.mv_reverse_params: dict[str:str] = {value: key for key, value in MV_PARAMS.items()}
-
-    def get_raw_volume_value_from_db_value(self, value: str) -> str:
-        logger.debug(f"value: {value}")
-        raw_value = self.mv_reverse_params['value']
-        logger.debug(f"rawvalue: {raw_value}")
-        return raw_value
+    # Computed once for all instances
+    mv_reverse_params: dict[str, str] = {value: key for key, value in MV_PARAMS.items()}
+    mv_db_params: dict[float, str] = {
+        parse_volume_label(value): key for key, value in MV_PARAMS.items() if key.isdigit()
+    }
+
+    def get_raw_volume_value_from_db_value(self, value: str) -> None | str:
+        """
+        Convert a volume in dB to the raw Master Volume value
+
+        :param value: Volume label
+        :return: Raw value or None if the volume is invalid or not on the half dB grid
+        """
+        try:
+            return self.mv_db_params.get(parse_volume_label(value))
+        except ValueError:
+            return None
@@ -0,0 +1,151 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon protocol frozen tables.
+
+The computed parameter tables and the compiled parser lookups are built once at packaging time
+into a marshalled artifact loaded in one read at startup.
+
+The artifact is fingerprinted with its source modules: a stale one is ignored and the tables are computed
+from the source as usual. Frozen applications ship without the sources: the artifact is then trusted.
+
+Build with `python -m denonremote.denon.frozen`. Check with `python -m denonremote.denon.frozen --check`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import logging
+import marshal
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+FROZEN_TABLES = os.path.join(os.path.dirname(__file__), 'tables.marshal')
+
+FROZEN_FORMAT = 1
+
+SOURCES = ('dn500av.py', 'profiles.py', 'codec.py')
+"""Modules the tables are computed from"""
+
+enabled: bool = True
+"""Load the artifact. Disabled to compute the tables from the source."""
+
+COMPUTED_TABLES = ('MV_PARAMS', 'CV_PARAMS', 'PS_BAS_PARAMS', 'PS_LFE_PARAMS', 'PS_EFF_PARAMS')
+"""dn500av tables built by loops at import"""
+
+
+def fingerprint() -> None | str:
+    """
+    Hash of the source modules
+
+    :return: None when the sources are not available (Frozen application)
+    """
+    digest = hashlib.sha256(f'{FROZEN_FORMAT} {marshal.version}'.encode('ASCII'))
+    for name in SOURCES:
+        try:
+            with open(os.path.join(os.path.dirname(__file__), name), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            return None
+    return digest.hexdigest()
+
+
+def load(path: str = FROZEN_TABLES) -> None | dict:
+    """
+    Frozen tables
+
+    :return: None when disabled, missing, unreadable or stale
+    """
+    if not enabled:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            data = marshal.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError) as e:
+        logger.warning(f"Unable to load frozen tables {path}: {e}")
+        return None
+    if not isinstance(data, dict) or data.get('format') != FROZEN_FORMAT:
+        logger.warning(f"Unsupported frozen tables {path}")
+        return None
+    current = fingerprint()
+    if current is not None and data.get('fingerprint') != current:
+        logger.info("Frozen tables are stale. Computing them from the source.")
+        return None
+    return data
+
+
+def _from_source():
+    """dn500av module computed from the source. Reloaded when needed: only use from build tools."""
+    global enabled
+    enabled = False
+    try:
+        module = sys.modules.get('denonremote.denon.dn500av')
+        if module is None:
+            return importlib.import_module('denonremote.denon.dn500av')
+        if module.FROZEN is not None:
+            return importlib.reload(module)
+        return module
+    finally:
+        enabled = True
+
+
+def build(path: str = FROZEN_TABLES) -> str:
+    """
+    Compile the tables from the source
+
+    :return: Artifact path
+    """
+    dn500av = _from_source()
+    data = {
+        'format': FROZEN_FORMAT,
+        'fingerprint': fingerprint(),
+        'tables': {name: dict(getattr(dn500av, name)) for name in COMPUTED_TABLES},
+        'lookups': dn500av.PROFILE.lookups(),
+    }
+    with open(path, 'wb') as f:
+        f.write(marshal.dumps(data))
+    return path
+
+
+def check(path: str = FROZEN_TABLES) -> list[str]:
+    """
+    Compare the artifact with the tables computed from the source
+
+    :return: Names of the differing tables. Ordering matters.
+    """
+    data = load(path)
+    if data is None:
+        return ['<artifact>']
+    dn500av = _from_source()
+    differing = [
+        name for name in COMPUTED_TABLES
+        if list(data['tables'][name].items()) != list(getattr(dn500av, name).items())
+    ]
+    if data['lookups'] != dn500av.PROFILE.lookups():
+        differing.append('lookups')
+    return differing
+
+
+def main(args: list[str]) -> None:
+    if '--check' in args:
+        differences = check()
+        if differences:
+            sys.exit(f"Frozen tables differ from the source: {', '.join(differences)}")
+        print("Frozen tables match the source")
+    else:
+        print(f"Built {build()}")
+
+
+if __name__ == '__main__':
+    # Share the state of the module imported by dn500av
+    from denonremote.denon import frozen
+    frozen.main(sys.argv[1:])
@@ -0,0 +1,226 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon link liveness.
+
+A late reply and a dead link are different things:
+some commands keep the receiver busy for seconds (e.g. switching sources) and delay the replies that follow.
+
+Each request gets a reply deadline from the command deadlines table.
+Commands also delay the replies of the requests sent after them.
+A request is answered by the first line of its command received (the last one of multi-line replies).
+Other lines (echoes, unsolicited status) don't answer anything.
+Older requests still waiting when a later one is answered are given up: some are never answered
+depending on the receiver state (e.g. most queries in standby).
+
+Any received line proves the link alive and clears the misses.
+Replies missing their deadline without any line received since the requests were sent are a miss:
+a Power Status probe is sent right away to confirm the link state.
+The link is only declared down after several consecutive misses.
+
+An idle link is probed on a regular interval so that a silent failure is detected before the user notices.
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+from typing import TYPE_CHECKING
+
+from twisted.internet import reactor
+
+from .outbound import Priority
+
+if TYPE_CHECKING:
+    import twisted.internet.base
+    import twisted.internet.interfaces
+
+    from .communication import DenonProtocol
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE: float = 1.
+"""
+Reply deadline in seconds of the commands not in REPLY_DEADLINES.
+The documentation specifies replies within 200 ms. Leave room for the network.
+"""
+
+REPLY_DEADLINES: dict[str, float] = {
+    'SI': 5.,  # Switching sources
+    'MS': 2.,  # Changing the surround mode
+}
+"""Reply deadline in seconds by command"""
+
+HEARTBEAT_INTERVAL: float = 30.
+"""Idle link probing interval in seconds. Disabled when 0."""
+
+HEARTBEAT = b'PW?'
+"""Probe. Answered in every power state."""
+
+MISS_THRESHOLD = 3
+"""Consecutive misses before declaring the link down"""
+
+
+def deadline_of(line: bytes) -> float:
+    """Reply deadline of a line in seconds"""
+    for command, deadline in REPLY_DEADLINES.items():
+        if line.startswith(command.encode('ASCII')):
+            return deadline
+    return DEFAULT_DEADLINE
+
+
+class LivenessMonitor:
+    """
+    Reply deadlines and idle heartbeats of a connection
+
+    Replies come in the requests order: pending deadlines are kept ascending and a single timer is set
+    for the earliest.
+    """
+
+    def __init__(
+            self,
+            protocol: DenonProtocol,
+            interval: float = HEARTBEAT_INTERVAL,
+            threshold: int = MISS_THRESHOLD,
+            clock: twisted.internet.interfaces.IReactorTime = reactor,
+    ) -> None:
+        """
+        :param protocol: Connection. Its timeoutConnection() is called when the link is down.
+        :param interval: Idle link probing interval in seconds. Disabled when 0.
+        :param threshold: Consecutive misses before declaring the link down
+        :param clock: Time source
+        """
+        self.protocol = protocol
+        self.interval = interval
+        self.threshold = threshold
+        self.clock = clock
+        self.pending: collections.deque[tuple[None | str, float, float]] = collections.deque()
+        """(Command code, sent time, reply deadline) of the requests waiting for a reply. Oldest first."""
+        self.misses = 0
+        """Consecutive expiries without any line received"""
+        self._received: float = float('-inf')
+        """Time of the latest received line"""
+        self._busy_until: float = 0.
+        """Replies are delayed by the commands sent until then"""
+        self._deadline_timer: None | twisted.internet.base.DelayedCall = None
+        self._heartbeat_timer: None | twisted.internet.base.DelayedCall = None
+
+    def start(self) -> None:
+        self._idle()
+
+    def stop(self) -> None:
+        for timer in (self._deadline_timer, self._heartbeat_timer):
+            if timer is not None and timer.active():
+                timer.cancel()
+        self._deadline_timer = self._heartbeat_timer = None
+        self.pending.clear()
+
+    def set_interval(self, interval: float) -> None:
+        """Change the idle link probing interval"""
+        self.interval = interval
+        self._idle()
+
+    def sent(self, line: bytes) -> None:
+        """A line is sent"""
+        now = self.clock.seconds()
+        deadline = now + deadline_of(line)
+        if b'?' in line:
+            # Answered after the previous requests and the busy period
+            deadline = max(deadline, self._busy_until, self.pending[-1][2] if self.pending else 0.)
+            command = self.protocol.profile.match_command(line.decode('ASCII', 'replace'))
+            self.pending.append((command, now, deadline))
+            self._arm()
+        else:
+            self._busy_until = max(self._busy_until, deadline)
+        self._idle()
+
+    def received(self, command: None | str, final: bool = True) -> None | float:
+        """
+        A line is received. Any line proves the link alive.
+
+        :param command: Command code of the line
+        :param final: Whether the line ends the reply. False for the first lines of multi-line replies.
+        :return: Reply latency in seconds. None when not answering a request.
+        """
+        self.misses = 0
+        self._received = self.clock.seconds()
+        self._idle()
+        if not final or command is None:
+            return None
+        for index, (pending_command, sent, _) in enumerate(self.pending):
+            if pending_command == command:
+                break
+        else:
+            return None
+        for _ in range(index):
+            unanswered, _, _ = self.pending.popleft()
+            logger.debug(f"{unanswered} request not answered. Given up.")
+            if self.protocol.metrics is not None:
+                self.protocol.metrics.timeout()
+        self.pending.popleft()
+        self._arm()
+        return self._received - sent
+
+    def _arm(self) -> None:
+        """Set the timer for the earliest deadline"""
+        if not self.pending:
+            if self._deadline_timer is not None and self._deadline_timer.active():
+                self._deadline_timer.cancel()
+            self._deadline_timer = None
+            return
+        delay = max(self.pending[0][2] - self.clock.seconds(), 0.)
+        if self._deadline_timer is not None and self._deadline_timer.active():
+            self._deadline_timer.reset(delay)
+        else:
+            self._deadline_timer = self.clock.callLater(delay, self._expired)
+
+    def _expired(self) -> None:
+        self._deadline_timer = None
+        now = self.clock.seconds()
+        late = 0
+        silent = False
+        while self.pending and self.pending[0][2] <= now:
+            _, sent, _ = self.pending.popleft()  # Given up. A late reply is handled as unsolicited.
+            late += 1
+            silent |= sent >= self._received
+            if self.protocol.metrics is not None:
+                self.protocol.metrics.timeout()
+        if not silent:
+            # The link was alive after the requests were sent: not answered in the receiver state
+            logger.debug(f"{late} requests not answered")
+            self._arm()
+            return
+        self.misses += 1
+        if self.misses >= self.threshold:
+            logger.warning(f"{self.misses} replies missed. Link down.")
+            self.stop()
+            self.protocol.timeoutConnection()
+            return
+        logger.info(f"{late} replies late ({self.misses}/{self.threshold} misses). Probing the link.")
+        self._probe()
+        self._arm()
+
+    def _idle(self) -> None:
+        """Postpone the heartbeat"""
+        if not self.interval:
+            if self._heartbeat_timer is not None and self._heartbeat_timer.active():
+                self._heartbeat_timer.cancel()
+            self._heartbeat_timer = None
+        elif self._heartbeat_timer is not None and self._heartbeat_timer.active():
+            self._heartbeat_timer.reset(self.interval)
+        else:
+            self._heartbeat_timer = self.clock.callLater(self.interval, self._heartbeat)
+
+    def _heartbeat(self) -> None:
+        self._heartbeat_timer = None
+        logger.debug("Idle link. Probing.")
+        self._probe()
+
+    def _probe(self) -> None:
+        # Coalesced: probes never pile up when the link is down
+        # Never stuck behind queued polling
+        self.protocol.sendLine(HEARTBEAT, Priority.INTERACTIVE, key=HEARTBEAT)
@@ -0,0 +1,255 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon protocol metrics.
+
+Counters, gauges and histograms rendered in the Prometheus text exposition format.
+See: https://prometheus.io/docs/instrumenting/exposition_formats/
+
+Instrumentation is disabled by leaving DenonProtocol.metrics set to None.
+"""
+
+from __future__ import annotations
+
+import abc
+import bisect
+import collections
+import logging
+import os
+from typing import Iterator, TYPE_CHECKING
+
+from twisted.internet import task
+from twisted.web.resource import Resource
+
+from .dn500av import DN500AVMessage, match_command
+
+if TYPE_CHECKING:
+    import twisted.web.server
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = 'denonremote'
+
+LATENCY_BUCKETS = (.01, .025, .05, .1, .2, .5, 1., 2.5, 5.)
+"""Reply latency histogram buckets in seconds"""
+
+BACKOFF_BUCKETS = (.1, .5, 1., 5., 10., 30., 60., 300.)
+"""Reconnection delay histogram buckets in seconds"""
+
+EXPORT_INTERVAL: float = 15.
+"""Push sinks export interval in seconds"""
+
+
+def command_of(line: bytes) -> str:
+    """Extract the command code of a raw line"""
+    return match_command(line.decode('ASCII', 'replace')) or 'unknown'
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric(abc.ABC):
+    kind: str = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = f'{NAMESPACE}_{name}'
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    @abc.abstractmethod
+    def samples(self) -> Iterator[str]:
+        ...
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.kind}'
+        yield from self.samples()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: collections.Counter[tuple[str, ...]] = collections.Counter()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] += amount
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in sorted(self.values.items()):
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {value}'
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...]) -> None:
+        super().__init__(name, documentation)
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last one is +Inf
+        self.sum = 0.
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> Iterator[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            yield f'{self.name}_bucket{{le="{le}"}} {cumulative}'
+        yield f'{self.name}_sum {self.sum}'
+        yield f'{self.name}_count {self.count}'
+
+
+class ProtocolMetrics:
+    """
+    Metrics of a receiver link
+    """
+
+    def __init__(self) -> None:
+        self.commands_sent = Counter('commands_sent_total', "Commands sent to the receiver.", ('command',))
+        self.lines_received = Counter('lines_received_total', "Lines received from the receiver.", ('command',))
+        self.reply_latency = Histogram(
+            'reply_latency_seconds', "Delay between a request and its reply.", LATENCY_BUCKETS
+        )
+        self.ongoing_calls = Gauge('ongoing_calls', "Requests waiting for a reply.")
+        self.timeouts = Counter('timeouts_total', "Replies not received in time.")
+        self.reconnects = Counter('reconnects_total', "Reconnection attempts.")
+        self.reconnect_backoff = Histogram(
+            'reconnect_backoff_seconds', "Delay before reconnection attempts.", BACKOFF_BUCKETS
+        )
+        self.parse_errors = Counter('parse_errors_total', "Received lines with an unknown command.")
+        self.unknown_parameters = Counter(
+            'unknown_parameters_total', "Received lines with an unknown parameter.", ('command',)
+        )
+
+    def __iter__(self) -> Iterator[Metric]:
+        return iter((
+            self.commands_sent,
+            self.lines_received,
+            self.reply_latency,
+            self.ongoing_calls,
+            self.timeouts,
+            self.reconnects,
+            self.reconnect_backoff,
+            self.parse_errors,
+            self.unknown_parameters,
+        ))
+
+    def command_sent(self, line: bytes) -> None:
+        self.commands_sent.inc(command_of(line))
+
+    def request_sent(self, ongoing_calls: int) -> None:
+        self.ongoing_calls.set(ongoing_calls)
+
+    def line_received(self, message: DN500AVMessage, ongoing_calls: int, latency: None | float) -> None:
+        if latency is not None:
+            self.reply_latency.observe(latency)
+        self.ongoing_calls.set(ongoing_calls)
+        if message.command_label is None:
+            self.parse_errors.inc()
+            return
+        self.lines_received.inc(message.command_code)
+        if message.parameter_code is None:
+            self.unknown_parameters.inc(message.command_code)
+
+    def timeout(self) -> None:
+        self.timeouts.inc()
+
+    def reconnect(self, backoff: float) -> None:
+        self.reconnects.inc()
+        self.reconnect_backoff.observe(backoff)
+
+    def render(self) -> str:
+        """Render all metrics in the text exposition format"""
+        return '\n'.join(line for metric in self for line in metric.render()) + '\n'
+
+
+###
+# SINKS
+###
+class MetricsSink(abc.ABC):
+    """Push metrics somewhere"""
+
+    @abc.abstractmethod
+    def export(self, metrics: ProtocolMetrics) -> None:
+        ...
+
+
+class TextFileSink(MetricsSink):
+    """
+    Write metrics to a file
+
+    Suitable for the node exporter textfile collector.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.expanduser(path)
+
+    def export(self, metrics: ProtocolMetrics) -> None:
+        # Write atomically so that the collector never reads a partial file
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(metrics.render())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.error(f"Unable to export metrics to {self.path}: {e}")
+
+
+class MetricsExporter:
+    """Periodically push metrics to sinks"""
+
+    def __init__(self, metrics: ProtocolMetrics, sinks: list[MetricsSink], interval: float = EXPORT_INTERVAL) -> None:
+        self.metrics = metrics
+        self.sinks = sinks
+        self.interval = interval
+        self._loop = task.LoopingCall(self.export)
+
+    def export(self) -> None:
+        for sink in self.sinks:
+            sink.export(self.metrics)
+
+    def start(self) -> None:
+        self._loop.start(self.interval, now=False)
+
+    def stop(self) -> None:
+        if self._loop.running:
+            self._loop.stop()
+            self.export()  # Last values
+
+
+class MetricsResource(Resource):
+    """
+    Text exposition endpoint to be scraped
+
+    Serve with `reactor.listenTCP(port, Site(MetricsResource(metrics)))`.
+    """
+
+    isLeaf = True
+
+    def __init__(self, metrics: ProtocolMetrics) -> None:
+        super().__init__()
+        self.metrics = metrics
+
+    def render_GET(self, request: twisted.web.server.Request) -> bytes:
+        request.setHeader(b'Content-Type', b'text/plain; version=0.0.4; charset=utf-8')
+        return self.metrics.render().encode('UTF-8')
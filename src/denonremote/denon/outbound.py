@@ -0,0 +1,146 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon protocol outbound scheduling.
+
+Lines are sent one per pacing interval, highest priority lane first.
+"""
+
+from __future__ import annotations
+
+import collections
+import enum
+import logging
+from typing import Callable, Hashable, TYPE_CHECKING
+
+from twisted.internet import reactor
+
+if TYPE_CHECKING:
+    import twisted.internet.base
+    import twisted.internet.interfaces
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(enum.IntEnum):
+    INTERACTIVE = 0
+    """User commands expecting immediate feedback. e.g. mute, volume."""
+    STATE = 1
+    """Other state changing commands"""
+    BACKGROUND = 2
+    """Polling and snapshots"""
+
+
+class OutboundQueue:
+    """
+    Paced priority lanes
+
+    A queued line is preempted by any line of a higher priority lane.
+    Lines queued with the same coalescing key in a lane are merged:
+    only the latest one is sent, in the place of the first.
+    """
+
+    last_sent: float = float('-inf')
+    """Time of the latest send"""
+
+    def __init__(
+            self,
+            send: Callable[[bytes], None],
+            interval: float,
+            clock: twisted.internet.interfaces.IReactorTime = reactor,
+    ) -> None:
+        """
+        :param send: Write a line to the device
+        :param interval: Minimum delay between lines in seconds
+        :param clock: Time source
+        """
+        self.send = send
+        self.interval = interval
+        self.clock = clock
+        self._lanes: list[collections.deque[list]] = [collections.deque() for _ in Priority]
+        self._keys: list[dict[Hashable, list]] = [{} for _ in Priority]
+        self._pump: None | twisted.internet.base.DelayedCall = None
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+
+    def put(
+            self,
+            line: bytes,
+            priority: Priority,
+            key: None | Hashable = None,
+            sent: None | Callable[[], None] = None,
+    ) -> None:
+        """
+        Queue a line
+
+        :param line: Line to send
+        :param priority: Lane
+        :param key: Coalescing key. None to never merge.
+        :param sent: Called once the line is sent. Replaced when coalesced.
+        """
+        if key is not None:
+            entry = self._keys[priority].get(key)
+            if entry is not None:
+                logger.debug("Coalescing %r into %r", line, entry[0])
+                entry[0] = line
+                entry[2] = sent
+                return
+        entry = [line, key, sent]
+        self._lanes[priority].append(entry)
+        if key is not None:
+            self._keys[priority][key] = entry
+        self._schedule()
+
+    def clear(self) -> None:
+        """Drop all queued lines"""
+        for lane, keys in zip(self._lanes, self._keys):
+            lane.clear()
+            keys.clear()
+        if self._pump is not None and self._pump.active():
+            self._pump.cancel()
+        self._pump = None
+
+    def drain(self) -> None:
+        """Send all queued lines at once, highest priority lane first. Disregards pacing: only use on shutdown."""
+        if self._pump is not None and self._pump.active():
+            self._pump.cancel()
+        self._pump = None
+        for lane, keys in zip(self._lanes, self._keys):
+            while lane:
+                line, _, sent = lane.popleft()
+                self.send(line)
+                if sent is not None:
+                    sent()
+            keys.clear()
+        self.last_sent = self.clock.seconds()
+
+    def _schedule(self) -> None:
+        if self._pump is not None:
+            return  # Already scheduled
+        delay = max(0., self.last_sent + self.interval - self.clock.seconds())
+        if delay:
+            self._pump = self.clock.callLater(delay, self._flush)
+        else:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._pump = None
+        for priority, lane in enumerate(self._lanes):
+            if lane:
+                line, key, sent = lane.popleft()
+                if key is not None:
+                    del self._keys[priority][key]
+                break
+        else:
+            return
+        self.last_sent = self.clock.seconds()
+        self.send(line)
+        if sent is not None:
+            sent()
+        if len(self):
+            self._schedule()
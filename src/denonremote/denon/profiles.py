@@ -0,0 +1,123 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon device profiles.
+
+A profile holds the protocol tables of a device model, compiled once into the lookups used by the parser.
+Models are registered by name with the module declaring their tables.
+Each is imported and compiled on first use only: supporting more models costs nothing to the others.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import logging
+from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+PROFILES: dict[str, str] = {
+    'DN-500AV': 'denonremote.denon.dn500av:PROFILE',
+    # Same platform
+    'AVR-1912': 'denonremote.denon.dn500av:PROFILE',
+    'AVR-2112CI': 'denonremote.denon.dn500av:PROFILE',
+}
+"""Profile location ('module:attribute') by model name"""
+
+DEFAULT_PROFILE = 'DN-500AV'
+
+
+def _by_prefix(codes, size: int) -> dict[str, tuple[str, ...]]:
+    """Codes bucketed by their first characters. Longest first to resolve ambiguities (e.g. Z2 vs Z2MU)."""
+    buckets: dict[str, tuple[str, ...]] = {}
+    for code in sorted(codes, key=len, reverse=True):
+        buckets[code[:size]] = buckets.get(code[:size], ()) + (code,)
+    return buckets
+
+
+class DeviceProfile:
+    """Protocol tables of a device model"""
+
+    def __init__(
+            self,
+            name: str,
+            commands: dict[str, str],
+            commands_subcommands: dict[str, dict[str, str]],
+            commands_params: dict[str, Mapping[str, str]],
+            status_requests: dict[str, str],
+            nested_params: tuple[str, ...] = (),
+            lookups: None | tuple = None,
+    ) -> None:
+        """
+        :param name: Model name
+        :param commands: Command labels by code
+        :param commands_subcommands: Subcommand labels by code by command
+        :param commands_params: Parameter labels by code by command
+        :param status_requests: Status query labels
+        :param nested_params: Commands whose parameters are keyed by subcommand first
+        :param lookups: Precompiled lookups. See lookups().
+        """
+        self.name = name
+        self.commands = commands
+        self.commands_subcommands = commands_subcommands
+        self.commands_params = commands_params
+        self.status_requests = status_requests
+        self.nested_params = nested_params
+
+        if lookups is not None:
+            self.command_min_size, self._commands_by_prefix, self._subcommands_by_prefix = lookups
+            return
+        self.command_min_size = min(len(command) for command in commands)
+        self._commands_by_prefix = _by_prefix(commands, self.command_min_size)
+        self._subcommands_by_prefix = {
+            command: _by_prefix(subcommands, 1) for command, subcommands in commands_subcommands.items()
+        }
+
+    def lookups(self) -> tuple[int, dict[str, tuple[str, ...]], dict[str, dict[str, tuple[str, ...]]]]:
+        """Compiled lookups. Marshallable."""
+        return self.command_min_size, self._commands_by_prefix, self._subcommands_by_prefix
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name!r})"
+
+    def match_command(self, status_command: str) -> None | str:
+        """Command code a status command starts with"""
+        for command in self._commands_by_prefix.get(status_command[:self.command_min_size], ()):
+            if status_command.startswith(command):
+                return command
+        return None
+
+    def match_subcommand(self, command: str, status_command: str) -> None | str:
+        """Subcommand code a status command starts with, the command being trimmed"""
+        for subcommand in self._subcommands_by_prefix.get(command, {}).get(status_command[:1], ()):
+            if status_command.startswith(subcommand):
+                return subcommand
+        return None
+
+    def params(self, command: str, subcommand: None | str) -> Mapping[str, str]:
+        """Parameter labels of a command"""
+        params = self.commands_params.get(command, {})
+        if command in self.nested_params:
+            return params.get(subcommand, {})
+        return params
+
+
+@functools.cache
+def load_profile(name: str = DEFAULT_PROFILE) -> DeviceProfile:
+    """
+    Profile of a model. Imported and compiled once.
+
+    :raise ValueError: Unknown model
+    """
+    location = PROFILES.get(name)
+    if location is None:
+        raise ValueError(f"Unknown device model {name}. Known: {', '.join(PROFILES)}")
+    module, _, attribute = location.partition(':')
+    profile = getattr(importlib.import_module(module), attribute)
+    logger.debug(f"Loaded {profile} for {name}")
+    return profile
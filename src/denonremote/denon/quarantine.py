@@ -0,0 +1,136 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon protocol unrecognized lines quarantine.
+
+Lines the parser doesn't fully recognize (undocumented firmware replies like MVMAX, garbage)
+or that fail processing are collected with their number of occurrences instead of being reported each time.
+Memory is bounded: the least recently seen lines are evicted first.
+Reports are rate limited: new lines are logged at most once per interval and the others are summed up.
+
+Collected lines can be dumped for protocol tables updates.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import json
+import logging
+from typing import TYPE_CHECKING
+
+from twisted.internet import reactor
+
+if TYPE_CHECKING:
+    import twisted.internet.interfaces
+
+logger = logging.getLogger(__name__)
+
+QUARANTINE_CAPACITY = 256
+"""Distinct lines kept"""
+
+REPORT_INTERVAL: float = 60.
+"""Minimum delay between reports in seconds"""
+
+
+@dataclasses.dataclass
+class QuarantinedLine:
+    line: bytes
+    reason: str
+    """Why the line was quarantined. e.g. 'unknown command'"""
+    count: int = 0
+    first_seen: float = 0.
+    last_seen: float = 0.
+
+
+class Quarantine:
+    """
+    Bounded store of unrecognized lines
+
+    Adding a line is O(1) whatever the number of lines kept.
+    """
+
+    def __init__(
+            self,
+            capacity: int = QUARANTINE_CAPACITY,
+            report_interval: float = REPORT_INTERVAL,
+            clock: twisted.internet.interfaces.IReactorTime = reactor,
+    ) -> None:
+        """
+        :param capacity: Distinct lines kept
+        :param report_interval: Minimum delay between reports in seconds
+        :param clock: Time source
+        """
+        self.capacity = capacity
+        self.report_interval = report_interval
+        self.clock = clock
+        self.lines: collections.OrderedDict[bytes, QuarantinedLine] = collections.OrderedDict()
+        """Least recently seen first"""
+        self.evicted = 0
+        """Distinct lines dropped to bound memory"""
+        self._reported: float = float('-inf')
+        self._suppressed = 0
+        """New lines not reported since the latest report"""
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __contains__(self, line: bytes) -> bool:
+        return line in self.lines
+
+    def add(self, line: bytes, reason: str) -> QuarantinedLine:
+        """
+        Quarantine a line
+
+        :param line: Received line
+        :param reason: Why the line was quarantined. The first one is kept.
+        :return: Entry of the line
+        """
+        now = self.clock.seconds()
+        entry = self.lines.get(line)
+        if entry is None:
+            entry = self.lines[line] = QuarantinedLine(line, reason, first_seen=now)
+            if len(self.lines) > self.capacity:
+                self.lines.popitem(last=False)
+                self.evicted += 1
+            self._report(entry, now)
+        else:
+            self.lines.move_to_end(line)
+        entry.count += 1
+        entry.last_seen = now
+        return entry
+
+    def _report(self, entry: QuarantinedLine, now: float) -> None:
+        if now - self._reported < self.report_interval:
+            self._suppressed += 1
+            return
+        suppressed = f" ({self._suppressed} more since the previous report)" if self._suppressed else ''
+        logger.warning(f"Quarantined {entry.reason} line {entry.line!r}{suppressed}")
+        self._reported = now
+        self._suppressed = 0
+
+    def clear(self) -> None:
+        self.lines.clear()
+        self.evicted = 0
+        self._suppressed = 0
+
+    def dump(self) -> list[dict]:
+        """Quarantined lines. Most frequent first."""
+        return [
+            {
+                'line': entry.line.decode('ASCII', 'backslashreplace'),
+                'reason': entry.reason,
+                'count': entry.count,
+                'first_seen': entry.first_seen,
+                'last_seen': entry.last_seen,
+            }
+            for entry in sorted(self.lines.values(), key=lambda entry: entry.count, reverse=True)
+        ]
+
+    def dump_to_file(self, path: str) -> None:
+        with open(path, 'w', encoding='UTF-8') as f:
+            json.dump({'evicted': self.evicted, 'lines': self.dump()}, f, indent=4)
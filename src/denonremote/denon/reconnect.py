@@ -0,0 +1,216 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon protocol reconnection.
+
+Capped exponential backoff with jitter. A link watcher retries right away when the network comes back.
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import logging
+import random
+import socket
+from typing import Callable, TYPE_CHECKING
+
+from twisted.internet import defer, reactor, task
+
+if TYPE_CHECKING:
+    import twisted.internet.base
+    import twisted.internet.interfaces
+    import twisted.python.failure
+
+    from .metrics import ProtocolMetrics
+
+logger = logging.getLogger(__name__)
+
+INITIAL_DELAY: float = .1
+"""First retry delay in seconds"""
+
+MAXIMUM_DELAY: float = 5.
+"""
+Retry delay cap in seconds
+
+A rebooting receiver is back in about 10 seconds. Don't wait much longer than that.
+"""
+
+JITTER: float = .25
+"""Randomly shorten delays by up to this ratio to avoid synchronized retries"""
+
+LINK_POLL_INTERVAL: float = 1.
+"""Link state polling interval in seconds while disconnected"""
+
+
+def numeric_address(host: str) -> bool:
+    """Whether the host is an IP address rather than a name"""
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def link_up(host: str, port: int) -> bool:
+    """
+    Check that the receiver is routable
+
+    Connecting a UDP socket only resolves the route: no packet is sent.
+    Fails when the network interface is down or the address is invalid.
+
+    :param host: IP address. Names are not resolved: that would block.
+    """
+    if not numeric_address(host):
+        return False
+    family = socket.AF_INET6 if ipaddress.ip_address(host).version == 6 else socket.AF_INET
+    try:
+        with socket.socket(family, socket.SOCK_DGRAM) as sock:
+            sock.connect((host, port))
+    except OSError:
+        return False
+    return True
+
+
+class ReconnectScheduler:
+    """
+    Schedule connection attempts
+
+    Only one attempt is pending at any time.
+    The backoff is only reset once the receiver answered the health probe (PW?),
+    not when the TCP connection is accepted: a rebooting receiver accepts connections before it is ready.
+    """
+
+    delay: float = INITIAL_DELAY
+    """Next retry base delay in seconds"""
+
+    pending: None | twisted.internet.base.DelayedCall = None
+    """Scheduled attempt"""
+
+    link: None | bool = None
+    """Last known link state. None when unknown."""
+
+    address: None | str = None
+    """Resolved receiver address. None when unknown."""
+
+    def __init__(
+            self,
+            connect: Callable[[], None],
+            host: str,
+            port: int,
+            metrics: None | ProtocolMetrics = None,
+            clock: twisted.internet.interfaces.IReactorTime = reactor,
+            link_check: Callable[[str, int], bool] = link_up,
+            resolve: Callable[[str], defer.Deferred] = reactor.resolve,
+    ) -> None:
+        """
+        :param connect: Start a connection attempt
+        :param host: Receiver address. Used for link state probing.
+        :param port: Receiver port. Used for link state probing.
+        :param metrics: Instrumentation
+        :param clock: Time source
+        :param link_check: Link state probe. Takes an IP address.
+        :param resolve: Asynchronous name resolution. Names are resolved in the background:
+            the probe runs on the reactor thread and must never block.
+        """
+        self.connect = connect
+        self.host = host
+        self.port = port
+        self.metrics = metrics
+        self.clock = clock
+        self.link_check = link_check
+        self.resolve = resolve
+        self._resolving: None | str = None
+        """Name being resolved"""
+        self._resolved: tuple[None | str, None | str] = (None, None)
+        """(Name, address) of the latest resolution"""
+        self._link_watcher = task.LoopingCall(self._watch_link)
+        self._link_watcher.clock = clock
+
+    def schedule(self) -> None | float:
+        """
+        Schedule a connection attempt
+
+        :return: Delay in seconds. None when an attempt is already pending.
+        """
+        if self.pending is not None and self.pending.active():
+            return None
+        delay = self.delay * random.uniform(1 - JITTER, 1)
+        self.delay = min(self.delay * 2, MAXIMUM_DELAY)
+        if self.metrics is not None:
+            self.metrics.reconnect(delay)
+        logger.debug("Reconnecting in %.2f seconds", delay)
+        self.pending = self.clock.callLater(delay, self._attempt)
+        if not self._link_watcher.running:
+            self.link = None
+            self._link_watcher.start(LINK_POLL_INTERVAL, now=False)
+        return delay
+
+    def retry_now(self) -> None:
+        """Skip the pending delay"""
+        self.cancel()
+        self.delay = INITIAL_DELAY
+        self._attempt()
+
+    def healthy(self) -> None:
+        """The receiver answered. Reset the backoff."""
+        self.delay = INITIAL_DELAY
+        self._resolved = (None, None)  # Resolved again on the next outage
+        self._stop_link_watcher()
+
+    def cancel(self) -> None:
+        """Drop the pending attempt"""
+        if self.pending is not None and self.pending.active():
+            self.pending.cancel()
+        self.pending = None
+        self._stop_link_watcher()
+
+    def _attempt(self) -> None:
+        self.pending = None
+        self.connect()
+
+    def _stop_link_watcher(self) -> None:
+        if self._link_watcher.running:
+            self._link_watcher.stop()
+
+    def _resolve_host(self) -> None | str:
+        """
+        Receiver IP address
+
+        :return: None while unknown. A name is resolved in the background meanwhile.
+        """
+        if numeric_address(self.host):
+            return self.host
+        name, address = self._resolved
+        if name == self.host:
+            return address
+        if self._resolving != self.host:
+            self._resolving = self.host
+            resolving = self.resolve(self.host)
+            resolving.addCallback(self._host_resolved, self.host)
+            resolving.addErrback(self._host_unresolved, self.host)
+        return None
+
+    def _host_resolved(self, address: str, name: str) -> None:
+        self._resolving = None
+        self._resolved = (name, address)
+
+    def _host_unresolved(self, failure: twisted.python.failure.Failure, name: str) -> None:
+        # Probably no network. Tried again on the next poll.
+        logger.debug(f"Unable to resolve {name}: {failure.getErrorMessage()}")
+        self._resolving = None
+        self.link = False
+
+    def _watch_link(self) -> None:
+        address = self._resolve_host()
+        if address is None:
+            return
+        link = self.link_check(address, self.port)
+        if link and self.link is False and self.pending is not None:
+            logger.debug("Link is back up. Retrying now.")
+            self.retry_now()
+            return
+        self.link = link
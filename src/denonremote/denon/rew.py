@@ -0,0 +1,131 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Room EQ Wizard (REW) room correction import.
+
+See: https://www.roomeqwizard.com/
+
+The receiver has no parametric EQ. Only what it can reproduce is imported:
+- Low shelf (LS) filters gains are summed into the bass tone control.
+- High shelf (HS) filters gains are summed into the treble tone control.
+- Channel level lines (e.g. "FL -2.5 dB") set the channels trims.
+Other filters are reported as skipped.
+
+Only negative values are used: you can't compensate a destructive room mode by adding energy to it.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import re
+from typing import Iterable
+
+from .channels import CHANNELS, CHANNEL_LEVEL_MIN
+from .dn500av import TONE_MIN, TONE_ZERODB_REF, TONE_LEN
+
+logger = logging.getLogger(__name__)
+
+TONE_LEVEL_MIN = float(TONE_MIN - TONE_ZERODB_REF)
+
+FILTER_LINE = re.compile(
+    r'^Filter\s+\d+:\s+ON\s+(?P<type>[A-Z]+)(?:\s+\S+)?\s+Fc\s+[\d.,]+\s*Hz\s+Gain\s+(?P<gain>[-+]?[\d.]+)\s*dB',
+    re.IGNORECASE,
+)
+"""e.g. "Filter  2: ON  LS       Fc   100 Hz  Gain  -3.0 dB" """
+
+CHANNEL_LINE = re.compile(
+    rf'^(?:Channel\s+)?(?P<channel>{"|".join(sorted(CHANNELS, key=len, reverse=True))})\b[\s:]+'
+    r'(?:Level\s*:?\s*)?(?P<gain>[-+]?[\d.]+)\s*dB',
+    re.IGNORECASE,
+)
+"""e.g. "FL -2.5 dB" or "Channel SW Level: -4.0 dB" """
+
+LOW_SHELVES = ('LS', 'LSC', 'LSQ')
+HIGH_SHELVES = ('HS', 'HSC', 'HSQ')
+
+
+def _cut(gain: float, minimum: float) -> float:
+    """Negative only, clamped to the device range"""
+    return max(min(gain, 0.), minimum)
+
+
+def encode_tone_level(level: float) -> str:
+    """Raw value of a tone level in dB"""
+    return str(round(level) + TONE_ZERODB_REF).zfill(TONE_LEN)
+
+
+@dataclasses.dataclass
+class RoomCorrection:
+    bass: None | float = None
+    """Bass tone level in dB"""
+    treble: None | float = None
+    """Treble tone level in dB"""
+    channels: dict[str, float] = dataclasses.field(default_factory=dict)
+    """Level in dB by channel code"""
+    skipped: list[str] = dataclasses.field(default_factory=list)
+    """Lines that can't be reproduced by the receiver"""
+
+    def commands(self, status: dict[tuple[str, None | str], str]) -> dict[tuple[str, str], bytes]:
+        """
+        Tone commands differing from the receiver status
+
+        :param status: Known raw parameter by (command, subcommand)
+        :return: Commands by status key
+        """
+        lines = {}
+        tones = {'BAS': self.bass, 'TRE': self.treble}
+        for subcommand, level in tones.items():
+            if level is None:
+                continue
+            code = encode_tone_level(level)
+            if status.get(('PS', subcommand)) != code:
+                lines[('PS', subcommand)] = f'PS{subcommand} {code}'.encode('ASCII')
+        if lines and status.get(('PS', 'TONE CTRL')) != 'ON':
+            # Tone levels are ignored otherwise
+            lines = {('PS', 'TONE CTRL'): b'PSTONE CTRL ON', **lines}
+        return lines
+
+
+def parse_rew(lines: Iterable[str]) -> RoomCorrection:
+    """
+    Parse a REW filters or values export
+
+    :param lines: File lines. Streamed.
+    """
+    correction = RoomCorrection()
+    for line in lines:
+        line = line.strip()
+        match = FILTER_LINE.match(line)
+        if match is not None:
+            kind = match['type'].upper()
+            gain = float(match['gain'])
+            if kind in LOW_SHELVES:
+                correction.bass = (correction.bass or 0.) + gain
+            elif kind in HIGH_SHELVES:
+                correction.treble = (correction.treble or 0.) + gain
+            else:
+                correction.skipped.append(line)
+            continue
+        match = CHANNEL_LINE.match(line)
+        if match is not None:
+            correction.channels[match['channel'].upper()] = _cut(float(match['gain']), CHANNEL_LEVEL_MIN)
+        elif line.startswith('Filter') and ' ON ' in line:
+            correction.skipped.append(line)
+
+    if correction.bass is not None:
+        correction.bass = _cut(correction.bass, TONE_LEVEL_MIN)
+    if correction.treble is not None:
+        correction.treble = _cut(correction.treble, TONE_LEVEL_MIN)
+    for line in correction.skipped:
+        logger.info("Skipped: %s", line)
+    return correction
+
+
+def load_rew(path: str) -> RoomCorrection:
+    with open(path, encoding='UTF-8', errors='replace') as f:
+        return parse_rew(f)
@@ -0,0 +1,320 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon timed and event jobs.
+
+Jobs run at a local wall-clock time (daily or on some weekdays) or on an application event (e.g. shutdown).
+They are kept in a JSON job store, e.g.
+    {
+        "version": 1,
+        "jobs": [
+            {"name": "nightly standby", "action": "standby", "at": "23:30"},
+            {"name": "weekend scene", "action": "scene", "argument": "~/weekend.snapshot", "at": "10:00",
+             "weekdays": [5, 6]},
+            {"name": "standby on exit", "action": "standby", "event": "shutdown"}
+        ]
+    }
+
+All timed jobs share a single reactor timer set for the earliest one.
+Jobs missed while the application was not running (or the computer was asleep) are run once on start
+when they are recent enough.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import heapq
+import itertools
+import json
+import logging
+import os
+from typing import Callable, TYPE_CHECKING
+
+from twisted.internet import reactor
+
+from .automation import code_db, snap
+from .backup import Snapshot
+from .dn500av import MV_PARAMS
+
+if TYPE_CHECKING:
+    import twisted.internet.base
+    import twisted.internet.interfaces
+
+    from .communication import DenonProtocol
+
+logger = logging.getLogger(__name__)
+
+JOB_STORE_VERSION = 1
+
+CATCH_UP_WINDOW: float = 6 * 3600
+"""Missed jobs older than this in seconds are skipped"""
+
+SHUTDOWN = 'shutdown'
+"""Application shutdown event"""
+
+
+@dataclasses.dataclass
+class Job:
+    name: str
+    """Unique name"""
+    action: str
+    """See ACTIONS"""
+    argument: None | str | float = None
+    at: None | str = None
+    """Local time. e.g. '23:30'"""
+    weekdays: list[int] = dataclasses.field(default_factory=list)
+    """Days the job runs on. Monday is 0. Every day when empty."""
+    event: None | str = None
+    """Application event the job runs on. e.g. 'shutdown'"""
+    catch_up: bool = True
+    """Run once on start when missed"""
+    next_run: None | float = None
+    """Timestamp of the next timed run"""
+    last_run: None | float = None
+    """Timestamp of the latest run"""
+
+    def following(self, after: float) -> float:
+        """
+        Timestamp of the first timed run after a time
+
+        :raise ValueError: Not a timed job or invalid time
+        """
+        if self.at is None:
+            raise ValueError(f"Job {self.name} has no time")
+        hour, minute = (int(part) for part in self.at.split(':'))
+        start = datetime.datetime.fromtimestamp(after)
+        candidate = start.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        for _ in range(8):
+            if candidate.timestamp() > after and (not self.weekdays or candidate.weekday() in self.weekdays):
+                return candidate.timestamp()
+            candidate += datetime.timedelta(days=1)
+        raise ValueError(f"Job {self.name} has invalid weekdays {self.weekdays}")
+
+
+class JobStore:
+    """JSON file persistence"""
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.expanduser(path)
+
+    def load(self) -> list[Job]:
+        """
+        :raise ValueError: Invalid store
+        """
+        try:
+            with open(self.path, encoding='UTF-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return []
+        if data.get('version', 0) > JOB_STORE_VERSION:
+            raise ValueError(f"Unsupported job store version {data.get('version')}")
+        fields = {field.name for field in dataclasses.fields(Job)}
+        try:
+            return [Job(**{key: value for key, value in job.items() if key in fields}) for job in data['jobs']]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid job store: {e}") from e
+
+    def save(self, jobs: list[Job]) -> None:
+        """Atomically replace the store"""
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='UTF-8') as f:
+            json.dump({'version': JOB_STORE_VERSION, 'jobs': [dataclasses.asdict(job) for job in jobs]}, f, indent=4)
+        os.replace(temporary, self.path)
+
+    def set_aside(self) -> str:
+        """
+        Rename an invalid store so that it's not overwritten
+
+        :return: New path
+        :raise OSError: Unable to rename
+        """
+        path = self.path + '.invalid'
+        os.replace(self.path, path)
+        return path
+
+
+class JobScheduler:
+    """
+    Timer wheel for jobs
+
+    Timed jobs are kept in a heap by next run time. A single delayed call is armed for the earliest.
+    Heap entries of removed or rescheduled jobs are skipped when they come up.
+    """
+
+    def __init__(
+            self,
+            store: JobStore,
+            execute: Callable[[Job], None],
+            clock: twisted.internet.interfaces.IReactorTime = reactor,
+            catch_up_window: float = CATCH_UP_WINDOW,
+    ) -> None:
+        """
+        :param store: Persistence
+        :param execute: Runs a job
+        :param clock: Time source. Wall-clock.
+        :param catch_up_window: Missed jobs older than this in seconds are skipped
+        """
+        self.store = store
+        self.execute = execute
+        self.clock = clock
+        self.catch_up_window = catch_up_window
+        self.jobs: dict[str, Job] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._sequence = itertools.count()  # Ties
+        self._timer: None | twisted.internet.base.DelayedCall = None
+        self._loaded = False
+        """The store is only saved once loaded. Never overwrite jobs that couldn't be read."""
+
+    def start(self) -> None:
+        """Load the jobs, catch up with the missed ones and arm the timer"""
+        try:
+            jobs = self.store.load()
+            self._loaded = True
+        except ValueError as e:
+            jobs = []
+            try:
+                path = self.store.set_aside()
+                self._loaded = True
+                logger.error(f"Invalid jobs in {self.store.path}, moved to {path}: {e}")
+            except OSError as rename_error:
+                logger.error(f"Invalid jobs in {self.store.path}, not saving: {e} ({rename_error})")
+        except OSError as e:
+            logger.error(f"Unable to load jobs from {self.store.path}, not saving: {e}")
+            jobs = []
+        now = self.clock.seconds()
+        self.jobs = {job.name: job for job in jobs}
+        for job in jobs:
+            if job.at is None:
+                continue
+            if job.next_run is not None and job.next_run <= now:
+                if job.catch_up and now - job.next_run <= self.catch_up_window:
+                    logger.info(f"Catching up with missed job {job.name}")
+                    self._run(job, now)
+                else:
+                    logger.info(f"Skipping missed job {job.name}")
+            self._push(job, now)
+        self._save()
+        self._arm()
+
+    def stop(self) -> None:
+        if self._timer is not None and self._timer.active():
+            self._timer.cancel()
+        self._timer = None
+
+    def add(self, job: Job) -> None:
+        """Add or replace a job"""
+        self.jobs[job.name] = job
+        if job.at is not None:
+            self._push(job, self.clock.seconds())
+            self._arm()
+        self._save()
+
+    def remove(self, name: str) -> None:
+        if self.jobs.pop(name, None) is not None:
+            self._save()  # The heap entry is skipped when it comes up
+
+    def fire(self, event: str) -> None:
+        """Run the jobs of an application event"""
+        now = self.clock.seconds()
+        for job in list(self.jobs.values()):
+            if job.event == event:
+                self._run(job, now)
+        self._save()
+
+    def _push(self, job: Job, now: float) -> None:
+        try:
+            job.next_run = job.following(now)
+        except ValueError as e:
+            logger.error(e)
+            job.next_run = None
+            return
+        heapq.heappush(self._heap, (job.next_run, next(self._sequence), job.name))
+
+    def _arm(self) -> None:
+        """Set the timer for the earliest job"""
+        while self._heap and not self._current(self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self.stop()
+            return
+        delay = max(self._heap[0][0] - self.clock.seconds(), 0.)
+        if self._timer is not None and self._timer.active():
+            self._timer.reset(delay)
+        else:
+            self._timer = self.clock.callLater(delay, self._tick)
+
+    def _current(self, entry: tuple[float, int, str]) -> bool:
+        job = self.jobs.get(entry[2])
+        return job is not None and job.next_run == entry[0]
+
+    def _tick(self) -> None:
+        self._timer = None
+        now = self.clock.seconds()
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._current(entry):
+                continue
+            job = self.jobs[entry[2]]
+            if now - entry[0] <= self.catch_up_window:
+                # Late runs (e.g. after the computer slept) happen once
+                self._run(job, now)
+            else:
+                logger.info(f"Skipping missed job {job.name}")
+            self._push(job, now)
+        self._save()
+        self._arm()
+
+    def _run(self, job: Job, now: float) -> None:
+        logger.info(f"Running job {job.name}: {job.action} {job.argument if job.argument is not None else ''}")
+        job.last_run = now
+        try:
+            self.execute(job)
+        except Exception as e:  # One broken job must not stop the others
+            logger.error(f"Job {job.name} failed: {e}")
+
+    def _save(self) -> None:
+        if not self._loaded:
+            return
+        try:
+            self.store.save(list(self.jobs.values()))
+        except OSError as e:
+            logger.error(f"Unable to save jobs to {self.store.path}: {e}")
+
+
+def _volume_limit(protocol: DenonProtocol, limit: float) -> None:
+    """Lower the Master Volume to the limit in dB. Also when unknown."""
+    position = protocol.ramp.position
+    if position is None or code_db(position) > float(limit):
+        protocol.set_volume(MV_PARAMS[snap(float(limit))])
+
+
+def _scene(protocol: DenonProtocol, path: str) -> None:
+    with open(os.path.expanduser(path), encoding='UTF-8') as f:
+        protocol.restore(Snapshot.loads(f.read()))
+
+
+ACTIONS: dict[str, Callable[[DenonProtocol, None | str | float], None]] = {
+    'standby': lambda protocol, _: protocol.set_power(False),
+    'power_on': lambda protocol, _: protocol.set_power(True),
+    'zone2_standby': lambda protocol, _: protocol.zone2.set_power(False),
+    'sleep': lambda protocol, minutes: protocol.set_sleep(int(minutes) if minutes else None),
+    'zone2_sleep': lambda protocol, minutes: protocol.zone2.set_sleep(int(minutes) if minutes else None),
+    'volume_limit': _volume_limit,
+    'scene': _scene,
+}
+"""Job actions by name. The argument is the job argument."""
+
+
+def run_job(protocol: DenonProtocol, job: Job) -> None:
+    """
+    :raise ValueError: Unknown action or invalid argument
+    """
+    action = ACTIONS.get(job.action)
+    if action is None:
+        raise ValueError(f"Unknown action {job.action}")
+    action(protocol, job.argument)
@@ -0,0 +1,105 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon protocol structured logging.
+
+One key/value record per line sent or received.
+Records are only built when the level is enabled and only formatted when emitted.
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .dn500av import DN500AVMessage
+
+RING_BUFFER_CAPACITY = 1000
+"""Records kept for post-mortem dumps"""
+
+
+class ProtocolRecord:
+    """Lazily formatted key/value record"""
+
+    __slots__ = ('direction', 'line', 'command', 'subcommand', 'parameter', 'latency')
+
+    def __init__(
+            self,
+            direction: str,
+            line: bytes,
+            command: None | str = None,
+            subcommand: None | str = None,
+            parameter: None | str = None,
+            latency: None | float = None,
+    ) -> None:
+        self.direction = direction
+        self.line = line
+        self.command = command
+        self.subcommand = subcommand
+        self.parameter = parameter
+        self.latency = latency
+
+    def __str__(self) -> str:
+        fields = [f"direction={self.direction}", f"line={self.line.decode('ASCII', 'replace')!r}"]
+        for key in ('command', 'subcommand', 'parameter'):
+            value = getattr(self, key)
+            if value is not None:
+                fields.append(f"{key}={value}")
+        if self.latency is not None:
+            fields.append(f"latency={self.latency * 1000:.1f}ms")
+        return ' '.join(fields)
+
+
+class ProtocolLogger:
+    """
+    Level-guarded structured logger for the protocol layer
+    """
+
+    def __init__(self, logger: logging.Logger, level: int = logging.DEBUG) -> None:
+        self.logger = logger
+        self.level = level
+
+    def sent(self, line: bytes, **fields) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "%s", ProtocolRecord('tx', line, **fields))
+
+    def received(self, line: bytes, message: DN500AVMessage, latency: None | float = None) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "%s", ProtocolRecord(
+                'rx',
+                line,
+                message.command_code,
+                message.subcommand_code,
+                message.parameter_code,
+                latency,
+            ))
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keep the latest records in memory for post-mortem dumps
+
+    Records are formatted on dump only.
+    """
+
+    def __init__(self, capacity: int = RING_BUFFER_CAPACITY, level: int = logging.NOTSET) -> None:
+        super().__init__(level)
+        self.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        self.records: collections.deque[logging.LogRecord] = collections.deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+    def dump(self) -> list[str]:
+        return [self.format(record) for record in self.records]
+
+    def dump_to_file(self, path: str) -> None:
+        with open(path, 'w', encoding='UTF-8') as f:
+            for line in self.dump():
+                f.write(line + '\n')
@@ -0,0 +1,130 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Zone 2 control.
+
+Zone 2 shares the connection and its pacing with the main zone.
+Zone 2 commands are never sent on the interactive lane: they can't delay main zone user commands.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from .channels import decode_channel_level, encode_channel_level
+from .dn500av import DN500AVFormat, DN500AVMessage, SLP_PARAMS, Z2CV_SUBCOMMANDS, zone2_subject
+from .outbound import Priority
+
+if TYPE_CHECKING:
+    from .communication import DenonProtocol
+
+logger = logging.getLogger(__name__)
+
+ZONE2_COMMANDS = ('Z2', 'Z2MU', 'Z2CV', 'Z2SLP')
+
+ZONE2_STATUS_REQUESTS = (b'Z2?', b'Z2MU?', b'Z2CV?', b'Z2SLP?')
+
+
+class Zone2State:
+    """Known Zone 2 status. Kept up to date from replies and echoes."""
+
+    def __init__(self) -> None:
+        self.power: None | bool = None
+        self.source: None | str = None
+        """Source code. 'SOURCE' follows the main zone."""
+        self.volume: None | str = None
+        """Raw Master Volume scale value"""
+        self.mute: None | bool = None
+        self.channels: dict[str, None | float] = dict.fromkeys(Z2CV_SUBCOMMANDS)
+        """Level in dB by channel code"""
+        self.sleep: None | str = None
+        """Raw sleep timer value"""
+
+    def update(self, message: DN500AVMessage) -> bool:
+        """
+        Record a Zone 2 message
+
+        :return: Whether the message was about Zone 2
+        """
+        if message.command_code not in ZONE2_COMMANDS:
+            return False
+        parameter = message.parameter_code
+        if parameter is None:
+            return True  # Unknown parameter
+        if message.command_code == 'Z2':
+            subject = zone2_subject(parameter)
+            if subject == 'POWER':
+                self.power = parameter == 'ON'
+            elif subject == 'VOLUME':
+                if parameter not in ('UP', 'DOWN'):
+                    self.volume = parameter
+            elif subject == 'SOURCE':
+                self.source = parameter
+        elif message.command_code == 'Z2MU':
+            self.mute = parameter == 'ON'
+        elif message.command_code == 'Z2CV':
+            if message.subcommand_code in self.channels and parameter not in ('UP', 'DOWN'):
+                self.channels[message.subcommand_code] = decode_channel_level(parameter)
+        elif message.command_code == 'Z2SLP':
+            self.sleep = parameter
+        return True
+
+
+class Zone2:
+    """Zone 2 get/set API over the main zone connection"""
+
+    def __init__(self, protocol: DenonProtocol) -> None:
+        self.protocol = protocol
+        self.state = Zone2State()
+
+    def _send(self, line: str, key: None | tuple[str, str] = None) -> None:
+        self.protocol.sendLine(line.encode('ASCII'), Priority.STATE, key=key)
+
+    def get_status(self) -> None:
+        """Refresh the whole Zone 2 status on the background lane"""
+        for line in ZONE2_STATUS_REQUESTS:
+            self.protocol.query(line).addErrback(self.protocol._query_dropped)
+
+    def set_power(self, state: bool) -> None:
+        self._send('Z2ON' if state else 'Z2OFF', key=('Z2', 'POWER'))
+
+    def set_source(self, source: str) -> None:
+        self._send('Z2' + source, key=('Z2', 'SOURCE'))
+
+    def set_volume(self, value: str) -> None:
+        """
+        :param value: Master Volume label or 'UP'/'DOWN'
+        """
+        if value in ('UP', 'DOWN'):
+            self._send('Z2' + value)
+            return
+        raw_value = DN500AVFormat().mv_reverse_params.get(value)
+        if raw_value is None or not raw_value.isdigit():
+            logger.warning(f"Set Zone 2 volume value {value} is invalid.")
+            return
+        # Only the latest absolute volume matters
+        self._send('Z2' + raw_value, key=('Z2', 'VOLUME'))
+
+    def set_mute(self, state: bool) -> None:
+        self._send('Z2MUON' if state else 'Z2MUOFF', key=('Z2MU', None))
+
+    def set_channel_level(self, channel: str, level: float) -> None:
+        if channel not in Z2CV_SUBCOMMANDS:
+            logger.warning(f"Unknown Zone 2 channel {channel}.")
+            return
+        self._send(f'Z2CV{channel} {encode_channel_level(level)}', key=('Z2CV', channel))
+
+    def set_sleep(self, minutes: None | int) -> None:
+        """
+        :param minutes: Sleep timer. None to disable.
+        """
+        code = 'OFF' if minutes is None else SLP_PARAMS.encode(minutes)
+        if code is None:
+            logger.warning(f"Set Zone 2 sleep timer {minutes} is invalid.")
+            return
+        self._send('Z2SLP' + code, key=('Z2SLP', None))
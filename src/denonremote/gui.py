@@ -8,8 +8,10 @@
 Denon Remote GUI.
 """
 import importlib.resources
+import logging
 import os
 import sys
+import time
 
 import denonremote
 
@@ -40,9 +42,29 @@ import twisted.internet
 import twisted.internet.error
 import twisted.internet.tcp
 import twisted.python.failure
+import twisted.web.server
 
 from denonremote.__about__ import __TITLE__
+from denonremote.config import RemoteConfig, SECTION
+from denonremote.console import DebugConsole  # Registers the widget for the KV file
+from denonremote.denon.dn500av import MV_PARAMS
+from denonremote.denon.backup import Snapshot, SUBSYSTEMS
 from denonremote.denon.communication import DenonClientGUIFactory, DenonProtocol
+from denonremote.denon.discovery import listen_ssdp, local_network, ReceiverDiscovery, scan_network
+from denonremote.denon.liveness import HEARTBEAT_INTERVAL
+from denonremote.denon.metrics import MetricsExporter, MetricsResource, ProtocolMetrics, TextFileSink
+from denonremote.denon.profiles import DEFAULT_PROFILE, load_profile
+from denonremote.denon.quarantine import Quarantine
+from denonremote.denon.reconnect import ReconnectScheduler
+from denonremote.denon.rew import load_rew
+from denonremote.denon.scheduler import Job, JobScheduler, JobStore, run_job, SHUTDOWN
+from denonremote.denon.tracing import RingBufferHandler
+from denonremote.midi import MidiInput, MidiMapper
+from denonremote.mixer import ChannelMixer
+from denonremote.presets import source_preset_panel, volume_presets_panel
+from denonremote.spl import DEFAULT_REFERENCE_LEVEL, REFERENCE_MODES, SPLCalibration
+from denonremote.updates import UIUpdateScheduler
+from denonremote.zone2 import Zone2Panel
 from kivy.animation import Animation
 from kivy.uix.togglebutton import ToggleButton
 from telnetlib import TELNET_PORT
@@ -61,12 +83,25 @@ for path in ['fonts', 'images', 'settings']:
             importlib.resources.files(denonremote).joinpath(path)
         )
 
-_BACKOFF = .05
+RECEIVER_IP_PLACEHOLDER = '192.168.x.y'
+
+POST_MORTEM_FILE = '~/.denonremote-protocol.log'
+
+QUARANTINE_FILE = '~/.denonremote-quarantine.json'
+
+BACKUP_FILE = '~/denonremote-%Y%m%d-%H%M%S.snapshot'
+
+JOBS_FILE = '~/.denonremote-jobs.json'
+
+STANDBY_ON_EXIT_JOB = 'standby on exit'
 
 WIDTH = 800
 HEIGHT = 600
 SMALL_HEIGHT = 60
 
+VOLUME_PRESETS_PER_ROW = 6
+SOURCES_COLUMNS = 2
+
 
 class PowerButton(ToggleButton):
     """
@@ -104,37 +139,93 @@ class DenonRemoteApp(kivy.app.App):
     connector: None | twisted.internet.tcp.Connector = None
     """Twisted connector"""
 
-    _backoff: float = _BACKOFF
-    """Retry failed or lost connection with exponential backoff"""
+    reconnect: None | ReconnectScheduler = None
+    """Retry failed or lost connection"""
+
+    discovery: None | ReceiverDiscovery = None
+    """Receivers search. Used when no receiver IP address is set."""
 
     client: None | DenonClientGUIFactory = None
     """Twisted client of the receiver"""
 
+    midi: None | MidiInput = None
+    """MIDI controller input"""
+
+    metrics: None | ProtocolMetrics = None
+    """Link instrumentation. Disabled when None."""
+
+    metrics_exporter: None | MetricsExporter = None
+    """Metrics file writer. Disabled when None."""
+
+    protocol_log: None | RingBufferHandler = None
+    """Latest protocol records for post-mortem dumps. Debug mode only."""
+
+    quarantine: Quarantine
+    """Unrecognized received lines. Dumped on exit in debug mode."""
+
     systray: pystray.Icon | None = None
 
     hidden: bool = bool(kivy.config.Config.get('graphics', 'window_state') == 'hidden')
 
     settings_cls: kivy.uix.settings.Settings = kivy.uix.settings.SettingsWithSidebar
 
-    maximum_volume = '  0.0dB'
+    maximum_volume = '80'
+    """Raw Master Volume maximum value"""
+
+    _volume: None | str = None
+    """Raw Master Volume value"""
+
+    spl: SPLCalibration
+    """Calibrated volume display"""
+
+    ui_updates: UIUpdateScheduler
+    """Receiver state changes applied once per frame"""
+
+    remote_config: RemoteConfig
+    """Parsed configuration"""
+
+    mixer: None | ChannelMixer = None
+    """Channel levels popup"""
+
+    zone2: None | Zone2Panel = None
+    """Zone 2 popup"""
+
+    scheduler: None | JobScheduler = None
+    """Timed and event jobs"""
+
+    _settings_stale: bool = False
+    """Settings panels must be regenerated"""
+
+    _volume_preset_buttons: list[ToggleButton] = []
+    _source_preset_buttons: list[ToggleButton] = []
+    _active_volume_preset: None | int = None
+    _active_source_preset: None | int = None
+    _source: None | str = None
+    """Last received input source"""
 
     def build_config(self, config: configparser.ConfigParser) -> None:
         config.adddefaultsection('denonremote')
         config.setdefaults(
             'denonremote', {
                 'debug': False,
-                'receiver_ip': '192.168.x.y',
+                'receiver_ip': RECEIVER_IP_PLACEHOLDER,
                 'receiver_port': TELNET_PORT,
+                'receiver_model': DEFAULT_PROFILE,
+                'discovery_network': '',  # Local network
                 'always_on_top': True,
                 'reference_level': '-20',
                 # SMPTE RP200:2012 & Katz metering system also equivalent to EBU 83dbSPLC@-20dBFS
                 'reference_spl': '83',
                 'reference_volume': '-18',  # The best alignment level with my current setup (Dynaudio BM5A)
+                'volume_display_mode': 'relative',
+                'k_compensation': False,
+                'vol_preset_count': 4,
                 'vol_preset_1': '-30.0dB',  # My preferred leisure level
                 'vol_preset_2': '-26.0dB',  # K-12
                 # -25.0dB  # EBU R 128
                 'vol_preset_3': '-24.0dB',  # K-14 / Dolby Home Cinema
                 'vol_preset_4': '-18.0dB',  # SMPTE/EBU/Dolby theater (Reference volume)
+                'fav_src_count': 6,
                 'fav_src_1_code': 'GAME',
                 'fav_src_1_label': "Computer HDMI",
                 'fav_src_2_code': 'CD',
@@ -147,6 +238,17 @@ class DenonRemoteApp(kivy.app.App):
                 'fav_src_5_label': "",
                 'fav_src_6_code': '',
                 'fav_src_6_label': "",
+                'midi_enabled': False,
+                'midi_port': '',
+                'midi_virtual': False,
+                'midi_channel': 0,  # All channels
+                'metrics_port': 0,  # Disabled
+                'metrics_file': '',  # Disabled
+                'heartbeat_interval': HEARTBEAT_INTERVAL,
+                'rew_file': '',
+                'restore_file': '',
+                'restore_subsystems': '',  # All
+                'standby_on_exit': False,
             }
         )
 
@@ -155,6 +257,10 @@ class DenonRemoteApp(kivy.app.App):
             "Communication", self.config,
             filename=kivy.resources.resource_find('communication.json')
         )
+        settings.add_json_panel(
+            "MIDI", self.config,
+            filename=kivy.resources.resource_find('midi.json')
+        )
         settings.add_json_panel(
             "Window", self.config,
             filename=kivy.resources.resource_find('window.json')
@@ -164,33 +270,30 @@ class DenonRemoteApp(kivy.app.App):
             filename=kivy.resources.resource_find('volume_display.json')
         )
         settings.add_json_panel(
-            "Volume presets", self.config,
-            filename=kivy.resources.resource_find('volume.json')
+            "Room correction", self.config,
+            filename=kivy.resources.resource_find('room_correction.json')
         )
         settings.add_json_panel(
-            "Favorite source 1", self.config,
-            filename=kivy.resources.resource_find('source1.json')
+            "Backup", self.config,
+            filename=kivy.resources.resource_find('backup.json')
         )
         settings.add_json_panel(
-            "Favorite source 2", self.config,
-            filename=kivy.resources.resource_find('source2.json')
+            "Automation", self.config,
+            filename=kivy.resources.resource_find('automation.json')
         )
         settings.add_json_panel(
-            "Favorite source 3", self.config,
-            filename=kivy.resources.resource_find('source3.json')
+            "Presets", self.config,
+            filename=kivy.resources.resource_find('presets.json')
         )
         settings.add_json_panel(
-            "Favorite source 4", self.config,
-            filename=kivy.resources.resource_find('source4.json')
-        )
-        settings.add_json_panel(
-            "Favorite source 5", self.config,
-            filename=kivy.resources.resource_find('source5.json')
-        )
-        settings.add_json_panel(
-            "Favorite source 6", self.config,
-            filename=kivy.resources.resource_find('source6.json')
+            "Volume presets", self.config,
+            data=volume_presets_panel(SECTION, len(self.remote_config.volume_presets))
         )
+        for number in range(1, len(self.remote_config.source_presets) + 1):
+            settings.add_json_panel(
+                f"Favorite source {number}", self.config,
+                data=source_preset_panel(SECTION, number)
+            )
 
     def get_application_config(self, _: str = '%(appdir)s/%(appname)s.ini') -> None:
         """
@@ -201,29 +304,27 @@ class DenonRemoteApp(kivy.app.App):
     def on_config_change(self, config: configparser.ConfigParser, section: str, key: str, value: str) -> None:
         if config is self.config:
             if section == 'denonremote':
-                if key == 'receiver_ip':
+                self.remote_config.invalidate()
+                if key in ('reference_volume', 'reference_spl', 'reference_level', 'volume_display_mode'):
+                    self._build_spl()
+                if key in ('receiver_ip', 'receiver_model'):
                     self._disconnect()
                     self._connect()
-                if key == 'vol_preset_1':
-                    self.root.ids.vol_preset_1.text = value
-                if key == 'vol_preset_2':
-                    self.root.ids.vol_preset_2.text = value
-                if key == 'vol_preset_3':
-                    self.root.ids.vol_preset_3.text = value
-                if key == 'vol_preset_4':
-                    self.root.ids.vol_preset_4.text = value
-                if key == 'fav_src_1_label':
-                    self.root.ids.fav_src_1.text = value
-                if key == 'fav_src_2_label':
-                    self.root.ids.fav_src_2.text = value
-                if key == 'fav_src_3_label':
-                    self.root.ids.fav_src_3.text = value
-                if key == 'fav_src_4_label':
-                    self.root.ids.fav_src_4.text = value
-                if key == 'fav_src_5_label':
-                    self.root.ids.fav_src_5.text = value
-                if key == 'fav_src_6_label':
-                    self.root.ids.fav_src_6.text = value
+                if key.startswith('midi_'):
+                    self._close_midi()
+                    self._open_midi()
+                if key.startswith('vol_preset_') or key.startswith('fav_src_'):
+                    self._build_presets()
+                if key in ('vol_preset_count', 'fav_src_count'):
+                    self._settings_stale = True  # Regenerate preset panels
+                if key == 'rew_file' and value:
+                    self._import_room_correction(value)
+                if key == 'restore_file' and value:
+                    self._restore(value)
+                if key == 'standby_on_exit':
+                    self._sync_standby_on_exit()
+                if key == 'heartbeat_interval' and self.client is not None:
+                    self.client.liveness.set_interval(config.getfloat(section, key))
 
     def open_settings(self, *_) -> None:
         self.disable_keyboard_shortcuts()
@@ -232,28 +333,122 @@ class DenonRemoteApp(kivy.app.App):
     def close_settings(self, *_) -> None:
         self.enable_keyboard_shortcuts()
         super().close_settings()
+        if self._settings_stale:
+            self.destroy_settings()
+            self._settings_stale = False
 
     def run_with_systray(self, systray: pystray.Icon) -> None:
         self.systray = systray
         super().run()
 
     def _connect(self, *_) -> None:
-        self.print_debug('Connecting to ' + self.config.get('denonremote', 'receiver_ip') + '...', True)
+        if self.remote_config.receiver_ip in ('', RECEIVER_IP_PLACEHOLDER):
+            self._discover()
+            return
 
-        client_factory = DenonClientGUIFactory(self)
+        self.print_debug('Connecting to ' + self.remote_config.receiver_ip + '...', True)
+
+        self.reconnect.host = self.remote_config.receiver_ip
+        self.reconnect.port = self.remote_config.receiver_port
+        try:
+            profile = load_profile(self.config.get('denonremote', 'receiver_model'))
+        except ValueError as e:
+            self.print_debug(f"{e}. Using {DEFAULT_PROFILE}.", True)
+            profile = load_profile(DEFAULT_PROFILE)
+        client_factory = DenonClientGUIFactory(self, profile)
         self.connector = twisted.internet.reactor.connectTCP(
-            host=self.config.get('denonremote', 'receiver_ip'),
-            port=self.config.getint('denonremote', 'receiver_port'),
+            host=self.remote_config.receiver_ip,
+            port=self.remote_config.receiver_port,
             factory=client_factory,
             timeout=1
         )
 
+    def _discover(self) -> None:
+        network = self.config.get('denonremote', 'discovery_network')
+        if network:
+            try:
+                scan_network(network)
+            except ValueError as e:
+                self.print_debug(f"{e}. Searching the local network instead.", True)
+                network = ''
+        network = network or local_network()
+        if network is None:
+            self.print_debug("No network to search receivers on!", True)
+            self._reconnect()
+            return
+
+        if self.discovery is None:
+            self.discovery = ReceiverDiscovery(port=self.remote_config.receiver_port)
+            try:
+                listen_ssdp(self.discovery)
+            except twisted.internet.error.CannotListenError as e:
+                logger.warning(f"Unable to listen to SSDP announcements: {e}")
+        self.print_debug(f"Searching receivers on {network}...", True)
+        self.discovery.scan(network).addCallback(self._on_discovered)
+
+    def _on_discovered(self, hosts: list[str]) -> None:
+        if not hosts:
+            self.print_debug("No receiver found!", True)
+            self.discovery.invalidate()
+            self._reconnect()
+            return
+
+        self.print_debug(f"Found receivers: {', '.join(hosts)}", True)
+        self.config.set('denonremote', 'receiver_ip', hosts[0])
+        self.config.write()
+        self.remote_config.invalidate()
+        self._connect()
+
     def _disconnect(self) -> None:
+        self.reconnect.cancel()
         if self.connector is not None:
             self.print_debug('Disconnecting', True)
             self.connector.disconnect()
             self.connector = None
 
+    def _open_midi(self) -> None:
+        if not self.config.getboolean('denonremote', 'midi_enabled'):
+            return
+
+        channel = self.config.getint('denonremote', 'midi_channel')
+        mapper = MidiMapper(channel=channel - 1 if channel else None)
+        mapper.client = self.client
+        self.midi = MidiInput(
+            mapper,
+            port_name=self.config.get('denonremote', 'midi_port') or None,
+            virtual=self.config.getboolean('denonremote', 'midi_virtual'),
+        )
+        try:
+            self.midi.open()
+        except (ImportError, OSError) as e:
+            logger.error(f"Unable to open MIDI input: {e}")
+            self.print_debug("MIDI input unavailable!")
+            self.midi = None
+
+    def _start_metrics(self) -> None:
+        port = self.config.getint('denonremote', 'metrics_port')
+        path = self.config.get('denonremote', 'metrics_file')
+        if not port and not path:
+            return
+
+        self.metrics = ProtocolMetrics()
+        if port:
+            try:
+                # Local only: the endpoint is not authenticated
+                twisted.internet.reactor.listenTCP(
+                    port, twisted.web.server.Site(MetricsResource(self.metrics)), interface='127.0.0.1'
+                )
+            except twisted.internet.error.CannotListenError as e:
+                logger.error(f"Unable to serve metrics: {e}")
+        if path:
+            self.metrics_exporter = MetricsExporter(self.metrics, [TextFileSink(path)])
+            self.metrics_exporter.start()
+
+    def _close_midi(self) -> None:
+        if self.midi is not None:
+            self.midi.close()
+            self.midi = None
+
     def on_timeout(self) -> None:
         pass
 
@@ -262,6 +457,13 @@ class DenonRemoteApp(kivy.app.App):
         Fired by Kivy on application startup
         :return:
         """
+        self.print_debug("Initializing GUI...")
+        self.remote_config = RemoteConfig(self.config)
+        self.ui_updates = UIUpdateScheduler()
+        self.quarantine = Quarantine()
+        self._build_spl()
+        self._build_presets()
+
         # FIXME: Windows only ATM.
         if self.config.getboolean('denonremote', 'always_on_top'):
             KivyOnTop.register_topmost(kivy.core.window.Window, __TITLE__)
@@ -301,8 +503,19 @@ class DenonRemoteApp(kivy.app.App):
             self.root.ids.debug_messages.disabled = True
             # Hide Kivy settings
             self.use_kivy_settings: bool = False
+        else:
+            self.protocol_log = RingBufferHandler()
+            logging.getLogger(DenonProtocol.__module__).addHandler(self.protocol_log)
 
+        self._open_midi()
+        self._start_metrics()
+        self.reconnect = ReconnectScheduler(
+            self._connect, self.remote_config.receiver_ip, self.remote_config.receiver_port, self.metrics
+        )
         self._connect()
+        self.scheduler = JobScheduler(JobStore(JOBS_FILE), self._run_job)
+        self.scheduler.start()
+        self._sync_standby_on_exit()
 
     def on_stop(self) -> None:
         """
@@ -310,7 +523,31 @@ class DenonRemoteApp(kivy.app.App):
 
         :return:
         """
-        pass
+        if self.scheduler is not None:
+            self.scheduler.fire(SHUTDOWN)
+            self.scheduler.stop()
+            if self.client is not None:
+                self.client.outbound.drain()  # The reactor stops with the application
+        self._close_midi()
+        if self.reconnect is not None:
+            self.reconnect.cancel()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+        if self.protocol_log is not None and len(self.quarantine):
+            self.quarantine.dump_to_file(os.path.expanduser(QUARANTINE_FILE))
+
+    def _run_job(self, job: Job) -> None:
+        if self.client is None:
+            self.print_debug(f"Not connected. Job {job.name} skipped!", True)
+            return
+        self.print_debug(f"Running job {job.name}")
+        run_job(self.client, job)
+
+    def _sync_standby_on_exit(self) -> None:
+        if self.config.getboolean('denonremote', 'standby_on_exit'):
+            self.scheduler.add(Job(STANDBY_ON_EXIT_JOB, 'standby', event=SHUTDOWN))
+        else:
+            self.scheduler.remove(STANDBY_ON_EXIT_JOB)
 
     def on_pause(self) -> None:
         """
@@ -337,7 +574,8 @@ class DenonRemoteApp(kivy.app.App):
         """
         self.print_debug("Connection successful!", True)
         self.client: DenonProtocol | DenonClientGUIFactory = connection
-        self._backoff = _BACKOFF
+        if self.midi is not None:
+            self.midi.mapper.client = self.client
 
         self.client.get_power()
         self.client.get_volume()
@@ -358,6 +596,8 @@ class DenonRemoteApp(kivy.app.App):
             logger.debug(f"Connection failed: {reason.value}")
             self.print_debug("Connection to receiver failed!")
             self.client = None
+            if self.midi is not None:
+                self.midi.mapper.client = None
             self.root.ids.power.disabled = True
             self.root.ids.main.disabled = True
             self.open_settings()
@@ -372,17 +612,20 @@ class DenonRemoteApp(kivy.app.App):
         if self.connector is connector:
             logger.debug(f"Connection lost: {reason.value}")
             self.print_debug("Connection to receiver lost!")
+            if self.protocol_log is not None:
+                self.protocol_log.dump_to_file(os.path.expanduser(POST_MORTEM_FILE))
             self.client = None
+            if self.midi is not None:
+                self.midi.mapper.client = None
             self.root.ids.power.disabled = True
             self.root.ids.main.disabled = True
 
         self._reconnect()
 
     def _reconnect(self) -> None:
-        """Try to reconnect with exponential backoff"""
-        self._backoff = self._backoff * 2
-        self.print_debug(f"Trying to reconnect in {self._backoff} seconds.", True)
-        kivy.clock.Clock.schedule_once(self._connect, self._backoff)
+        delay = self.reconnect.schedule()
+        if delay is not None:
+            self.print_debug(f"Trying to reconnect in {delay:.2f} seconds.", True)
 
     @kivy.clock.mainthread
     def show(self, window: kivy.core.window.Window = None) -> None:
@@ -431,6 +674,8 @@ class DenonRemoteApp(kivy.app.App):
         if codepoint == 'm':
             if not self.root.ids.volume_mute.disabled:
                 self.root.ids.volume_mute.trigger_action()
+        if codepoint == 'b':
+            self._backup()
         if scancode == 82:  # Up
             if not self.root.ids.volume_plus.disabled:
                 self.root.ids.volume_plus.trigger_action()
@@ -446,6 +691,9 @@ class DenonRemoteApp(kivy.app.App):
             kivy.core.window.Window.size = (WIDTH, HEIGHT)
 
     def update_power(self, status: bool = True) -> None:
+        self.ui_updates.post(self._apply_power, status)
+
+    def _apply_power(self, status: bool) -> None:
         if status:
             self.root.ids.power.state = 'down'
         else:
@@ -455,114 +703,65 @@ class DenonRemoteApp(kivy.app.App):
         power = not bool(instance.state == 'normal')
         self.client.set_power(power)
 
-    def update_volume(self, text: str = "", ref_level: int = None) -> None:
-        # If we get no text, retrieve the currently displayed one
-        if text == "":
-            # We don't need to update the volume display if no text is passed
-            text = self.root.ids.volume_display.text
-        else:
-            self.root.ids.volume_display.text = text
-
-            # Disable minus button on boundaries
-            # Plus button is handled by update_max_volume()
-            if text == "---.-dB":
-                self.root.ids.volume_minus.disabled = True
-            else:
-                self.root.ids.volume_minus.disabled = False
-
-            # Update volume presets
-            if text in self.config.get('denonremote', 'vol_preset_1'):
-                self.root.ids.vol_preset_1.state = 'down'
-            else:
-                self.root.ids.vol_preset_1.state = 'normal'
-            if text in self.config.get('denonremote', 'vol_preset_2'):
-                self.root.ids.vol_preset_2.state = 'down'
-            else:
-                self.root.ids.vol_preset_2.state = 'normal'
-            if text in self.config.get('denonremote', 'vol_preset_3'):
-                self.root.ids.vol_preset_3.state = 'down'
-            else:
-                self.root.ids.vol_preset_3.state = 'normal'
-            if text in self.config.get('denonremote', 'vol_preset_4'):
-                self.root.ids.vol_preset_4.state = 'down'
-            else:
-                self.root.ids.vol_preset_4.state = 'normal'
-
-        # Retrieve the displayed reference level if not passed
-        if ref_level is None:
-            # Get pressed option
-            mode_ref_widgets = kivy.uix.behaviors.togglebutton.ToggleButtonBehavior.get_widgets('mode_ref')
-            active_widget = next(widget for widget in mode_ref_widgets if widget.state == 'down')
-            ref_level = self._get_mode_level(active_widget.text)
-
-        # Update the SPL display
-        (spl_text, ref_text) = self._compute_spl_text(text, ref_level)
+    def update_volume(self, code: str) -> None:
+        self.ui_updates.post(self._apply_volume, code)
+
+    def _apply_volume(self, code: None | str) -> None:
+        self._volume = code
+        (volume_text, spl_text, ref_text) = self.spl.display(code)
+        self.root.ids.volume_display.text = volume_text
         self.root.ids.spl_display.text = spl_text
         self.root.ids.ref_display.text = ref_text
 
-    def update_max_volume(self, text: str = ""):
-        if text:
-            self.maximum_volume = text
+        # Disable buttons on boundaries
+        self.root.ids.volume_minus.disabled = code not in self.spl.table
+        self.root.ids.volume_plus.disabled = code == self.maximum_volume
 
-        # Disable plus button on boundaries
-        # Minus button is handled by update_volume
-        if self.root.ids.volume_display.text == self.maximum_volume:
-            self.root.ids.volume_plus.disabled = True
-        else:
-            self.root.ids.volume_plus.disabled = False
-
-    def _compute_spl_text(self, text: str = "", ref_level: int = -18) -> (str, str):
-        # FIXME: Handle Absolute mode
-        # Relative mode computation
-        volume = float('-inf') if text == '---.-dB' else float(text.replace(' ', '')[:-2])  # Strip "dB"
-        volume_delta = volume - float(
-            self.config.get('denonremote', 'reference_volume')
-        )  # compute delta with reference volume
-        if volume == float('-inf'):
-            spl = volume
-        else:
-            spl = int(
-                round(
-                    float(self.config.get('denonremote', 'reference_spl')) + volume_delta
-                )
-            )  # apply delta to reference SPL
-        # Reference mode handling
-        ref_delta = ref_level - int(
-            self.config.get('denonremote', 'reference_level')
-        )  # compute delta with reference level
-        spl = spl + ref_delta
-        if spl == float('-inf'):
-            spl = 0
-        spl_text = f"{spl:d} dB SPL"  # format string with computed SPL and reference level mode
-        ref_text = f"@ {ref_level:d} dBFS"
-        text = (spl_text, ref_text)
-        return text
+        # Update volume presets
+        self._active_volume_preset = self._activate_preset(
+            self._volume_preset_buttons,
+            self._active_volume_preset,
+            None if code is None else self.remote_config.volume_presets.match(code),
+        )
 
-    def mode_changed(self, instance: kivy.uix.widget.Widget) -> None:
-        level = self._get_mode_level(instance.text)
-        self.update_volume(ref_level=level)
+    def update_max_volume(self, code: str) -> None:
+        self.ui_updates.post(self._apply_max_volume, code)
+
+    def _apply_max_volume(self, code: str) -> None:
+        self.maximum_volume = code
+        self.root.ids.volume_plus.disabled = self._volume == code
+
+    def _build_spl(self) -> None:
+        """(Re)compute the calibrated volume display"""
+        # Get pressed option
+        mode_ref_widgets = kivy.uix.behaviors.togglebutton.ToggleButtonBehavior.get_widgets('mode_ref')
+        active_widget = next(widget for widget in mode_ref_widgets if widget.state == 'down')
+        self.spl = SPLCalibration(
+            self.remote_config.reference_volume,
+            self.remote_config.reference_spl,
+            self.remote_config.reference_level,
+        )
+        self.spl.configure(
+            level=REFERENCE_MODES.get(active_widget.text, DEFAULT_REFERENCE_LEVEL),
+            absolute=self.config.get('denonremote', 'volume_display_mode') == 'absolute',
+        )
+        self.ui_updates.post(self._apply_volume, self._volume)
 
-    @staticmethod
-    def _get_mode_level(instance_text: str) -> int:
-        level = -18  # We default to EBU
-        if instance_text == 'EBU R 128':
-            level = -23  # LUFS
-        elif instance_text == 'SMPTE/K-20':
-            level = -20  # dBFS
-        elif instance_text == 'EBU':
-            level = -18  # dBFS
-        elif instance_text == 'K-14':
-            level = -14  # dBFS
-        elif instance_text == 'K-12':
-            level = -12  # dBFS
-        return level
+    def mode_changed(self, instance: kivy.uix.widget.Widget) -> None:
+        previous_level = self.spl.level
+        self.spl.configure(level=REFERENCE_MODES.get(instance.text, DEFAULT_REFERENCE_LEVEL))
+        self.ui_updates.post(self._apply_volume, self._volume)
+        if self.config.getboolean('denonremote', 'k_compensation') and self._volume is not None:
+            code = self.spl.compensated_volume(self._volume, previous_level)
+            if code is not None and self.client is not None:
+                self.client.set_volume(MV_PARAMS[code])
 
     def volume_text_changed(self, instance: kivy.uix.widget.Widget) -> None:
-        # TODO: validate user input
-        if len(instance.text) != 7:
+        code = self.spl.code_of(instance.text)
+        if code is None:
             self.client.get_volume()
             return
-        self.client.set_volume(instance.text)
+        self.client.set_volume(MV_PARAMS[code])
 
     def volume_minus_pressed(self, _: kivy.uix.widget.Widget) -> None:
         self.client.set_volume('Down')
@@ -577,6 +776,9 @@ class DenonRemoteApp(kivy.app.App):
         self.client.set_mute(mute)
 
     def set_volume_mute(self, status: bool = False) -> None:
+        self.ui_updates.post(self._apply_volume_mute, status)
+
+    def _apply_volume_mute(self, status: bool) -> None:
         if status:
             self.root.ids.volume_mute.state = 'down'
             self.root.ids.volume_display.foreground_color = [.3, .3, .3, 1]
@@ -586,73 +788,187 @@ class DenonRemoteApp(kivy.app.App):
             self.root.ids.volume_display.foreground_color = [.85, .85, .85, 1]
             self.root.ids.power.blink(False)
 
-    def vol_preset_1_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_volume(self.config.get('denonremote', 'vol_preset_1'))
+    def _build_presets(self) -> None:
+        """(Re)create the preset buttons from the configuration"""
+        volume_layout = self.root.ids.volume_presets_layout
+        volume_layout.clear_widgets()
+        presets = self.remote_config.volume_presets
+        volume_layout.cols = max(1, min(len(presets), VOLUME_PRESETS_PER_ROW))
+        self._volume_preset_buttons = []
+        for index, label in enumerate(presets.labels):
+            button = ToggleButton(text=label, group='vol_preset', on_press=self.vol_preset_pressed)
+            button.preset_index = index
+            volume_layout.add_widget(button)
+            self._volume_preset_buttons.append(button)
+        self._active_volume_preset = None
+
+        sources_layout = self.root.ids.sources_layout
+        sources_layout.clear_widgets()
+        presets = self.remote_config.source_presets
+        sources_layout.rows = max(1, -(-len(presets) // SOURCES_COLUMNS))  # Ceiling
+        self._source_preset_buttons = []
+        for index, label in enumerate(presets.labels):
+            button = ToggleButton(text=label, group='sources', on_press=self.fav_src_pressed)
+            button.preset_index = index
+            sources_layout.add_widget(button)
+            self._source_preset_buttons.append(button)
+        self._active_source_preset = None
+
+        # Restore the active presets
+        self._apply_volume(self._volume)
+        self._apply_sources(self._source)
+
+    @staticmethod
+    def _activate_preset(buttons: list[ToggleButton], previous: None | int, active: None | int) -> None | int:
+        """Only touch the buttons whose state changes"""
+        if previous != active:
+            if previous is not None:
+                buttons[previous].state = 'normal'
+            if active is not None:
+                buttons[active].state = 'down'
+        return active
+
+    def vol_preset_pressed(self, instance: kivy.uix.widget.Widget) -> None:
         instance.state = 'down'  # Disallow depressing the button manually
+        label = self.remote_config.volume_presets.labels[instance.preset_index]
+        if self.remote_config.volume_presets.values[instance.preset_index] is None:
+            self.print_debug(f"Volume preset {label} is invalid!")
+            return
+        self.client.set_volume(label)
 
-    def vol_preset_2_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_volume(self.config.get('denonremote', 'vol_preset_2'))
-        instance.state = 'down'
+    def mixer_pressed(self, _: kivy.uix.widget.Widget) -> None:
+        if self.mixer is None:
+            self.mixer = ChannelMixer()
+        self._apply_channel_levels()
+        self.mixer.open()
+        self.client.get_channel_levels()
 
-    def vol_preset_3_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_volume(self.config.get('denonremote', 'vol_preset_3'))
-        instance.state = 'down'
+    def channel_level_changed(self, channel: str, level: float) -> None:
+        self.client.set_channel_level(channel, level)
 
-    def vol_preset_4_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_volume(self.config.get('denonremote', 'vol_preset_4'))
-        instance.state = 'down'
+    def update_channel_levels(self) -> None:
+        self.ui_updates.post(self._apply_channel_levels)
 
-    def set_sources(self, source: str = None) -> None:
-        if source in self.config.get('denonremote', 'fav_src_1_code'):
-            self.root.ids.fav_src_1.state = 'down'
-        else:
-            self.root.ids.fav_src_1.state = 'normal'
-        if source in self.config.get('denonremote', 'fav_src_2_code'):
-            self.root.ids.fav_src_2.state = 'down'
-        else:
-            self.root.ids.fav_src_2.state = 'normal'
-        if source in self.config.get('denonremote', 'fav_src_3_code'):
-            self.root.ids.fav_src_3.state = 'down'
-        else:
-            self.root.ids.fav_src_3.state = 'normal'
-        if source in self.config.get('denonremote', 'fav_src_4_code'):
-            self.root.ids.fav_src_4.state = 'down'
-        else:
-            self.root.ids.fav_src_4.state = 'normal'
-        if source in self.config.get('denonremote', 'fav_src_5_code'):
-            self.root.ids.fav_src_5.state = 'down'
-        else:
-            self.root.ids.fav_src_5.state = 'normal'
-        if source in self.config.get('denonremote', 'fav_src_6_code'):
-            self.root.ids.fav_src_6.state = 'down'
-        else:
-            self.root.ids.fav_src_6.state = 'normal'
+    def _apply_channel_levels(self) -> None:
+        if self.mixer is not None and self.client is not None:
+            self.mixer.update(self.client.channels.levels)
 
-    def fav_src_1_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_source(self.config.get('denonremote', 'fav_src_1_code'))
-        instance.state = 'down'  # Disallow depressing the button manually
+    def zone2_pressed(self, _: kivy.uix.widget.Widget) -> None:
+        if self.zone2 is None:
+            self.zone2 = Zone2Panel()
+        self._apply_zone2()
+        self.zone2.open()
+        self.client.zone2.get_status()
+
+    def zone2_power_pressed(self, instance: kivy.uix.widget.Widget) -> None:
+        self.client.zone2.set_power(instance.state == 'down')
+
+    def zone2_source_selected(self, label: str) -> None:
+        code = Zone2Panel.source_code(label)
+        if code is not None and code != self.client.zone2.state.source:
+            self.client.zone2.set_source(code)
+
+    def zone2_volume_pressed(self, direction: str) -> None:
+        self.client.zone2.set_volume(direction)
+
+    def zone2_mute_pressed(self, instance: kivy.uix.widget.Widget) -> None:
+        self.client.zone2.set_mute(instance.state == 'down')
+
+    def update_zone2(self) -> None:
+        self.ui_updates.post(self._apply_zone2)
+
+    def _apply_zone2(self) -> None:
+        if self.zone2 is not None and self.client is not None:
+            self.zone2.update(self.client.zone2.state)
+
+    def _import_room_correction(self, path: str) -> None:
+        if self.client is None:
+            self.print_debug("Not connected. Room correction not applied.")
+            return
+        try:
+            correction = load_rew(path)
+        except OSError as e:
+            self.print_debug(f"Unable to import room correction: {e}", True)
+            return
+        if correction.skipped:
+            self.print_debug(
+                f"Room correction: {len(correction.skipped)} filters can't be reproduced and were skipped."
+            )
+
+        def queued(total: int) -> None:
+            if not total:
+                self.print_debug("Room correction already applied.")
 
-    def fav_src_2_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_source(self.config.get('denonremote', 'fav_src_2_code'))
-        instance.state = 'down'
+        self.client.apply_room_correction(
+            correction,
+            progress=lambda sent, total: self.print_debug(f"Room correction: {sent}/{total}"),
+        ).addCallback(queued)
+
+    def _backup(self) -> None:
+        if self.client is None:
+            self.print_debug("Not connected. Unable to backup.")
+            return
+        path = os.path.expanduser(time.strftime(BACKUP_FILE))
+        self.print_debug("Backing up receiver settings...")
+
+        def save(snapshot: Snapshot) -> None:
+            try:
+                with open(path, 'w', encoding='ASCII') as f:
+                    f.write(snapshot.dumps())
+            except OSError as e:
+                self.print_debug(f"Unable to save backup: {e}", True)
+                return
+            self.print_debug(f"{len(snapshot.lines)} settings saved to {path}")
+
+        self.client.backup().addCallback(save)
+
+    def _restore(self, path: str) -> None:
+        if self.client is None:
+            self.print_debug("Not connected. Settings not restored.")
+            return
+        names = self.config.get('denonremote', 'restore_subsystems').split(',')
+        subsystems = [name.strip() for name in names if name.strip()]
+        unknown = set(subsystems) - set(SUBSYSTEMS)
+        if unknown:
+            self.print_debug(f"Unknown subsystems: {', '.join(sorted(unknown))}")
+            return
+        try:
+            with open(path, encoding='ASCII') as f:
+                snapshot = Snapshot.loads(f.read())
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            self.print_debug(f"Unable to restore {path}: {e}", True)
+            return
 
-    def fav_src_3_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_source(self.config.get('denonremote', 'fav_src_3_code'))
-        instance.state = 'down'
+        def queued(total: int) -> None:
+            if not total:
+                self.print_debug("Settings already up to date.")
 
-    def fav_src_4_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_source(self.config.get('denonremote', 'fav_src_4_code'))
-        instance.state = 'down'
+        self.client.restore(
+            snapshot,
+            subsystems or None,
+            progress=lambda sent, total: self.print_debug(f"Restoring settings: {sent}/{total}"),
+        ).addCallback(queued)
 
-    def fav_src_5_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_source(self.config.get('denonremote', 'fav_src_5_code'))
-        instance.state = 'down'
+    def set_sources(self, source: str = None) -> None:
+        self.ui_updates.post(self._apply_sources, source)
+
+    def _apply_sources(self, source: None | str) -> None:
+        self._source = source
+        self._active_source_preset = self._activate_preset(
+            self._source_preset_buttons,
+            self._active_source_preset,
+            None if source is None else self.remote_config.source_presets.match(source),
+        )
 
-    def fav_src_6_pressed(self, instance: kivy.uix.widget.Widget) -> None:
-        self.client.set_source(self.config.get('denonremote', 'fav_src_6_code'))
-        instance.state = 'down'
+    def fav_src_pressed(self, instance: kivy.uix.widget.Widget) -> None:
+        instance.state = 'down'  # Disallow depressing the button manually
+        code = self.remote_config.source_presets.values[instance.preset_index]
+        if not code:
+            self.print_debug(f"Favorite source {instance.preset_index + 1} has no code!")
+            return
+        self.client.set_source(code)
 
-    def print_debug(self, msg: str, echo_to_logger: bool = False) -> None:
+    def print_debug(self, msg: str, echo_to_logger: bool = False, command: str = '') -> None:
         if echo_to_logger:
             logger.debug(msg)
-        self.root.ids.debug_messages.text += f"{msg}\n"
+        self.root.ids.debug_messages.append(msg, command)
@@ -0,0 +1,228 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Remote MIDI input.
+
+Control scheme:
+
+- CC7 (Channel Volume): Master Volume
+- CC120 (All Sound Off): Mute (On when value >= 64)
+- Program Change: Select Input Source
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, Hashable, TYPE_CHECKING
+
+from twisted.internet import reactor
+
+from denonremote.denon.dn500av import MASTER_VOLUME_ZERODB_REF, MV_PARAMS, SI_PARAMS
+
+if TYPE_CHECKING:
+    import mido
+    import twisted.internet.interfaces
+
+    from denonremote.denon.communication import DenonProtocol
+
+logger = logging.getLogger(__name__)
+
+MIDI_CC_VOLUME = 7
+MIDI_CC_MUTE = 120
+MIDI_VALUE_MAX = 127
+MIDI_RATE: float = .2
+"""
+Minimum interval between two commands of the same kind in seconds.
+Matches DenonProtocol.DELAY.
+"""
+MIDI_VIRTUAL_PORT_NAME = "Denon Remote"
+
+
+def build_volume_map(maximum: str = str(MASTER_VOLUME_ZERODB_REF)) -> tuple[str, ...]:
+    """
+    Interpolate the MIDI value range onto the Master Volume half dB grid
+
+    :param maximum: Raw Master Volume value reached at MIDI value 127. Defaults to 0dB.
+    :return: Master Volume label for each MIDI value
+    """
+    grid = []
+    for code, label in MV_PARAMS.items():
+        if not code.isdigit():
+            continue  # Skip UP/DOWN
+        grid.append(label)
+        if code == maximum:
+            break
+    steps = len(grid) - 1
+    return tuple(grid[round(value * steps / MIDI_VALUE_MAX)] for value in range(MIDI_VALUE_MAX + 1))
+
+
+class LatestValueRateLimiter:
+    """
+    Forward at most one value per key and per interval
+
+    Values submitted while waiting replace the pending one: only the latest is forwarded.
+    """
+
+    def __init__(
+            self,
+            callback: Callable[[Hashable, Any], None],
+            interval: float = MIDI_RATE,
+            clock: twisted.internet.interfaces.IReactorTime = reactor,
+    ) -> None:
+        self.callback = callback
+        self.interval = interval
+        self.clock = clock
+        self._pending: dict[Hashable, Any] = {}
+        self._last: dict[Hashable, float] = {}
+        self._calls: dict[Hashable, twisted.internet.interfaces.IDelayedCall] = {}
+
+    def submit(self, key: Hashable, value: Any) -> None:
+        self._pending[key] = value
+        if key in self._calls:
+            return  # Already scheduled. Latest value wins.
+        delay = self._last.get(key, float('-inf')) + self.interval - self.clock.seconds()
+        if delay <= 0:
+            self._flush(key)
+        else:
+            self._calls[key] = self.clock.callLater(delay, self._flush, key)
+
+    def cancel(self) -> None:
+        for call in self._calls.values():
+            call.cancel()
+        self._calls.clear()
+        self._pending.clear()
+
+    def _flush(self, key: Hashable) -> None:
+        self._calls.pop(key, None)
+        value = self._pending.pop(key)
+        self._last[key] = self.clock.seconds()
+        self.callback(key, value)
+
+
+class MidiMapper:
+    """
+    Translate MIDI messages into receiver commands
+    """
+
+    client: None | DenonProtocol = None
+    """Receiver connection. Messages are dropped while None."""
+
+    def __init__(
+            self,
+            channel: None | int = None,
+            maximum_volume: str = str(MASTER_VOLUME_ZERODB_REF),
+            sources: None | list[str] = None,
+            interval: float = MIDI_RATE,
+            clock: twisted.internet.interfaces.IReactorTime = reactor,
+    ) -> None:
+        """
+        :param channel: MIDI channel to listen to (0-15). None listens to all channels.
+        :param maximum_volume: Raw Master Volume value reached by the fader top.
+        :param sources: Input source codes indexed by program number. Defaults to the device order.
+        :param interval: Minimum interval between commands of the same kind in seconds.
+        :param clock: Twisted clock used for rate limiting.
+        """
+        self.channel = channel
+        self.volume_map = build_volume_map(maximum_volume)
+        self.sources = list(SI_PARAMS) if sources is None else sources
+        self.limiter = LatestValueRateLimiter(self._send, interval, clock)
+
+    def handle(self, message: mido.Message) -> None:
+        if self.channel is not None and getattr(message, 'channel', None) != self.channel:
+            return
+        if message.type == 'control_change':
+            if message.control == MIDI_CC_VOLUME:
+                self.limiter.submit('volume', self.volume_map[message.value])
+            elif message.control == MIDI_CC_MUTE:
+                self.limiter.submit('mute', message.value >= 64)
+        elif message.type == 'program_change':
+            if message.program < len(self.sources):
+                self.limiter.submit('source', self.sources[message.program])
+            else:
+                logger.warning("No input source mapped to program %i", message.program)
+
+    def _send(self, key: str, value: Any) -> None:
+        if self.client is None:
+            logger.debug("Not connected. Dropping MIDI %s: %s", key, value)
+            return
+        if key == 'volume':
+            self.client.set_volume(value)
+        elif key == 'mute':
+            self.client.set_mute(value)
+        elif key == 'source':
+            self.client.set_source(value)
+
+
+class LoopbackPort:
+    """
+    Virtual MIDI input without hardware nor MIDI backend
+
+    Messages sent to the port are delivered to the callback immediately.
+    """
+
+    name: str
+    closed: bool = False
+
+    def __init__(self, name: str = MIDI_VIRTUAL_PORT_NAME, callback: None | Callable = None) -> None:
+        self.name = name
+        self.callback = callback
+
+    def send(self, message: mido.Message) -> None:
+        if not self.closed and self.callback is not None:
+            self.callback(message)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class MidiInput:
+    """
+    MIDI input port feeding a MidiMapper
+
+    Mido delivers messages from its own thread. They are handed over to the reactor thread.
+    """
+
+    port: None | mido.ports.BaseInput | LoopbackPort = None
+
+    def __init__(
+            self,
+            mapper: MidiMapper,
+            port_name: None | str = None,
+            virtual: bool = False,
+            loopback: bool = False,
+    ) -> None:
+        """
+        :param mapper: MIDI to receiver commands mapper.
+        :param port_name: Name of the port to open. None opens the default port.
+        :param virtual: Create a virtual port instead of opening an existing one (Not supported on Windows).
+        :param loopback: Use an in-process loopback port. For testing without hardware.
+        """
+        self.mapper = mapper
+        self.port_name = port_name
+        self.virtual = virtual
+        self.loopback = loopback
+
+    def open(self) -> None:
+        if self.loopback:
+            self.port = LoopbackPort(self.port_name or MIDI_VIRTUAL_PORT_NAME, self.mapper.handle)
+            return
+
+        import mido  # Optional dependency
+        name = self.port_name
+        if self.virtual and not name:
+            name = MIDI_VIRTUAL_PORT_NAME
+        self.port = mido.open_input(name, virtual=self.virtual, callback=self._received)
+        logger.info("Listening to MIDI port %s", self.port.name)
+
+    def close(self) -> None:
+        self.mapper.limiter.cancel()
+        if self.port is not None:
+            self.port.close()
+            self.port = None
+
+    def _received(self, message: mido.Message) -> None:
+        reactor.callFromThread(self.mapper.handle, message)
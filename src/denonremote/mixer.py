@@ -0,0 +1,58 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Remote channel levels mixer.
+"""
+
+import kivy.app
+import kivy.input
+import kivy.uix.slider
+from kivy.properties import BooleanProperty, NumericProperty, StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.popup import Popup
+
+from denonremote.denon.channels import CHANNELS
+from denonremote.denon.dn500av import CV_SUBCOMMANDS
+
+
+class ChannelStrip(BoxLayout):
+    """Level slider of a channel"""
+
+    channel = StringProperty()
+    """Channel code"""
+    name = StringProperty()
+    level = NumericProperty(0)
+    """Level in dB"""
+    available = BooleanProperty(False)
+    """The receiver reported the channel. False when unknown or off."""
+
+    def released(self, slider: kivy.uix.slider.Slider, touch: kivy.input.MotionEvent) -> None:
+        if slider.collide_point(*touch.pos):
+            kivy.app.App.get_running_app().channel_level_changed(self.channel, slider.value)
+
+
+class ChannelMixer(Popup):
+    """
+    Per channel levels
+
+    Strips are only enabled for the channels reported by the receiver.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.strips: dict[str, ChannelStrip] = {}
+        for channel in CHANNELS:
+            strip = ChannelStrip(channel=channel, name=CV_SUBCOMMANDS[channel])
+            self.ids.strips.add_widget(strip)
+            self.strips[channel] = strip
+
+    def update(self, levels: dict[str, None | float]) -> None:
+        for channel, level in levels.items():
+            strip = self.strips[channel]
+            strip.available = level is not None
+            if level is not None:
+                strip.level = level
@@ -0,0 +1,95 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Remote volume and source presets.
+"""
+
+import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import kivy.config
+
+VOLUME_PRESET_KEY = 'vol_preset_{}'
+SOURCE_PRESET_CODE_KEY = 'fav_src_{}_code'
+SOURCE_PRESET_LABEL_KEY = 'fav_src_{}_label'
+
+
+class PresetBank:
+    """
+    Numbered presets
+
+    Received values are matched to their preset by exact lookup.
+    """
+
+    def __init__(self) -> None:
+        self.values: list[None | str] = []
+        """Receiver value of each preset. None when unset or invalid."""
+        self.labels: list[str] = []
+        """Displayed label of each preset"""
+        self._index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, value: None | str, label: str) -> None:
+        if value:
+            self._index.setdefault(value, len(self.values))  # First preset wins
+        self.values.append(value)
+        self.labels.append(label)
+
+    def match(self, value: str) -> None | int:
+        """Index of the preset matching a receiver value"""
+        return self._index.get(value)
+
+
+def ensure_preset_options(
+        config: 'kivy.config.ConfigParser',
+        section: str,
+        volume_presets: int,
+        source_presets: int,
+) -> None:
+    """Make sure every preset slot has a configuration value"""
+    for number in range(1, volume_presets + 1):
+        config.setdefault(section, VOLUME_PRESET_KEY.format(number), '')
+    for number in range(1, source_presets + 1):
+        config.setdefault(section, SOURCE_PRESET_CODE_KEY.format(number), '')
+        config.setdefault(section, SOURCE_PRESET_LABEL_KEY.format(number), '')
+
+
+def volume_presets_panel(section: str, count: int) -> str:
+    """Generate the volume presets settings panel"""
+    return json.dumps([
+        {
+            'type': 'string',
+            'title': f"Preset {number}",
+            'desc': f"Set the volume of preset {number}",
+            'section': section,
+            'key': VOLUME_PRESET_KEY.format(number),
+        }
+        for number in range(1, count + 1)
+    ])
+
+
+def source_preset_panel(section: str, number: int) -> str:
+    """Generate a favorite source settings panel"""
+    return json.dumps([
+        {
+            'type': 'string',
+            'title': "Label",
+            'desc': f"Set favorite source {number} custom label",
+            'section': section,
+            'key': SOURCE_PRESET_LABEL_KEY.format(number),
+        },
+        {
+            'type': 'string',
+            'title': "Code",
+            'desc': f"Set favorite source {number} code",
+            'section': section,
+            'key': SOURCE_PRESET_CODE_KEY.format(number),
+        },
+    ])
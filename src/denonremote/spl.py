@@ -0,0 +1,110 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Remote SPL calibrated display.
+"""
+
+from denonremote.denon.dn500av import DN500AVFormat, MV_PARAMS, parse_volume_label
+
+REFERENCE_MODES = {
+    'EBU R 128': -23,  # LUFS
+    'SMPTE/K-20': -20,  # dBFS
+    'EBU': -18,  # dBFS
+    'K-14': -14,  # dBFS
+    'K-12': -12,  # dBFS
+}
+"""Reference level of each metering mode"""
+
+DEFAULT_REFERENCE_LEVEL = -18  # We default to EBU
+
+UNKNOWN_VOLUME = '---.-dB'
+
+
+def format_absolute_volume(code: str) -> str:
+    """Format a raw Master Volume value on the absolute scale (0-98) like the device display"""
+    position = int(code[:2]) + (.5 if len(code) == 3 else 0)
+    return f"{position:4.1f}".rjust(len(UNKNOWN_VOLUME))
+
+
+class SPLCalibration:
+    """
+    Calibrated Sound Pressure Level display
+
+    Display texts are precomputed for every Master Volume value for the active reference mode.
+    Each volume change is then a single lookup.
+    """
+
+    absolute: bool = False
+    """Display the volume on the absolute scale instead of dB"""
+
+    level: int = DEFAULT_REFERENCE_LEVEL
+    """Active reference level mode in dBFS"""
+
+    table: dict[str, tuple[str, str, str]]
+    """(Volume text, SPL text, reference text) by raw Master Volume value"""
+
+    def __init__(self, reference_volume: float, reference_spl: float, reference_level: int) -> None:
+        """
+        :param reference_volume: Alignment volume in dB
+        :param reference_spl: Sound Pressure Level measured at the alignment volume in dB SPL
+        :param reference_level: Alignment level in dBFS
+        """
+        self.reference_volume = reference_volume
+        self.reference_spl = reference_spl
+        self.reference_level = reference_level
+        self._build()
+
+    def configure(self, level: None | int = None, absolute: None | bool = None) -> None:
+        if level is not None:
+            self.level = level
+        if absolute is not None:
+            self.absolute = absolute
+        self._build()
+
+    def _build(self) -> None:
+        ref_delta = self.level - self.reference_level  # compute delta with reference level
+        ref_text = f"@ {self.level:d} dBFS"
+        self.table = {}
+        self._codes = {}
+        for code, label in MV_PARAMS.items():
+            if not code.isdigit():
+                continue  # Skip UP/DOWN
+            volume_delta = parse_volume_label(label) - self.reference_volume  # compute delta with reference volume
+            spl = int(round(self.reference_spl + volume_delta)) + ref_delta  # apply delta to reference SPL
+            volume_text = format_absolute_volume(code) if self.absolute else label
+            self.table[code] = (volume_text, f"{spl:d} dB SPL", ref_text)
+            self._codes[volume_text.strip()] = code
+        self._unknown = (UNKNOWN_VOLUME, f"{0:d} dB SPL", ref_text)
+
+    def display(self, code: None | str) -> tuple[str, str, str]:
+        """Display texts of a raw Master Volume value"""
+        return self.table.get(code, self._unknown)
+
+    def code_of(self, text: str) -> None | str:
+        """Raw Master Volume value of a displayed or user entered volume"""
+        code = self._codes.get(text.strip())
+        if code is None and not self.absolute:
+            code = DN500AVFormat().get_raw_volume_value_from_db_value(text)
+        return code
+
+    def compensated_volume(self, code: str, previous_level: int) -> None | str:
+        """
+        Raw Master Volume value keeping the SPL after switching reference level
+
+        The current volume is lowered by the level increase.
+        e.g. Switching from EBU to K-14 lowers the output volume by 4dB.
+        The output volume is never raised: switching to a lower reference level leaves it alone.
+
+        :param code: Current raw Master Volume value
+        :param previous_level: Reference level before the switch in dBFS
+        :return: None when the volume doesn't need lowering or is unknown
+        """
+        delta = self.level - previous_level
+        if delta <= 0 or not code.isdigit():
+            return None
+        volume = parse_volume_label(MV_PARAMS[code]) - delta
+        return DN500AVFormat.mv_db_params.get(max(volume, min(DN500AVFormat.mv_db_params)))
@@ -0,0 +1,35 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Remote GUI updates scheduling.
+"""
+
+from typing import Callable
+
+import kivy.clock
+
+
+class UIUpdateScheduler:
+    """
+    Apply receiver state changes once per frame
+
+    Updates are keyed by handler. Intermediate values posted during a frame are dropped:
+    only the latest one is applied.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[Callable, tuple] = {}
+        self._trigger = kivy.clock.Clock.create_trigger(self._flush)
+
+    def post(self, handler: Callable, *args) -> None:
+        self._pending[handler] = args
+        self._trigger()
+
+    def _flush(self, *_) -> None:
+        pending, self._pending = self._pending, {}
+        for handler, args in pending.items():
+            handler(*args)
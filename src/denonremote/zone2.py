@@ -0,0 +1,44 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Denon Remote Zone 2 panel.
+"""
+
+from kivy.properties import BooleanProperty, ListProperty, StringProperty
+from kivy.uix.popup import Popup
+
+from denonremote.denon.dn500av import MV_PARAMS, Z2_PARAMS, zone2_subject
+from denonremote.denon.zone2 import Zone2State
+
+ZONE2_SOURCES = {
+    code: label for code, label in Z2_PARAMS.items() if zone2_subject(code) == 'SOURCE'
+}
+"""Selectable Zone 2 source labels by code"""
+
+UNKNOWN = "---"
+
+
+class Zone2Panel(Popup):
+    """Zone 2 power, source, volume and mute"""
+
+    power = BooleanProperty(False)
+    mute = BooleanProperty(False)
+    source = StringProperty(UNKNOWN)
+    """Source label"""
+    volume = StringProperty(UNKNOWN)
+    """Volume label"""
+    sources = ListProperty(list(ZONE2_SOURCES.values()))
+
+    def update(self, state: Zone2State) -> None:
+        self.power = bool(state.power)
+        self.mute = bool(state.mute)
+        self.source = ZONE2_SOURCES.get(state.source, UNKNOWN)
+        self.volume = MV_PARAMS.get(state.volume, UNKNOWN)
+
+    @staticmethod
+    def source_code(label: str) -> None | str:
+        return next((code for code, source in ZONE2_SOURCES.items() if source == label), None)
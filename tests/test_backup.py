@@ -0,0 +1,97 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from denonremote.denon.backup import Snapshot
+from denonremote.denon.dn500av import DN500AVMessage
+
+RESTORABLE = [
+    'PWON',
+    'ZMON',
+    'SIDVD',
+    'SDAUTO',
+    'MSSTEREO',
+    'PSBAS 47',
+    'PSTRE 53',
+    'VSAUDIO AMP',
+    'VSVPMAUTO',
+    'MV50',
+    'CVFL 50',
+    'CVSW 00',
+    'MUOFF',
+    'SLPOFF',
+    'Z2DVD',
+    'Z2ON',
+    'Z255',
+    'Z2MUOFF',
+    'Z2CVFL 50',
+    'Z2SLPOFF',
+]
+
+NON_RESTORABLE = [
+    'MVMAX 98',
+    'CVEND',
+    'MSQUICK1',
+    'Z2QUICK1',
+]
+
+
+def status_of(lines: list[str]) -> dict:
+    status = {}
+    for line in lines:
+        message = DN500AVMessage()
+        message.parse_response(line)
+        assert message.command_label is not None, line
+        status[message.status_key] = (0., message)
+    return status
+
+
+def test_full_status_round_trip():
+    snapshot = Snapshot.from_status(status_of(RESTORABLE + NON_RESTORABLE))
+    assert sorted(snapshot.lines.values()) == sorted(RESTORABLE)
+
+    restored = Snapshot.loads(snapshot.dumps())
+    assert restored.lines == snapshot.lines
+    assert restored.dumps() == snapshot.dumps()
+
+
+def test_quick_selects_keep_the_settings():
+    snapshot = Snapshot.from_status(status_of(['MSSTEREO', 'MSQUICK1', 'Z2DVD', 'Z2QUICK1']))
+    assert sorted(snapshot.lines.values()) == ['MSSTEREO', 'Z2DVD']
+
+
+def test_diff_restores_changes_only():
+    snapshot = Snapshot.from_status(status_of(RESTORABLE))
+    current = dict(snapshot.lines)
+    current[('MV', None)] = 'MV40'
+    assert snapshot.diff(current) == {('MV', None): b'MV50'}
+
+
+def test_diff_restores_in_dependency_order():
+    snapshot = Snapshot.from_status(status_of(RESTORABLE[::-1]))  # Received in the reverse order
+    assert list(snapshot.diff({}).values()) == [
+        b'PWON',
+        b'ZMON',
+        b'SIDVD',
+        b'SDAUTO',
+        b'MSSTEREO',
+        b'PSTRE 53',
+        b'PSBAS 47',
+        b'VSVPMAUTO',
+        b'VSAUDIO AMP',
+        b'MV50',
+        b'CVSW 00',
+        b'CVFL 50',
+        b'MUOFF',
+        b'SLPOFF',
+        b'Z2ON',
+        b'Z2DVD',
+        b'Z255',
+        b'Z2MUOFF',
+        b'Z2CVFL 50',
+        b'Z2SLPOFF',
+    ]
+    assert list(snapshot.diff({}, ['zone2'])) == [('Z2', 'POWER'), ('Z2', 'SOURCE'), ('Z2', 'VOLUME'),
+                                                   ('Z2MU', None), ('Z2CV', 'FL'), ('Z2SLP', None)]
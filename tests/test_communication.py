@@ -0,0 +1,134 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import pytest
+from twisted.internet import defer, task
+from twisted.internet.testing import StringTransport
+
+from denonremote.denon import communication
+from denonremote.denon.communication import DenonClientFactory, status_key
+from denonremote.denon.dn500av import DN500AVMessage
+
+REPLIES = {
+    b'PW?': 'PWON',
+    b'MV?': 'MV50',
+    b'CV?': 'CVEND',
+    b'SI?': 'SIDVD',
+    b'MS?': 'MSSTEREO',
+    b'MSQUICK ?': 'MSQUICK1',
+    b'VSAUDIO ?': 'VSAUDIO AMP',
+    b'VSVPN ?': 'VSVPMAUTO',
+    b'PSBAS ?': 'PSBAS 50',
+    b'PSSB: ?': 'PSSB:OFF',
+    b'Z2?': 'Z2ON',
+    b'Z2QUICK ?': 'Z2QUICK1',
+    b'Z2MU?': 'Z2MUOFF',
+    b'Z2SLP?': 'Z2SLPOFF',
+}
+
+
+@pytest.mark.parametrize('query, reply', REPLIES.items())
+def test_query_key_matches_reply_key(query, reply):
+    message = DN500AVMessage()
+    message.parse_response(reply)
+    assert message.command_label is not None
+    assert status_key(query) in (message.status_key, (message.command_code, None))
+    assert status_key(reply.encode('ASCII')) == message.status_key
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    clock = task.Clock()
+    monkeypatch.setattr(communication, 'reactor', clock)
+    protocol = DenonClientFactory(heartbeat_interval=0).buildProtocol(None)
+    protocol.outbound.clock = clock
+    protocol.liveness.clock = clock
+    transport = StringTransport()
+    protocol.makeConnection(transport)
+    return protocol, transport, clock
+
+
+def test_query_resolved_by_reply(connection):
+    protocol, transport, clock = connection
+    deferred = protocol.query(b'Z2QUICK ?')
+    clock.advance(protocol.DELAY)
+    protocol.dataReceived(b'Z2QUICK1\r')
+    assert deferred.called
+    assert not protocol._pending_queries
+
+
+def test_unanswered_query_expires(connection):
+    protocol, transport, clock = connection
+    deferred = protocol.query(b'MSQUICK ?')
+    failures = []
+    deferred.addErrback(failures.append)
+    clock.advance(protocol.QUERY_TIMEOUT)
+    assert failures and failures[0].check(defer.TimeoutError)
+    assert not protocol._pending_queries
+
+    # Sent again
+    transport.clear()
+    protocol.query(b'MSQUICK ?').addErrback(lambda _: None)
+    clock.advance(protocol.DELAY)
+    assert b'MSQUICK ?\r' in transport.value()
+
+
+def test_only_replies_answer_requests(connection):
+    protocol, transport, clock = connection
+    protocol.sendLine(b'MV?')
+    protocol.sendLine(b'CV?')
+    clock.advance(2 * protocol.DELAY)
+    assert protocol.ongoing_calls == 2
+
+    protocol.dataReceived(b'SIDVD\r')  # Unsolicited
+    assert protocol.ongoing_calls == 2
+    protocol.dataReceived(b'MV50\rMVMAX 60\rCVFL 50\rCVFR 50\r')
+    assert protocol.ongoing_calls == 1
+    protocol.dataReceived(b'CVEND\r')
+    assert protocol.ongoing_calls == 0
+
+
+def run_receiver(protocol, transport, clock, replies, duration, step=.1):
+    """Answer the lines sent by the protocol from replies for duration seconds"""
+    for _ in range(round(duration / step)):
+        clock.advance(step)
+        for line in transport.value().split(b'\r'):
+            if line in replies:
+                protocol.dataReceived(replies[line] + b'\r')
+        transport.clear()
+
+
+def test_unanswered_query_keeps_link_up(connection, monkeypatch):
+    protocol, transport, clock = connection
+    timeouts = []
+    monkeypatch.setattr(protocol, 'timeoutConnection', lambda: timeouts.append(clock.seconds()))
+    protocol.liveness.set_interval(1.)
+    for line in (b'MS?', b'PW?', b'MV?', b'MU?', b'SD?'):
+        protocol.sendLine(line)
+    replies = {b'PW?': b'PWON', b'MV?': b'MV50', b'MU?': b'MUOFF', b'SD?': b'SDAUTO'}
+    run_receiver(protocol, transport, clock, replies, 10.)
+    assert not timeouts
+    assert protocol.liveness.misses == 0
+
+
+def test_standby_receiver_keeps_link_up(connection, monkeypatch):
+    protocol, transport, clock = connection
+    timeouts = []
+    monkeypatch.setattr(protocol, 'timeoutConnection', lambda: timeouts.append(clock.seconds()))
+    protocol.liveness.set_interval(1.)
+    for line in (b'MS?', b'MV?', b'MU?', b'SD?', b'SI?'):
+        protocol.sendLine(line)
+    run_receiver(protocol, transport, clock, {b'PW?': b'PWSTANDBY'}, 10.)
+    assert not timeouts
+
+
+def test_silent_link_goes_down(connection, monkeypatch):
+    protocol, transport, clock = connection
+    timeouts = []
+    monkeypatch.setattr(protocol, 'timeoutConnection', lambda: timeouts.append(clock.seconds()))
+    protocol.sendLine(b'MV?')
+    run_receiver(protocol, transport, clock, {}, 10.)
+    assert len(timeouts) == 1
@@ -0,0 +1,93 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import time
+
+import pytest
+from twisted.internet import defer, reactor
+from twisted.internet.protocol import Factory, Protocol
+from twisted.protocols.basic import LineOnlyReceiver
+from twisted.trial import unittest
+
+from denonremote.denon.discovery import MAX_HOSTS, ReceiverDiscovery, scan_network
+
+
+class FakeReceiver(LineOnlyReceiver):
+    delimiter = b'\r'
+
+    def lineReceived(self, line: bytes) -> None:
+        if line == b'PW?':
+            self.sendLine(b'PWON')
+
+
+class NotAReceiver(LineOnlyReceiver):
+    delimiter = b'\r'
+
+    def lineReceived(self, line: bytes) -> None:
+        self.sendLine(b'HELLO')
+
+
+@pytest.mark.parametrize('network', ['192.168.1', '192.168.1.0/33', 'fe80::/120', '10.0.0.0/21'])
+def test_invalid_networks_are_refused(network):
+    with pytest.raises(ValueError):
+        scan_network(network)
+
+
+def test_largest_network():
+    assert scan_network('10.0.0.1/22').num_addresses == MAX_HOSTS
+
+
+class ScanTest(unittest.TestCase):
+    """Local simulated receivers"""
+
+    def setUp(self) -> None:
+        self.receiver = reactor.listenTCP(0, Factory.forProtocol(FakeReceiver), interface='127.0.0.1')
+        self.port = self.receiver.getHost().port
+        # Silent: the probe times out
+        self.silent = reactor.listenTCP(self.port, Factory.forProtocol(Protocol), interface='127.0.0.2')
+        self.other = reactor.listenTCP(self.port, Factory.forProtocol(NotAReceiver), interface='127.0.0.3')
+        # The other hosts refuse connections
+        self.discovery = ReceiverDiscovery(port=self.port)
+
+    def tearDown(self) -> defer.Deferred:
+        return defer.gatherResults([
+            defer.maybeDeferred(port.stopListening) for port in (self.receiver, self.silent, self.other)
+        ])
+
+    @defer.inlineCallbacks
+    def test_scan(self):
+        start = time.monotonic()
+        found = yield self.discovery.scan('127.0.0.0/24')
+        self.assertLess(time.monotonic() - start, 1.)
+        self.assertEqual(found, ['127.0.0.1'])
+
+        # Cached
+        yield self.receiver.stopListening()
+        found = yield self.discovery.scan('127.0.0.0/24')
+        self.assertEqual(found, ['127.0.0.1'])
+
+        self.discovery.invalidate()
+        found = yield self.discovery.scan('127.0.0.0/24')
+        self.assertEqual(found, [])
+
+    @defer.inlineCallbacks
+    def test_cache_expires(self):
+        self.discovery.ttl = 0.
+        found = yield self.discovery.scan('127.0.0.0/29')
+        self.assertEqual(found, ['127.0.0.1'])
+        yield self.receiver.stopListening()
+        found = yield self.discovery.scan('127.0.0.0/29')
+        self.assertEqual(found, [])
+
+    @defer.inlineCallbacks
+    def test_announced_receiver(self):
+        self.discovery.announced('127.0.0.1')
+        self.discovery.announced('127.0.0.2')
+        yield self.discovery.scan('127.0.0.0/30')
+        self.assertEqual(list(self.discovery.found), ['127.0.0.1'])
+        # Outside the scanned subnet
+        found = yield self.discovery.scan('127.0.0.4/30')
+        self.assertEqual(found, [])
@@ -0,0 +1,28 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import marshal
+
+from denonremote.denon import frozen
+
+
+def test_artifact_matches_the_source(tmp_path):
+    path = frozen.build(str(tmp_path / 'tables.marshal'))
+    assert frozen.check(path) == []
+
+
+def test_stale_artifact_is_ignored(tmp_path):
+    path = frozen.build(str(tmp_path / 'tables.marshal'))
+    with open(path, 'rb') as f:
+        data = marshal.loads(f.read())
+    data['fingerprint'] = 'stale'
+    with open(path, 'wb') as f:
+        f.write(marshal.dumps(data))
+    assert frozen.load(path) is None
+
+
+def test_missing_artifact(tmp_path):
+    assert frozen.load(str(tmp_path / 'missing.marshal')) is None
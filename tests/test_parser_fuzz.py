@@ -0,0 +1,151 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Parser properties and fuzzing
+
+Every table value round-trips through encode_command() and parse_response().
+Random garbage, truncated and corrupted lines never raise and stay within the per-line time and allocation budgets.
+"""
+
+import logging
+import random
+import string
+import time
+import tracemalloc
+
+import pytest
+
+from denonremote.denon.dn500av import DN500AVMessage, encode_command, PROFILE
+
+SEED = 500
+"""Fixed: failures are reproducible"""
+
+ITERATIONS = 20_000
+
+LINE_TIME_BUDGET: float = 50e-6
+"""99th percentile of the parsing time of a line in seconds"""
+
+LINE_ALLOCATION_BUDGET = 4096
+"""Memory allocated parsing a line in bytes, besides the line copies"""
+
+MAX_LINE_LENGTH = 135
+"""Longest line the protocol accepts. See DenonProtocol.MAX_LENGTH."""
+
+ALPHABET = string.ascii_uppercase + string.digits + ' .:?-'
+"""Characters the receiver uses"""
+
+
+def table_lines() -> list[tuple[str, None | str, str]]:
+    """Every (command, subcommand, parameter) of the tables"""
+    return [
+        (command, subcommand, parameter)
+        for command in PROFILE.commands
+        for subcommand in (None, *PROFILE.commands_subcommands.get(command, {}))
+        for parameter in PROFILE.params(command, subcommand)
+    ]
+
+
+def garbage_lines(rng: random.Random, count: int) -> list[bytes]:
+    """Malformed lines from a misbehaving unit"""
+    valid = [encode_command(*codes) for codes in table_lines()]
+    lines = []
+    for _ in range(count):
+        kind = rng.randrange(5)
+        if kind == 0:  # Noise
+            line = bytes(rng.randrange(256) for _ in range(rng.randrange(MAX_LINE_LENGTH)))
+        elif kind == 1:  # Plausible characters
+            line = ''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(MAX_LINE_LENGTH))).encode('ASCII')
+        elif kind == 2:  # Truncated
+            line = rng.choice(valid)
+            line = line[:rng.randrange(len(line) + 1)]
+        elif kind == 3:  # Trailing data
+            line = rng.choice(valid) + rng.choice(valid)[:rng.randrange(1, 8)]
+        else:  # Corrupted byte
+            corrupted = bytearray(rng.choice(valid))
+            corrupted[rng.randrange(len(corrupted))] = rng.randrange(256)
+            line = bytes(corrupted)
+        lines.append(line)
+    return lines
+
+
+@pytest.fixture(scope='module')
+def garbage() -> list[bytes]:
+    return garbage_lines(random.Random(SEED), ITERATIONS)
+
+
+@pytest.fixture(autouse=True)
+def quiet_parser():
+    # The parser logs every malformed line
+    logger = logging.getLogger('denonremote.denon.dn500av')
+    level = logger.level
+    logger.setLevel(logging.CRITICAL)
+    yield
+    logger.setLevel(level)
+
+
+def test_table_values_round_trip():
+    failures = []
+    for command, subcommand, parameter in table_lines():
+        line = encode_command(command, subcommand, parameter)
+        message = DN500AVMessage()
+        message.parse_response(line)
+        parsed = (message.command_code, message.subcommand_code, message.parameter_code)
+        if parsed != (command, subcommand, parameter):
+            # Ambiguous lines (e.g. a parameter starting like a subcommand) must at least be stable
+            if message.command_code is None or message.encode() != line:
+                failures.append(f"{line!r} parsed as {parsed}")
+    assert not failures
+
+
+def test_garbage_never_raises(garbage):
+    message = DN500AVMessage()
+    for line in garbage:
+        message.parse_response(line)
+        if message.command_code is None:
+            continue
+        assert message.command_code in PROFILE.commands, line
+        if message.parameter_code is not None:
+            assert message.parameter_code in PROFILE.params(message.command_code, message.subcommand_code), line
+
+
+def test_non_ascii_bytes():
+    message = DN500AVMessage()
+    message.parse_response(b'MV\xff\xfe')
+    assert message.parameter_code is None
+    message.parse_response(b'MV50')
+    assert message.parameter_code == '50'
+
+
+def test_unicode_digits_are_not_numbers():
+    message = DN500AVMessage()
+    message.parse_response('SLP０１０')
+    assert message.parameter_code is None
+
+
+def test_line_time_budget(garbage):
+    message = DN500AVMessage()
+    durations = []
+    for line in garbage:
+        start = time.perf_counter()
+        message.parse_response(line)
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    percentile = durations[int(len(durations) * .99)]
+    assert percentile <= LINE_TIME_BUDGET, f"{percentile * 1e6:.1f}µs"
+
+
+def test_line_allocation_budget(garbage):
+    tracemalloc.start()
+    try:
+        for line in garbage[:2000]:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            DN500AVMessage().parse_response(line)
+            allocated = tracemalloc.get_traced_memory()[1] - before
+            assert allocated <= LINE_ALLOCATION_BUDGET + 4 * len(line), line
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,41 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+
+from twisted.internet import task
+
+from denonremote.denon.scheduler import Job, JobScheduler, JobStore
+
+JOBS = '''{
+    "version": 1,
+    "jobs": [
+        {"name": "nightly standby", "action": "standby", "at": "23:30"},
+    ]
+}'''
+"""Trailing comma"""
+
+
+def test_invalid_store_is_set_aside(tmp_path):
+    path = tmp_path / 'jobs.json'
+    path.write_text(JOBS, encoding='UTF-8')
+    scheduler = JobScheduler(JobStore(str(path)), lambda job: None, task.Clock())
+    scheduler.start()
+    assert scheduler.jobs == {}
+    assert (tmp_path / 'jobs.json.invalid').read_text(encoding='UTF-8') == JOBS
+
+    scheduler.add(Job('standby on exit', 'standby', event='shutdown'))
+    assert [job['name'] for job in json.loads(path.read_text(encoding='UTF-8'))['jobs']] == ['standby on exit']
+
+
+def test_unreadable_store_is_not_overwritten(tmp_path):
+    path = tmp_path / 'jobs.json'
+    path.mkdir()  # Unreadable as a file
+    scheduler = JobScheduler(JobStore(str(path)), lambda job: None, task.Clock())
+    scheduler.start()
+    scheduler.add(Job('standby on exit', 'standby', event='shutdown'))
+    assert path.is_dir()
+    assert not (tmp_path / 'jobs.json.tmp').exists()
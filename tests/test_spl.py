@@ -0,0 +1,23 @@
+# This Python file uses the following encoding: utf-8
+#
+# SPDX-FileCopyrightText: 2023 Raphaël Doursenaud <rdoursenaud@free.fr>
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from denonremote.spl import REFERENCE_MODES, SPLCalibration
+
+
+def calibration(level: int) -> SPLCalibration:
+    spl = SPLCalibration(reference_volume=-18, reference_spl=83, reference_level=-20)
+    spl.configure(level=level)
+    return spl
+
+
+def test_compensation_lowers_the_current_volume():
+    spl = calibration(REFERENCE_MODES['K-14'])
+    assert spl.compensated_volume('50', previous_level=REFERENCE_MODES['EBU']) == '46'  # -30dB -> -34dB
+
+
+def test_compensation_never_raises():
+    spl = calibration(REFERENCE_MODES['EBU R 128'])
+    assert spl.compensated_volume('50', previous_level=REFERENCE_MODES['EBU']) is None